@@ -7,7 +7,7 @@ from typing import Mapping
 
 from backend.utils import (
     ModelNotReady,
-    get_crop_predictor,
+    cached_recommend,
     soil_health_insights,
     weather_insights,
 )
@@ -29,8 +29,7 @@ class CropRecommendationResponse:
 
 
 def recommend_crops(features: Mapping[str, float]) -> CropRecommendationResponse:
-    predictor = get_crop_predictor()
-    result = predictor.recommend(features)
+    result = cached_recommend(features)
     recommendations = tuple(
         CropRecommendation(
             name=entry.crop.title(),
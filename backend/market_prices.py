@@ -8,12 +8,22 @@ from __future__ import annotations
 
 import json
 import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from dataclasses import dataclass
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
 
 import requests
 
+from src.utils.cache import CacheStats, TTLCache
+from src.utils.config import PATHS
+from src.utils.http import get_http_client
+from src.utils.resilience import get_breaker
+from src.utils.singleflight import SingleFlight, SingleFlightStats
+
 logger = logging.getLogger(__name__)
 
 # API Configuration
@@ -24,8 +34,39 @@ API_KEY = "579b464db66ec23bdd000001cdd3946e44ce4aad7209ff7b23ac571b"  # Public d
 
 # Cache settings
 CACHE_DURATION_HOURS = 6
-_price_cache: dict = {}
-_cache_timestamp: Optional[datetime] = None
+# How long past expiry a price is still served while it refreshes.
+CACHE_STALE_HOURS = float(os.getenv("MARKET_PRICE_STALE_HOURS", "18"))
+CACHE_MAX_ENTRIES = 1024
+# Shared by all worker processes; set MARKET_PRICE_CACHE_DB="" for memory only.
+_cache_db_setting = os.getenv(
+    "MARKET_PRICE_CACHE_DB", str(PATHS.data_processed / "market_prices.sqlite")
+)
+
+_price_cache: TTLCache[dict] = TTLCache(
+    ttl_seconds=CACHE_DURATION_HOURS * 3600,
+    stale_seconds=CACHE_STALE_HOURS * 3600,
+    max_entries=CACHE_MAX_ENTRIES,
+    path=Path(_cache_db_setting) if _cache_db_setting else None,
+    namespace="market_prices",
+)
+
+# Bulk fetch settings
+BULK_FETCH_MAX_WORKERS = 8
+BULK_FETCH_DEADLINE_SECONDS = 15.0
+REQUEST_TIMEOUT_SECONDS = 10
+
+# Skips the API (straight to FALLBACK_PRICES) after repeated failures; the
+# per-request timeout tracks recent latency, capped at REQUEST_TIMEOUT_SECONDS.
+_breaker = get_breaker(
+    "data.gov.in", min_timeout=2.0, max_timeout=REQUEST_TIMEOUT_SECONDS
+)
+
+# Concurrent sessions missing the same price share one API request.
+_inflight: SingleFlight[Optional[dict]] = SingleFlight()
+
+# Keep-alive pool shared by all data.gov.in calls, sized for the bulk fetch.
+# No adapter retries: each attempt would get the full breaker timeout.
+_http = get_http_client("data.gov.in", max_concurrency=BULK_FETCH_MAX_WORKERS, retries=0)
 
 # Crop name mapping (our names -> API commodity names)
 CROP_TO_COMMODITY = {
@@ -259,6 +300,9 @@ def fetch_live_prices(commodity: str, state: str = "") -> Optional[MarketPrice]:
     Returns:
         MarketPrice object if successful, None otherwise
     """
+    if not _breaker.allow_request():
+        return None
+
     try:
         params = {
             "api-key": API_KEY,
@@ -270,11 +314,20 @@ def fetch_live_prices(commodity: str, state: str = "") -> Optional[MarketPrice]:
         if state:
             params["filters[state]"] = state
 
-        response = requests.get(
-            f"{DATA_GOV_API_BASE}/{COMMODITY_PRICE_RESOURCE_ID}",
-            params=params,
-            timeout=10,
-        )
+        started = time.perf_counter()
+        try:
+            response = _http.get(
+                f"{DATA_GOV_API_BASE}/{COMMODITY_PRICE_RESOURCE_ID}",
+                params=params,
+                timeout=_breaker.timeout(),
+            )
+        except requests.RequestException:
+            _breaker.record_failure()
+            raise
+        if response.status_code >= 500 or response.status_code == 429:
+            _breaker.record_failure()
+        else:
+            _breaker.record_success(time.perf_counter() - started)
 
         if response.status_code == 200:
             data = response.json()
@@ -349,9 +402,55 @@ def fetch_live_prices(commodity: str, state: str = "") -> Optional[MarketPrice]:
     return None
 
 
+def _live_price_to_dict(live_price: MarketPrice) -> dict:
+    return {
+        "price": live_price.price,
+        "min_price": live_price.min_price,
+        "max_price": live_price.max_price,
+        "trend": live_price.trend,
+        "demand": live_price.demand,
+        "market": live_price.market,
+        "state": live_price.state,
+        "last_updated": live_price.last_updated,
+        "source": live_price.source,
+        "is_live": True,
+    }
+
+
+def _fallback_price(crop_key: str) -> dict:
+    fallback = FALLBACK_PRICES.get(
+        crop_key,
+        {"price": 3000, "trend": "Stable", "demand": "Moderate", "source": "Estimated"},
+    )
+
+    return {
+        "price": fallback["price"],
+        "trend": fallback["trend"],
+        "demand": fallback["demand"],
+        "source": fallback.get("source", "Fallback Data"),
+        "is_live": False,
+        "last_updated": "Static MSP/Market Rates",
+    }
+
+
+def _cache_key(crop_key: str, state: str) -> str:
+    return f"{crop_key}:{state}"
+
+
+def _load_live_price(crop_key: str, state: str) -> Optional[dict]:
+    def _fetch() -> Optional[dict]:
+        live_price = fetch_live_prices(CROP_TO_COMMODITY[crop_key], state)
+        return _live_price_to_dict(live_price) if live_price else None
+
+    return _inflight.do(_cache_key(crop_key, state), _fetch)
+
+
 def get_market_price(crop_name: str, state: str = "") -> dict:
     """Get market price for a crop with live data fallback.
 
+    Cached prices are served immediately; once older than
+    ``CACHE_DURATION_HOURS`` they are refreshed in the background.
+
     Args:
         crop_name: Name of the crop
         state: Optional state filter for regional prices
@@ -359,56 +458,98 @@ def get_market_price(crop_name: str, state: str = "") -> dict:
     Returns:
         Dictionary with price, trend, demand, and metadata
     """
-    global _price_cache, _cache_timestamp
-
     crop_key = crop_name.lower().strip()
-    cache_key = f"{crop_key}:{state}"
-
-    # Check cache validity
-    if _cache_timestamp and (datetime.now() - _cache_timestamp) < timedelta(
-        hours=CACHE_DURATION_HOURS
-    ):
-        if cache_key in _price_cache:
-            return _price_cache[cache_key]
-
-    # Try to fetch live data
-    commodity_name = CROP_TO_COMMODITY.get(crop_key)
-    if commodity_name:
-        live_price = fetch_live_prices(commodity_name, state)
-        if live_price:
-            result = {
-                "price": live_price.price,
-                "min_price": live_price.min_price,
-                "max_price": live_price.max_price,
-                "trend": live_price.trend,
-                "demand": live_price.demand,
-                "market": live_price.market,
-                "state": live_price.state,
-                "last_updated": live_price.last_updated,
-                "source": live_price.source,
-                "is_live": True,
-            }
-
-            # Update cache
-            _price_cache[cache_key] = result
-            _cache_timestamp = datetime.now()
 
+    # Try cached or live data
+    if crop_key in CROP_TO_COMMODITY:
+        result = _price_cache.get_or_load(
+            _cache_key(crop_key, state), lambda: _load_live_price(crop_key, state)
+        )
+        if result is not None:
             return result
 
     # Fallback to static data
-    fallback = FALLBACK_PRICES.get(
-        crop_key,
-        {"price": 3000, "trend": "Stable", "demand": "Moderate", "source": "Estimated"},
-    )
+    return _fallback_price(crop_key)
 
-    return {
-        "price": fallback["price"],
-        "trend": fallback["trend"],
-        "demand": fallback["demand"],
-        "source": fallback.get("source", "Fallback Data"),
-        "is_live": False,
-        "last_updated": "Static MSP/Market Rates",
-    }
+
+def get_market_prices_bulk(
+    crop_names: Iterable[str],
+    state: str = "",
+    *,
+    max_workers: int = BULK_FETCH_MAX_WORKERS,
+    deadline: float = BULK_FETCH_DEADLINE_SECONDS,
+) -> dict[str, dict]:
+    """Get prices for many crops, fetching cache misses concurrently.
+
+    Stale cached prices are returned as-is and refreshed in the background.
+    Live requests run on a bounded thread pool sharing one pooled session.
+    Whatever has finished when ``deadline`` seconds have elapsed is used;
+    crops still pending (or failed) get their ``FALLBACK_PRICES`` entry.
+
+    Args:
+        crop_names: Crops to price
+        state: Optional state filter for regional prices
+        max_workers: Maximum concurrent API requests
+        deadline: Overall time budget in seconds for the live fetches
+
+    Returns:
+        Dictionary mapping crop names to their price data
+    """
+    results: dict[str, dict] = {}
+    pending: dict[str, str] = {}
+    for crop_name in crop_names:
+        crop_key = crop_name.lower().strip()
+        if crop_key not in CROP_TO_COMMODITY:
+            results[crop_name] = _fallback_price(crop_key)
+            continue
+        cache_key = _cache_key(crop_key, state)
+        entry = _price_cache.peek(cache_key)
+        if entry is None:
+            pending[crop_name] = crop_key
+            continue
+        results[crop_name] = entry.value
+        if entry.age() >= _price_cache.ttl_seconds:
+            _price_cache.refresh_in_background(
+                cache_key,
+                lambda crop_key=crop_key: _load_live_price(crop_key, state),
+            )
+
+    if pending:
+        started = time.monotonic()
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(pending))),
+            thread_name_prefix="market-prices",
+        )
+        try:
+            futures = {
+                executor.submit(_load_live_price, crop_key, state): crop_name
+                for crop_name, crop_key in pending.items()
+            }
+            done, not_done = wait(futures, timeout=deadline)
+        finally:
+            # Do not wait for stragglers; their late results are discarded.
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        for future in done:
+            crop_name = futures[future]
+            try:
+                result = future.result()
+            except Exception as exc:  # noqa: BLE001 - fall back per crop
+                logger.warning(f"Live price fetch failed for {crop_name}: {exc}")
+                result = None
+            if result is not None:
+                _price_cache.set(_cache_key(pending[crop_name], state), result)
+                results[crop_name] = result
+        if not_done:
+            logger.warning(
+                f"Market price deadline of {deadline:.0f}s hit after "
+                f"{time.monotonic() - started:.1f}s; "
+                f"{len(not_done)} crops use fallback prices"
+            )
+        for crop_name, crop_key in pending.items():
+            results.setdefault(crop_name, _fallback_price(crop_key))
+
+    return results
 
 
 def get_all_crop_prices() -> dict[str, dict]:
@@ -417,24 +558,34 @@ def get_all_crop_prices() -> dict[str, dict]:
     Returns:
         Dictionary mapping crop names to their price data
     """
-    return {crop: get_market_price(crop) for crop in FALLBACK_PRICES.keys()}
+    return get_market_prices_bulk(FALLBACK_PRICES.keys())
 
 
 def refresh_price_cache() -> None:
     """Force refresh of the price cache."""
-    global _price_cache, _cache_timestamp
-    _price_cache = {}
-    _cache_timestamp = None
+    _price_cache.clear()
 
     # Pre-fetch all prices
-    for crop in FALLBACK_PRICES.keys():
-        get_market_price(crop)
+    get_market_prices_bulk(FALLBACK_PRICES.keys())
+
+
+def price_cache_stats() -> CacheStats:
+    """Hit/miss counters for the market price cache."""
+    return _price_cache.stats()
+
+
+def price_coalescing_stats() -> SingleFlightStats:
+    """Counters showing how many price lookups shared an in-flight request."""
+    return _inflight.stats()
 
 
 __all__ = [
     "MarketPrice",
     "get_market_price",
+    "get_market_prices_bulk",
     "get_all_crop_prices",
     "refresh_price_cache",
+    "price_cache_stats",
+    "price_coalescing_stats",
     "FALLBACK_PRICES",
 ]
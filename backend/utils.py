@@ -2,12 +2,19 @@
 
 from __future__ import annotations
 
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
-from typing import Mapping
+from typing import Any, Callable, Mapping
 
 import joblib
 import pandas as pd
+from sklearn.pipeline import Pipeline
 
 from src.features import (
     generate_soil_health_tips,
@@ -17,12 +24,35 @@ from src.features import (
 from src.models import (
     CropDiseaseClassifier,
     CropPredictor,
+    RecommendationResult,
     YieldEstimator,
     load_pipeline,
 )
+from src.data.dataset import FEATURE_COLUMNS
+from src.models.bootstrap import (
+    BootstrapStatus,
+    ModelBootstrapper,
+    load_fallback_pipeline,
+)
+from src.models.predictor import ModelLoadError, persist_retrained
+from src.models.registry import ModelRegistry, RegistryWatcher
+from src.utils.config import PATHS
 
 _PROJECT_ROOT = Path(__file__).resolve().parents[1]
 _MODEL_FALLBACK = _PROJECT_ROOT / "models" / "trained_model.pkl"
+_MODEL_ARTIFACT = PATHS.artifacts_models / "crop_recommender.joblib"
+
+# Decimal places kept per feature when building recommendation cache keys.
+# ``None`` keeps the raw value; categorical features are normalised instead.
+DEFAULT_FEATURE_ROUNDING: Mapping[str, int | None] = {
+    "N": 0,
+    "P": 0,
+    "K": 0,
+    "temperature": 1,
+    "humidity": 0,
+    "ph": 1,
+    "rainfall": 0,
+}
 
 
 def load_water_requirements(csv_path: str | Path | None = None) -> pd.DataFrame:
@@ -92,12 +122,52 @@ class ModelNotReady(RuntimeError):
     """Raised when a required trained asset is missing."""
 
 
+_BOOTSTRAPPER = ModelBootstrapper(persist=persist_retrained)
+_REGISTRY = ModelRegistry()
+_REGISTRY_WATCHER = RegistryWatcher(
+    _REGISTRY, interval=float(os.getenv("MODEL_REGISTRY_POLL_SECONDS", "10"))
+)
+
+
+def get_model_bootstrap_status() -> BootstrapStatus:
+    """Progress of the background retrain triggered by an unloadable model."""
+
+    return _BOOTSTRAPPER.status()
+
+
 @lru_cache(maxsize=1)
 def get_crop_predictor(top_k: int = 3) -> CropPredictor:
-    """Return a cached crop predictor instance."""
+    """Return a cached crop predictor instance.
+
+    If the saved model cannot be deserialised, serve a fallback model and
+    retrain in the background; the predictor swaps to the new model when the
+    retrain finishes. Versions activated in the model registry afterwards are
+    hot-swapped in by a background watcher.
+    """
 
+    loaded_version = _REGISTRY.current_version()
     try:
-        pipeline = load_pipeline()
+        pipeline = load_pipeline(retrain_on_failure=False)
+    except ModelLoadError as exc:
+        logging.warning("%s; retraining in the background.", exc)
+        predictor = CropPredictor(
+            load_fallback_pipeline(_MODEL_FALLBACK), top_k=top_k, use_compiled=True
+        )
+
+        def on_retrained(new_pipeline: Pipeline) -> None:
+            # A retrain published to the registry moves CURRENT and the watcher
+            # swaps it in; only a legacy single-file save is swapped here.
+            if _REGISTRY.current_version() == loaded_version:
+                predictor.swap_pipeline(new_pipeline)
+
+        _BOOTSTRAPPER.start(on_ready=on_retrained)
+        # The broken current version stays skipped; anything published later
+        # is swapped in over the fallback.
+        _REGISTRY_WATCHER.start(
+            lambda new_pipeline, _manifest: predictor.swap_pipeline(new_pipeline),
+            loaded_version=loaded_version,
+        )
+        return predictor
     except FileNotFoundError as exc:
         if _MODEL_FALLBACK.exists():
             pipeline = joblib.load(_MODEL_FALLBACK)
@@ -105,7 +175,169 @@ def get_crop_predictor(top_k: int = 3) -> CropPredictor:
             raise ModelNotReady(
                 "Crop recommendation model is missing. Run scripts/train_model.py first."
             ) from exc
-    return CropPredictor(pipeline, top_k=top_k)
+    predictor = CropPredictor(pipeline, top_k=top_k, use_compiled=True)
+    _REGISTRY_WATCHER.start(
+        lambda new_pipeline, _manifest: predictor.swap_pipeline(new_pipeline),
+        loaded_version=loaded_version,
+    )
+    return predictor
+
+
+def _model_artifact_signature() -> tuple[tuple[str, int, int], ...]:
+    signature: list[tuple[str, int, int]] = []
+    for path in (_MODEL_ARTIFACT, _MODEL_FALLBACK):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+@dataclass(frozen=True, slots=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    size: int
+    max_entries: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class RecommendationCache:
+    """Bounded LRU/TTL cache of predictions keyed on quantised features.
+
+    Inputs are rounded per feature before lookup *and* before prediction, so a
+    cached answer is exactly what the model returns for the canonical vector.
+    The cache empties itself whenever ``token`` passed to ``get_or_compute``
+    differs from the one the entries were computed under.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 4096,
+        ttl_seconds: float = 6 * 3600,
+        rounding: Mapping[str, int | None] | None = None,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._rounding = dict(DEFAULT_FEATURE_ROUNDING if rounding is None else rounding)
+        self._entries: OrderedDict[tuple, tuple[float, RecommendationResult]] = OrderedDict()
+        self._token: Any = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def canonicalize(self, features: Mapping[str, Any]) -> dict[str, Any]:
+        canonical: dict[str, Any] = {}
+        for column in FEATURE_COLUMNS:
+            value = features.get(column)
+            if column == "region" or isinstance(value, str) or value is None:
+                text = str(value).strip().lower() if value is not None else ""
+                canonical[column] = text or "unknown"
+                continue
+            number = float(value)
+            digits = self._rounding.get(column)
+            canonical[column] = round(number, digits) if digits is not None else number
+        return canonical
+
+    def get_or_compute(
+        self,
+        features: Mapping[str, Any],
+        compute: Callable[[dict[str, Any]], RecommendationResult],
+        *,
+        token: Any = None,
+    ) -> RecommendationResult:
+        canonical = self.canonicalize(features)
+        key = tuple(canonical.values())
+        now = time.monotonic()
+        with self._lock:
+            if token != self._token:
+                if self._entries:
+                    self._invalidations += 1
+                self._entries.clear()
+                self._token = token
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] <= self._ttl:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[1]
+            self._misses += 1
+
+        result = compute(canonical)
+
+        with self._lock:
+            if token != self._token:
+                return result
+            self._entries[key] = (now, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return result
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                invalidations=self._invalidations,
+                size=len(self._entries),
+                max_entries=self._max_entries,
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._token = None
+
+
+_RECOMMENDATION_CACHE = RecommendationCache()
+_ARTIFACT_LOCK = threading.Lock()
+_ARTIFACT_SIGNATURE: tuple[tuple[str, int, int], ...] | None = None
+
+
+def _refresh_artifact_signature() -> tuple[tuple[str, int, int], ...]:
+    """Return the artifact signature, dropping the cached predictor if it changed.
+
+    Registry-managed models are swapped in place by the watcher instead, so the
+    legacy single-file artifact is ignored once a registry version is active.
+    """
+
+    global _ARTIFACT_SIGNATURE
+    if _REGISTRY_WATCHER.active_version is not None:
+        return ()
+    signature = _model_artifact_signature()
+    with _ARTIFACT_LOCK:
+        if _ARTIFACT_SIGNATURE is not None and signature != _ARTIFACT_SIGNATURE:
+            get_crop_predictor.cache_clear()
+        _ARTIFACT_SIGNATURE = signature
+    return signature
+
+
+def cached_recommend(features: Mapping[str, Any]) -> RecommendationResult:
+    """Recommend crops through the shared quantised-feature cache."""
+
+    signature = _refresh_artifact_signature()
+    predictor = get_crop_predictor()
+    return _RECOMMENDATION_CACHE.get_or_compute(
+        features,
+        predictor.recommend,
+        token=(signature, id(predictor), predictor.generation),
+    )
+
+
+def recommendation_cache_stats() -> CacheStats:
+    return _RECOMMENDATION_CACHE.stats()
 
 
 @lru_cache(maxsize=1)
@@ -0,0 +1,208 @@
+"""Warm the weather cache for every region users are known to ask about."""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+import pandas as pd
+
+from backend.npk_lookup import NPK_LOOKUP
+from backend.ph_lookup import PH_LOOKUP
+from backend.rainfall_lookup import RAINFALL_LOOKUP
+from backend.weather_service import (
+    WeatherProviderError,
+    get_weather_snapshot,
+    has_fresh_weather,
+)
+from src.utils.config import PATHS
+
+logger = logging.getLogger(__name__)
+
+REGION_DATASET = PATHS.data_raw / "crop_recommendation_region_augmented.csv"
+
+# Defaults keep a full pass of the ~108 known regions well under OpenWeather's free-tier
+# limit of 60 calls/minute.
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_RATE_PER_SECOND = 0.8
+# Shorter than the 30-minute weather TTL. Each pass also refreshes entries
+# that would expire before the next one, so entries are replaced before expiry.
+DEFAULT_INTERVAL_SECONDS = 25 * 60
+
+
+@dataclass(frozen=True, slots=True)
+class PrefetchReport:
+    """Outcome of one prefetch pass."""
+
+    requested: int
+    refreshed: int
+    skipped: int
+    failed: dict[str, str] = field(default_factory=dict)
+    elapsed_seconds: float = 0.0
+
+
+class _RateLimiter:
+    """Space calls at least ``1 / rate`` seconds apart across threads."""
+
+    def __init__(self, rate_per_second: float) -> None:
+        self._interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def known_regions() -> list[str]:
+    """Regions from the lookup tables and the region-augmented dataset."""
+
+    regions = set(RAINFALL_LOOKUP) | set(PH_LOOKUP) | set(NPK_LOOKUP)
+    try:
+        frame = pd.read_csv(REGION_DATASET, comment="#", usecols=["region"])
+    except (OSError, ValueError) as exc:
+        logger.warning(f"Could not read regions from {REGION_DATASET}: {exc}")
+    else:
+        regions.update(frame["region"].dropna().astype(str))
+    cleaned = {region.strip().lower() for region in regions}
+    cleaned.discard("")
+    cleaned.discard("unknown")
+    return sorted(cleaned)
+
+
+def prefetch_weather(
+    regions: Optional[Iterable[str]] = None,
+    *,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    rate_per_second: float = DEFAULT_RATE_PER_SECOND,
+    force: bool = False,
+    refresh_ahead: float = 0.0,
+) -> PrefetchReport:
+    """Fetch weather for ``regions`` (all known regions by default).
+
+    Regions whose cached snapshot stays fresh for at least ``refresh_ahead``
+    more seconds are skipped unless ``force`` is set; schedulers pass their
+    interval so nothing expires between passes. At most ``max_workers``
+    requests run at once and new requests start no faster than
+    ``rate_per_second``.
+    """
+    started = time.monotonic()
+    targets = list(dict.fromkeys(regions if regions is not None else known_regions()))
+    pending = (
+        targets
+        if force
+        else [r for r in targets if not has_fresh_weather(r, refresh_ahead)]
+    )
+    limiter = _RateLimiter(rate_per_second)
+    failed: dict[str, str] = {}
+
+    def _fetch(region: str) -> None:
+        limiter.acquire()
+        try:
+            get_weather_snapshot(region, use_cache=False)
+        except WeatherProviderError as exc:
+            failed[region] = str(exc)
+        except Exception as exc:  # noqa: BLE001 - one region must not abort the pass
+            logger.exception(f"Weather prefetch for {region} failed")
+            failed[region] = f"{exc.__class__.__name__}: {exc}"
+
+    if pending:
+        with ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="weather-prefetch"
+        ) as executor:
+            list(executor.map(_fetch, pending))
+
+    report = PrefetchReport(
+        requested=len(targets),
+        refreshed=len(pending) - len(failed),
+        skipped=len(targets) - len(pending),
+        failed=failed,
+        elapsed_seconds=time.monotonic() - started,
+    )
+    logger.info(
+        f"Weather prefetch: {report.refreshed} refreshed, {report.skipped} fresh, "
+        f"{len(failed)} failed in {report.elapsed_seconds:.1f}s"
+    )
+    return report
+
+
+class WeatherPrefetchScheduler:
+    """Run ``prefetch_weather`` on a daemon thread every ``interval`` seconds."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL_SECONDS, **prefetch_kwargs) -> None:
+        self._interval = interval
+        self._prefetch_kwargs = {"refresh_ahead": interval, **prefetch_kwargs}
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.last_report: Optional[PrefetchReport] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        with self._lock:
+            if self.is_running:
+                return False
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._loop, name="weather-prefetch-scheduler", daemon=True
+            )
+            self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.last_report = prefetch_weather(**self._prefetch_kwargs)
+            except Exception:  # noqa: BLE001 - scheduler must survive
+                logger.exception("Weather prefetch pass failed")
+            self._stop.wait(self._interval)
+
+
+_scheduler: Optional[WeatherPrefetchScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def start_prefetch_scheduler() -> Optional[WeatherPrefetchScheduler]:
+    """Start the in-process scheduler when ``WEATHER_PREFETCH_MINUTES`` is set.
+
+    Safe to call on every Streamlit rerun; only one scheduler is started.
+    """
+    global _scheduler
+    minutes = os.getenv("WEATHER_PREFETCH_MINUTES", "").strip()
+    if not minutes or not os.getenv("OPENWEATHER_API_KEY"):
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            try:
+                interval = float(minutes) * 60
+            except ValueError:
+                logger.warning(f"Ignoring invalid WEATHER_PREFETCH_MINUTES={minutes!r}")
+                return None
+            _scheduler = WeatherPrefetchScheduler(interval)
+            _scheduler.start()
+    return _scheduler
+
+
+__all__ = [
+    "PrefetchReport",
+    "WeatherPrefetchScheduler",
+    "known_regions",
+    "prefetch_weather",
+    "start_prefetch_scheduler",
+]
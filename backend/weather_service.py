@@ -2,13 +2,22 @@
 
 from __future__ import annotations
 
+import json
 import os
-from dataclasses import dataclass
+import time
+from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from typing import Final, Literal, Optional
 
 import requests
 
+from src.utils.cache import CacheStats, TTLCache
+from src.utils.config import PATHS
+from src.utils.http import get_http_client
+from src.utils.resilience import get_breaker
+from src.utils.singleflight import SingleFlight, SingleFlightStats
+
 ProviderName = Literal["openweather"]
 
 
@@ -29,42 +38,78 @@ class WeatherSnapshot:
 
 
 _CACHE_TTL: Final = timedelta(minutes=30)
-_cache: dict[str, tuple[datetime, WeatherSnapshot]] = {}
+# Expired snapshots are served for this much longer while they refresh in the
+# background, and while the provider is down.
+_STALE_TTL: Final = timedelta(hours=6)
+_CACHE_MAX_ENTRIES: Final = 512
+# Shared by all worker processes; set WEATHER_CACHE_DB="" for memory only.
+_CACHE_DB: Final = os.getenv(
+    "WEATHER_CACHE_DB", str(PATHS.data_processed / "weather_cache.sqlite")
+)
 
 _OPENWEATHER_KEY: Final[Optional[str]] = os.getenv("OPENWEATHER_API_KEY")
+# Overridable so the prefetch job can run against a local stub server.
+_OPENWEATHER_BASE_URL: Final = os.getenv(
+    "OPENWEATHER_BASE_URL", "https://api.openweathermap.org/data/2.5"
+).rstrip("/")
 
+_breaker = get_breaker("openweather", min_timeout=2.0, max_timeout=10.0)
+# The breaker budgets one attempt per call, so the pool does not retry.
+_http = get_http_client("openweather", max_concurrency=8, retries=0)
+
+# Concurrent sessions asking for the same location share one request.
+_inflight: SingleFlight[WeatherSnapshot] = SingleFlight()
 
-def _cache_key(location: str, provider: ProviderName) -> str:
-    return f"{provider}:{location.strip().lower()}"
 
+def _encode_snapshot(snapshot: WeatherSnapshot) -> str:
+    payload = asdict(snapshot)
+    payload["observed_at"] = snapshot.observed_at.isoformat()
+    return json.dumps(payload)
 
-def _cache_get(location: str, provider: ProviderName) -> WeatherSnapshot | None:
-    key = _cache_key(location, provider)
-    entry = _cache.get(key)
-    if not entry:
-        return None
-    created, snapshot = entry
-    if datetime.now(timezone.utc) - created > _CACHE_TTL:
-        _cache.pop(key, None)
-        return None
-    return snapshot
 
+def _decode_snapshot(raw: str) -> WeatherSnapshot:
+    payload = json.loads(raw)
+    payload["observed_at"] = datetime.fromisoformat(payload["observed_at"])
+    return WeatherSnapshot(**payload)
 
-def _cache_set(location: str, snapshot: WeatherSnapshot) -> None:
-    key = _cache_key(location, snapshot.provider)
-    _cache[key] = (datetime.now(timezone.utc), snapshot)
+
+_cache: TTLCache[WeatherSnapshot] = TTLCache(
+    ttl_seconds=_CACHE_TTL.total_seconds(),
+    stale_seconds=(_STALE_TTL - _CACHE_TTL).total_seconds(),
+    max_entries=_CACHE_MAX_ENTRIES,
+    path=Path(_CACHE_DB) if _CACHE_DB else None,
+    namespace="weather",
+    encode=_encode_snapshot,
+    decode=_decode_snapshot,
+)
+
+
+def _cache_key(location: str, provider: ProviderName) -> str:
+    return f"{provider}:{location.strip().lower()}"
 
 
 def _fetch_openweather(location: str) -> WeatherSnapshot:
     if not _OPENWEATHER_KEY:
         raise WeatherProviderError("OPENWEATHER_API_KEY is not configured")
 
+    if not _breaker.allow_request():
+        raise WeatherProviderError("OpenWeather is temporarily unavailable")
+
+    started = time.perf_counter()
     try:
-        response = requests.get(
-            "https://api.openweathermap.org/data/2.5/weather",
+        response = _http.get(
+            f"{_OPENWEATHER_BASE_URL}/weather",
             params={"q": location, "appid": _OPENWEATHER_KEY, "units": "metric"},
-            timeout=10,
+            timeout=_breaker.timeout(),
         )
+    except requests.RequestException as exc:
+        _breaker.record_failure()
+        raise WeatherProviderError(f"OpenWeather request failed: {exc}") from exc
+    if response.status_code >= 500 or response.status_code == 429:
+        _breaker.record_failure()
+    else:
+        _breaker.record_success(time.perf_counter() - started)
+    try:
         response.raise_for_status()
         payload = response.json()
     except requests.RequestException as exc:
@@ -97,22 +142,52 @@ def get_weather_snapshot(
     *,
     use_cache: bool = True,
 ) -> WeatherSnapshot:
-    """Fetch a normalized weather snapshot for the given location using OpenWeather only."""
+    """Fetch a normalized weather snapshot for the given location using OpenWeather only.
+
+    Cached snapshots older than 30 minutes are still returned (for up to six
+    hours) while a background refresh fetches a new one.
+    """
     location = location.strip()
     if not location:
         raise WeatherProviderError("Location must be provided for weather lookup")
     if not _OPENWEATHER_KEY:
         raise WeatherProviderError("OPENWEATHER_API_KEY is not configured")
-    if use_cache:
-        cached = _cache_get(location, "openweather")
-        if cached:
-            return cached
-    snapshot = _fetch_openweather(location)
-    _cache_set(location, snapshot)
-    return snapshot
+    key = _cache_key(location, "openweather")
+
+    def _fetch() -> WeatherSnapshot:
+        return _inflight.do(key, lambda: _fetch_openweather(location))
+
+    if not use_cache:
+        snapshot = _fetch()
+        _cache.set(key, snapshot)
+        return snapshot
+    # _fetch raises rather than returning None, so a snapshot always comes back.
+    return _cache.get_or_load(key, _fetch)  # type: ignore[return-value]
+
+
+def has_fresh_weather(location: str, min_remaining: float = 0.0) -> bool:
+    """Return ``True`` if a snapshot for ``location`` is cached and not yet expired.
+
+    With ``min_remaining`` the snapshot must also stay fresh that many more seconds.
+    """
+
+    entry = _cache.peek(_cache_key(location, "openweather"))
+    return entry is not None and entry.age() < _cache.ttl_seconds - min_remaining
 
 
 def clear_weather_cache() -> None:
     """Reset cached weather responses (useful for testing)."""
 
     _cache.clear()
+
+
+def weather_cache_stats() -> CacheStats:
+    """Hit, stale-hit and miss counters for the weather cache."""
+
+    return _cache.stats()
+
+
+def weather_coalescing_stats() -> SingleFlightStats:
+    """Counters showing how many lookups shared an in-flight request."""
+
+    return _inflight.stats()
@@ -1,16 +1,22 @@
 # Utility functions for yield data filtering and model training
+import threading
 from pathlib import Path
+from typing import Iterable, Mapping, Sequence
 
+import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 import joblib
-import os
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 CROP_YIELD_CSV = PROJECT_ROOT / "data" / "raw" / "crop_yield.csv"
 MODEL_PATH = PROJECT_ROOT / "artifacts" / "models" / "yield_regressor.joblib"
+COLS_PATH = MODEL_PATH.with_name(MODEL_PATH.stem + "_cols.joblib")
+
+CATEGORICAL_FEATURES = ("Crop", "Season", "State")
+NUMERIC_FEATURES = ("Annual_Rainfall", "Fertilizer", "Pesticide")
 
 
 def filter_yield_data(crop=None, state=None, season=None, year=None):
@@ -52,35 +58,111 @@ def train_yield_model():
     return model
 
 
-def predict_yield(crop, state, season, rainfall, fertilizer, pesticide):
-    import joblib
+class YieldModelService:
+    """Resident yield regressor that encodes inputs straight into NumPy rows.
+
+    The training column layout (``pd.get_dummies`` output) is turned into a
+    column -> position index once, so a request only sets a few cells of a
+    preallocated matrix instead of one-hot encoding a DataFrame.
+    """
+
+    def __init__(self, model, columns: Sequence[str]) -> None:
+        self._model = model
+        self._columns = list(columns)
+        self._position = {column: index for index, column in enumerate(self._columns)}
+        self._numeric_positions = [
+            self._position.get(column) for column in NUMERIC_FEATURES
+        ]
+
+    @classmethod
+    def load(cls, model_path: Path = MODEL_PATH) -> "YieldModelService":
+        if not model_path.exists():
+            raise FileNotFoundError(f"Yield model not found: {model_path}")
+        model = joblib.load(model_path)
+        cols_path = model_path.with_name(model_path.stem + "_cols.joblib")
+        if cols_path.exists():
+            columns = joblib.load(cols_path)
+        elif hasattr(model, "feature_names_in_"):
+            columns = list(model.feature_names_in_)
+        else:
+            raise FileNotFoundError(f"Yield model column layout not found: {cols_path}")
+        return cls(model, columns)
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self._columns)
+
+    def encode(self, records: Sequence[Mapping[str, object]]) -> np.ndarray:
+        matrix = np.zeros((len(records), len(self._columns)), dtype=np.float64)
+        for row, record in enumerate(records):
+            for feature, position in zip(NUMERIC_FEATURES, self._numeric_positions):
+                if position is not None:
+                    matrix[row, position] = float(record[feature])
+            for feature in CATEGORICAL_FEATURES:
+                # Same naming as pd.get_dummies; unseen categories stay all-zero.
+                position = self._position.get(f"{feature}_{record[feature]}")
+                if position is not None:
+                    matrix[row, position] = 1.0
+        return matrix
+
+    def predict_many(
+        self, records: Iterable[Mapping[str, object] | Sequence[object]]
+    ) -> np.ndarray:
+        """Predict many inputs at once.
+
+        Records are mappings with the training column names or tuples of
+        (crop, state, season, rainfall, fertilizer, pesticide).
+        """
+        rows = [
+            record
+            if isinstance(record, Mapping)
+            else dict(
+                zip(
+                    ("Crop", "State", "Season", *NUMERIC_FEATURES),
+                    record,
+                )
+            )
+            for record in records
+        ]
+        if not rows:
+            return np.empty(0, dtype=np.float64)
+        frame = pd.DataFrame(self.encode(rows), columns=self._columns, copy=False)
+        return self._model.predict(frame)
 
+    def predict(self, crop, state, season, rainfall, fertilizer, pesticide) -> float:
+        return float(
+            self.predict_many([(crop, state, season, rainfall, fertilizer, pesticide)])[0]
+        )
+
+
+_SERVICE_LOCK = threading.Lock()
+_SERVICE: tuple[tuple[int, int], YieldModelService] | None = None
+
+
+def get_yield_model_service() -> YieldModelService:
+    """Return the process-wide yield model, reloading it if the artifact changes."""
+    global _SERVICE
     if not MODEL_PATH.exists():
         raise FileNotFoundError(f"Yield model not found: {MODEL_PATH}")
-    model = joblib.load(MODEL_PATH)
-    # Prepare input as DataFrame with same columns as training
-    input_df = pd.DataFrame(
-        [
-            {
-                "Crop": crop,
-                "Season": season,
-                "State": state,
-                "Annual_Rainfall": rainfall,
-                "Fertilizer": fertilizer,
-                "Pesticide": pesticide,
-            }
-        ]
-    )
-    input_df = pd.get_dummies(input_df)
-    # Align columns with model
-    cols_path = MODEL_PATH.with_name(MODEL_PATH.stem + "_cols.joblib")
-    model_cols = joblib.load(cols_path) if os.path.exists(cols_path) else None
-    if model_cols is not None:
-        for col in model_cols:
-            if col not in input_df:
-                input_df[col] = 0
-        input_df = input_df[model_cols]
-    return model.predict(input_df)[0]
+    stat = MODEL_PATH.stat()
+    signature = (stat.st_mtime_ns, stat.st_size)
+    current = _SERVICE
+    if current is not None and current[0] == signature:
+        return current[1]
+    with _SERVICE_LOCK:
+        if _SERVICE is None or _SERVICE[0] != signature:
+            _SERVICE = (signature, YieldModelService.load(MODEL_PATH))
+        return _SERVICE[1]
+
+
+def predict_yield(crop, state, season, rainfall, fertilizer, pesticide):
+    service = get_yield_model_service()
+    return service.predict(crop, state, season, rainfall, fertilizer, pesticide)
+
+
+def predict_yield_many(records):
+    """Batch variant of ``predict_yield`` for many (crop, state, season, ...) tuples."""
+    return get_yield_model_service().predict_many(records)
 
 
 # Save columns for prediction alignment after training
@@ -91,5 +173,4 @@ if __name__ == "__main__":
     df = pd.read_csv(CROP_YIELD_CSV)
     features = ["Crop", "Season", "State", "Annual_Rainfall", "Fertilizer", "Pesticide"]
     X = pd.get_dummies(df[features])
-    cols_path = MODEL_PATH.with_name(MODEL_PATH.stem + "_cols.joblib")
-    joblib.dump(list(X.columns), cols_path)
+    joblib.dump(list(X.columns), COLS_PATH)
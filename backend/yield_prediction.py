@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Mapping
@@ -51,6 +52,86 @@ class YieldProjection:
     weather_notes: tuple[str, ...]
 
 
+@dataclass(frozen=True, slots=True)
+class YieldStats:
+    mean_yield: float
+    mean_production: float
+    sample_count: int
+
+
+@dataclass(frozen=True, slots=True)
+class YieldIndex:
+    """Historical yield aggregates keyed by lower-cased crop and state."""
+
+    signature: tuple[int, int]
+    by_crop_state: dict[tuple[str, str], YieldStats]
+    by_crop: dict[str, YieldStats]
+    global_mean_yield: float | None
+
+
+_INDEX_LOCK = threading.Lock()
+_INDEX: YieldIndex | None = None
+
+
+def _csv_signature() -> tuple[int, int] | None:
+    try:
+        stat = CROP_YIELD_CSV.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _aggregate(frame: pd.DataFrame, keys: list[str]) -> dict:
+    grouped = frame.groupby(keys, sort=False).agg(
+        mean_yield=("Yield", "mean"),
+        mean_production=("Production", "mean"),
+        sample_count=("Yield", "size"),
+    )
+    return {
+        key: YieldStats(
+            mean_yield=float(row.mean_yield),
+            mean_production=float(row.mean_production),
+            sample_count=int(row.sample_count),
+        )
+        for key, row in zip(grouped.index, grouped.itertuples(index=False))
+    }
+
+
+def _build_yield_index(signature: tuple[int, int]) -> YieldIndex:
+    df = pd.read_csv(CROP_YIELD_CSV)
+    frame = pd.DataFrame(
+        {
+            "crop_key": df["Crop"].str.lower(),
+            "state_key": df["State"].str.lower(),
+            "Yield": df["Yield"],
+            "Production": df["Production"],
+        }
+    )
+    global_yield = pd.to_numeric(df["Yield"], errors="coerce").dropna()
+    return YieldIndex(
+        signature=signature,
+        by_crop_state=_aggregate(frame, ["crop_key", "state_key"]),
+        by_crop=_aggregate(frame, ["crop_key"]),
+        global_mean_yield=None if global_yield.empty else float(global_yield.mean()),
+    )
+
+
+def get_yield_index() -> YieldIndex | None:
+    """Return the process-wide yield index, rebuilding it when the CSV changes."""
+
+    global _INDEX
+    signature = _csv_signature()
+    if signature is None:
+        return None
+    index = _INDEX
+    if index is not None and index.signature == signature:
+        return index
+    with _INDEX_LOCK:
+        if _INDEX is None or _INDEX.signature != signature:
+            _INDEX = _build_yield_index(signature)
+        return _INDEX
+
+
 def _confidence_from_samples(sample_count: int, state_filtered: bool) -> float:
     """Estimate confidence from available historical sample size."""
     if sample_count <= 0:
@@ -72,7 +153,8 @@ def _level_from_confidence(confidence: float) -> str:
 def predict_yield(crop: str, features: Mapping[str, float]) -> YieldProjection:
     # Only use crop and state for lookup
     state = features.get("state")
-    if not CROP_YIELD_CSV.exists():
+    index = get_yield_index()
+    if index is None:
         fallback_yield = STATIC_YIELD.get(crop.lower())
         if fallback_yield is not None:
             fallback_confidence = 0.62
@@ -95,20 +177,17 @@ def predict_yield(crop: str, features: Mapping[str, float]) -> YieldProjection:
             weather_notes=None,
         )
 
-    df = pd.read_csv(CROP_YIELD_CSV)
-    df_crop_all_states = df[df["Crop"].str.lower() == crop.lower()]
-    df_crop = df_crop_all_states
+    crop_key = crop.lower()
+    stats = index.by_crop.get(crop_key)
     used_state_filter = False
-    if state:
-        state_rows = df_crop_all_states[
-            df_crop_all_states["State"].str.lower() == state.lower()
-        ]
-        if not state_rows.empty:
-            df_crop = state_rows
+    if stats is not None and state:
+        state_stats = index.by_crop_state.get((crop_key, state.lower()))
+        if state_stats is not None:
+            stats = state_stats
             used_state_filter = True
 
-    if df_crop.empty:
-        fallback_yield = STATIC_YIELD.get(crop.lower())
+    if stats is None:
+        fallback_yield = STATIC_YIELD.get(crop_key)
         if fallback_yield is not None:
             fallback_confidence = 0.72
             return YieldProjection(
@@ -121,9 +200,8 @@ def predict_yield(crop: str, features: Mapping[str, float]) -> YieldProjection:
             )
         # Final fallback for crops missing in both crop_yield.csv and STATIC_YIELD.
         # Use overall historical average to avoid blocking downstream UI sections.
-        global_yield = pd.to_numeric(df["Yield"], errors="coerce").dropna()
-        if not global_yield.empty:
-            fallback_yield = float(global_yield.mean())
+        if index.global_mean_yield is not None:
+            fallback_yield = index.global_mean_yield
             fallback_confidence = 0.58
             return YieldProjection(
                 crop=crop,
@@ -144,9 +222,9 @@ def predict_yield(crop: str, features: Mapping[str, float]) -> YieldProjection:
             reasoning=f"No yield data found for crop '{crop}' and state '{state}'.",
             weather_notes=None,
         )
-    avg_yield = df_crop["Yield"].mean()
-    avg_production = df_crop["Production"].mean()
-    confidence = _confidence_from_samples(len(df_crop), used_state_filter)
+    avg_yield = stats.mean_yield
+    avg_production = stats.mean_production
+    confidence = _confidence_from_samples(stats.sample_count, used_state_filter)
     return YieldProjection(
         crop=crop,
         level=_level_from_confidence(confidence),
@@ -157,4 +235,4 @@ def predict_yield(crop: str, features: Mapping[str, float]) -> YieldProjection:
     )
 
 
-__all__ = ["YieldProjection", "predict_yield"]
+__all__ = ["YieldIndex", "YieldProjection", "get_yield_index", "predict_yield"]
@@ -3,6 +3,7 @@ import sys
 import os
 import json
 import html
+import time
 import re
 from pathlib import Path
 
@@ -19,12 +20,14 @@ from backend.crop_recommendation import ModelNotReady, recommend_crops
 from backend.fertilizer_recommendation import recommend_fertilizer
 from backend.market_prices import get_market_price  # Live market prices from API
 from backend.pesticide_recommendation import recommend_pesticide, supported_diseases
+from backend.utils import get_model_bootstrap_status
+from backend.weather_prefetch import start_prefetch_scheduler
 from backend.yield_prediction import predict_yield
 from frontend.components.cards import info_card, list_card
 from frontend.components.forms import DISEASE_SEVERITIES, environmental_inputs
 from frontend.components.layout import inject_theme
 from frontend.pages.About import main as render_legacy_about
-from modules.ai_chatbot import generate_crop_response, load_context_data
+from modules.ai_chatbot import StreamMetrics, load_context_data, stream_crop_response
 from utils.crop_guide import get_crop_details
 
 load_dotenv(Path(PROJECT_ROOT) / ".env")
@@ -1563,6 +1566,28 @@ def _format_assistant_response_html(raw_text: str) -> str:
     return "".join(parts)
 
 
+def _assistant_bubble_html(content: str) -> str:
+    formatted = _format_assistant_response_html(content)
+    return (
+        "<div class='ai-shell'><div class='ai-bot-bubble'><div class='ai-bot-title'>"
+        "<span class='ai-avatar'>🌾</span>Agricultural Advisory Assistant</div>"
+        f"{formatted}</div></div>"
+    )
+
+
+def _stream_timing_caption(metrics: StreamMetrics) -> str:
+    labels = {
+        "gemini": "Gemini",
+        "openai": "OpenAI",
+        "cache": "cached answer",
+        "rule_based": "dataset advisory",
+    }
+    source = labels.get(metrics.source, metrics.source or "assistant")
+    first = metrics.time_to_first_chunk or 0.0
+    total = metrics.total_seconds or first
+    return f"⏱️ {source} · first response {first:.1f}s · complete {total:.1f}s"
+
+
 def render_ai_crop_assistant_page() -> None:
     """Render isolated AI Agricultural Assistant chat interface."""
     header_left, header_center, header_right = st.columns([1, 6, 2])
@@ -1776,11 +1801,10 @@ def render_ai_crop_assistant_page() -> None:
             else:
                 left, right = st.columns([5, 3])
                 with left:
-                    formatted = _format_assistant_response_html(content)
-                    st.markdown(
-                        f"<div class='ai-shell'><div class='ai-bot-bubble'><div class='ai-bot-title'><span class='ai-avatar'>🌾</span>Agricultural Advisory Assistant</div>{formatted}</div></div>",
-                        unsafe_allow_html=True,
-                    )
+                    st.markdown(_assistant_bubble_html(content), unsafe_allow_html=True)
+                    timing = message.get("timing")
+                    if timing:
+                        st.caption(timing)
 
     typed_query = st.chat_input("Ask your agriculture question...")
     user_query = typed_query or selected_history_query
@@ -1795,13 +1819,33 @@ def render_ai_crop_assistant_page() -> None:
         st.session_state["ai_chat_search_history"] = history[:50]
         _save_ai_search_history(st.session_state["ai_chat_search_history"])
 
+        context_data = dict(load_context_data())
+        context_data["conversation"] = [
+            {"role": item.get("role", ""), "content": item.get("content", "")}
+            for item in st.session_state["ai_chat_messages"][-10:]
+        ]
+        metrics = StreamMetrics()
+        chunks = stream_crop_response(user_query, context_data, metrics)
+        left, right = st.columns([5, 3])
+        with left:
+            placeholder = st.empty()
         with st.spinner("Preparing advisory..."):
-            context_data = dict(load_context_data())
-            context_data["conversation"] = st.session_state["ai_chat_messages"][-10:]
-            answer = generate_crop_response(user_query, context_data)
+            answer = next(chunks, "")
+        placeholder.markdown(_assistant_bubble_html(answer), unsafe_allow_html=True)
+        last_render = time.perf_counter()
+        for chunk in chunks:
+            answer += chunk
+            # Re-rendering the bubble per token is wasteful; a few frames per second reads smoothly.
+            if time.perf_counter() - last_render >= 0.08:
+                placeholder.markdown(_assistant_bubble_html(answer), unsafe_allow_html=True)
+                last_render = time.perf_counter()
 
         st.session_state["ai_chat_messages"].append(
-            {"role": "assistant", "content": answer}
+            {
+                "role": "assistant",
+                "content": answer,
+                "timing": _stream_timing_caption(metrics),
+            }
         )
         st.rerun()
 
@@ -1865,6 +1909,14 @@ def render_home_page():
         else:
             response = cached_response
 
+        bootstrap_status = get_model_bootstrap_status()
+        if bootstrap_status.is_running:
+            st.info(
+                f"Model upgrade in progress ({bootstrap_status.stage}, "
+                f"{bootstrap_status.progress:.0%}). Recommendations use a fallback "
+                "model until it finishes."
+            )
+
         if not response.recommendations and not regional_crops:
             st.warning("Model returned no recommendations. Check input values.")
             return
@@ -2029,6 +2081,9 @@ def main() -> None:
         initial_sidebar_state="expanded",
     )
 
+    # Keep regional weather warm in the background (opt-in via env).
+    start_prefetch_scheduler()
+
     # Initialize theme in session state
     if "theme" not in st.session_state:
         st.session_state["theme"] = "light"
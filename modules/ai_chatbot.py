@@ -1,17 +1,32 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 import re
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Generator, Iterator
 
-import numpy as np
 import pandas as pd
 import requests
 from dotenv import load_dotenv
 
+from modules.csv_documents import iter_csv_documents
+from modules.embedding_rebuild import EmbeddingRebuilder, RebuildStatus
+from modules.embedding_store import EmbeddingStore, load_embedding_store
+from modules.lexical_index import BM25Index, load_bm25_index
+from modules.llm_orchestrator import Provider, run_hedged
+from modules.prompt_builder import DEFAULT_CHAR_BUDGET, PromptBuilder, slim_user_prompt
+from modules.text_matcher import QueryMatch, QueryMatcher, normalize_crop_key, normalize_text
+from modules.vector_index import VectorIndex, load_or_build_index
+from src.utils.cache import CacheStats, TTLCache
+from src.utils.http import get_http_client
+from src.utils.resilience import get_breaker
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 load_dotenv(PROJECT_ROOT / ".env")
@@ -19,27 +34,83 @@ load_dotenv(PROJECT_ROOT / ".env")
 _CROP_DETAILS_PATH = Path("data/crop_details.json")
 _SOIL_PROFILES_PATH = Path("data/soil_profiles.csv")
 _CROP_DATASET_PATH = Path("data/raw/Crop recommendation dataset.csv")
+# Legacy JSON cache, migrated to the .npy/.meta.json store on first load.
 _EMBEDDINGS_CACHE_PATH = Path("data/ai_agri_embeddings.json")
+_EMBEDDINGS_STORE_STEM = Path("data/ai_agri_embeddings")
+_VECTOR_INDEX_DIR = Path("data/ai_agri_embeddings.index")
+_BM25_INDEX_DIR = Path("data/ai_agri_bm25")
+_RAG_RETRIEVAL_MODES = ("auto", "bm25", "embedding", "hybrid")
 _DATA_DIR = Path("data")
 _RAW_DIR = Path("data/raw")
 
+# Repeated questions skip the query embedding and the LLM call. Set
+# CHAT_CACHE_DB="" to keep both caches in memory only.
+_CHAT_CACHE_DB = os.getenv("CHAT_CACHE_DB", str(_DATA_DIR / "processed" / "chat_cache.sqlite"))
+_QUERY_EMBEDDING_CACHE: TTLCache[list[float]] = TTLCache(
+    ttl_seconds=7 * 24 * 3600,
+    max_entries=4096,
+    path=Path(_CHAT_CACHE_DB) if _CHAT_CACHE_DB else None,
+    namespace="query_embeddings",
+)
+_ANSWER_CACHE: TTLCache[str] = TTLCache(
+    ttl_seconds=float(os.getenv("CHAT_ANSWER_TTL_SECONDS", str(6 * 3600))),
+    max_entries=1024,
+    path=Path(_CHAT_CACHE_DB) if _CHAT_CACHE_DB else None,
+    namespace="answers",
+)
+
 _NON_AGRI_REPLY = (
     "I am your Agricultural Advisory Assistant. Please ask crop or farming related questions."
 )
 
-_LAST_AI_ERROR: str | None = None
+# Provider errors of the request being served. run_hedged runs providers in the
+# caller's context, so they append to the same per-request list.
+_AI_ERRORS: ContextVar[list[str] | None] = ContextVar("ai_errors", default=None)
+_AI_ERRORS_LOCK = threading.Lock()
+
+# Open after repeated failures so chat goes straight to the next provider or
+# the rule-based reply instead of waiting out the timeout on every message.
+_GEMINI_BREAKER = get_breaker("gemini", min_timeout=5.0, max_timeout=20.0)
+_OPENAI_BREAKER = get_breaker("openai", min_timeout=5.0, max_timeout=20.0)
+# Generation POSTs are not retried by the pool; the breaker decides instead.
+_GEMINI_HTTP = get_http_client("gemini", max_concurrency=4, retries=0)
+
+# OpenAI is started alongside Gemini once Gemini has been silent this long, and
+# the whole AI attempt (retrieval included) gives up after the deadline.
+_LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "4"))
+_LLM_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "25"))
+# Corpus embedding batches run in the background rebuild, off the chat path.
+_EMBED_BATCH_TIMEOUT_SECONDS = float(os.getenv("EMBEDDING_BATCH_TIMEOUT", "60"))
+_PROMPT_CHAR_BUDGET = int(os.getenv("LLM_PROMPT_CHAR_BUDGET", str(DEFAULT_CHAR_BUDGET)))
+
+
+def _call_timeout(breaker: Any, deadline: float | None) -> float | None:
+    """Breaker timeout capped by the remaining budget; None once it is spent."""
+    timeout = breaker.timeout()
+    if deadline is None:
+        return timeout
+    remaining = deadline - time.monotonic()
+    return min(timeout, remaining) if remaining > 0.5 else None
+
+
+def _reset_ai_errors() -> None:
+    """Start a fresh error list for the current request (and its provider threads)."""
+    _AI_ERRORS.set([])
 
 
 def _append_ai_error(message: str) -> None:
-    global _LAST_AI_ERROR
-    if not message:
+    errors = _AI_ERRORS.get()
+    if not message or errors is None:
         return
-    if _LAST_AI_ERROR is None:
-        _LAST_AI_ERROR = message
-        return
-    if message in _LAST_AI_ERROR:
-        return
-    _LAST_AI_ERROR = f"{_LAST_AI_ERROR} | {message}"
+    with _AI_ERRORS_LOCK:
+        if not any(message in existing for existing in errors):
+            errors.append(message)
+
+
+def last_ai_error() -> str | None:
+    """Why the AI providers did not answer the current request, if they failed."""
+    errors = _AI_ERRORS.get()
+    return " | ".join(errors) if errors else None
 
 _AGRI_KEYWORDS = {
     "crop",
@@ -169,6 +240,12 @@ _CROP_ALIASES = {
     "nachni": "ragi",
 }
 
+_KEYWORD_INTENTS = {
+    "agri": _AGRI_KEYWORDS,
+    "non_agri": _NON_AGRI_KEYWORDS,
+    "npk": _NPK_KEYWORDS,
+}
+
 _WATER_REQUIREMENT_FALLBACK_MM = {
     "rice": (1200.0, 2500.0),
     "wheat": (450.0, 650.0),
@@ -183,14 +260,6 @@ _WATER_REQUIREMENT_FALLBACK_MM = {
 }
 
 
-def _normalize_text(text: str) -> str:
-    return " ".join((text or "").strip().lower().split())
-
-
-def _normalize_crop_key(name: str) -> str:
-    return "".join(ch for ch in _normalize_text(name) if ch.isalnum())
-
-
 def _safe_float(value: Any) -> float | None:
     try:
         if value is None:
@@ -224,7 +293,7 @@ def _build_dataset_crop_details() -> dict[str, dict[str, Any]]:
     grouped = df.groupby(df["CROPS"].astype(str).str.strip().str.lower(), dropna=False)
 
     for crop_name, group in grouped:
-        crop_key = _normalize_crop_key(crop_name)
+        crop_key = normalize_crop_key(crop_name)
         if not crop_key:
             continue
         type_of_crop = _mode_str(group.get("TYPE_OF_CROP", pd.Series([], dtype=str)))
@@ -369,142 +438,180 @@ def _build_rag_documents(context_data: dict[str, Any]) -> list[dict[str, str]]:
             "source": "general",
         }
     )
-    documents.extend(_build_csv_documents())
+    documents.extend(iter_csv_documents(_DATA_DIR))
     return documents
 
 
-def _build_csv_documents(chunk_size: int = 200) -> list[dict[str, str]]:
-    documents: list[dict[str, str]] = []
-    if not _DATA_DIR.exists():
-        return documents
-
-    csv_paths = list(_DATA_DIR.rglob("*.csv"))
-    for csv_path in csv_paths:
-        if not csv_path.is_file():
-            continue
-        # Skip tiny or auxiliary files that are not datasets.
-        if csv_path.name.lower().endswith(".source"):
-            continue
-        try:
-            rel_path = csv_path.relative_to(_DATA_DIR)
-        except Exception:
-            rel_path = csv_path.name
-
-        try:
-            reader = pd.read_csv(csv_path, chunksize=chunk_size)
-        except Exception:
-            continue
-
-        for chunk_idx, chunk in enumerate(reader):
-            if chunk.empty:
-                continue
-            rows_text: list[str] = []
-            for row_idx, row in chunk.iterrows():
-                parts = []
-                for col, val in row.items():
-                    if pd.isna(val):
-                        continue
-                    text_val = str(val).strip()
-                    if text_val == "":
-                        continue
-                    parts.append(f"{col}={text_val}")
-                if not parts:
-                    continue
-                rows_text.append(f"row {row_idx}: " + ", ".join(parts))
-
-            if not rows_text:
-                continue
-            text = "\n".join(rows_text)
-            documents.append(
-                {
-                    "id": f"csv::{rel_path}::chunk{chunk_idx}",
-                    "title": f"Dataset {rel_path} (rows {chunk_idx * chunk_size}-{chunk_idx * chunk_size + len(chunk) - 1})",
-                    "text": text,
-                    "source": str(rel_path),
-                }
-            )
-
-    return documents
-
-
-def _load_embeddings_cache() -> dict[str, Any] | None:
-    if not _EMBEDDINGS_CACHE_PATH.exists():
-        return None
+def _load_embeddings_cache() -> EmbeddingStore | None:
     try:
-        with _EMBEDDINGS_CACHE_PATH.open("r", encoding="utf-8") as handle:
-            return json.load(handle)
+        return load_embedding_store(
+            _EMBEDDINGS_STORE_STEM, legacy_path=_EMBEDDINGS_CACHE_PATH
+        )
     except Exception:
         return None
 
 
-def _save_embeddings_cache(payload: dict[str, Any]) -> None:
-    try:
-        _EMBEDDINGS_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
-        with _EMBEDDINGS_CACHE_PATH.open("w", encoding="utf-8") as handle:
-            json.dump(payload, handle)
-    except Exception:
-        return None
+_openai_client: tuple[str, Any] | None = None
+_openai_client_lock = threading.Lock()
 
 
 def _get_openai_client() -> Any | None:
+    """Return one OpenAI client per API key so its connection pool is reused."""
+    global _openai_client
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         return None
+    with _openai_client_lock:
+        if _openai_client is not None and _openai_client[0] == api_key:
+            return _openai_client[1]
+        try:
+            from openai import OpenAI  # type: ignore
+        except Exception:
+            return None
+        _openai_client = (api_key, OpenAI(api_key=api_key))
+        return _openai_client[1]
+
+
+def _is_openai_outage(exc: Exception) -> bool:
+    """Connection errors, timeouts, rate limits and 5xx count against the breaker.
+
+    Other API errors (bad request, auth, context length) mean OpenAI is up.
+    """
     try:
-        from openai import OpenAI  # type: ignore
+        import openai  # type: ignore
     except Exception:
-        return None
-    return OpenAI(api_key=api_key)
+        return False
+    if isinstance(exc, (openai.APIConnectionError, openai.APITimeoutError, openai.RateLimitError)):
+        return True
+    return isinstance(exc, openai.APIStatusError) and exc.status_code >= 500
 
 
-def _embed_texts(texts: list[str], model: str) -> list[list[float]] | None:
+def _record_openai_error(exc: Exception, latency: float | None) -> None:
+    if _is_openai_outage(exc):
+        _OPENAI_BREAKER.record_failure()
+    else:
+        _OPENAI_BREAKER.record_success(latency)
+
+
+def _embed_texts(
+    texts: list[str],
+    model: str,
+    *,
+    timeout: float = _EMBED_BATCH_TIMEOUT_SECONDS,
+    guarded: bool = False,
+) -> list[list[float]] | None:
+    """Embed ``texts``; ``guarded`` calls go through the OpenAI breaker and are not retried."""
     client = _get_openai_client()
     if client is None:
         return None
+    if guarded and not _OPENAI_BREAKER.allow_request():
+        return None
     try:
-        response = client.embeddings.create(
-            model=model, input=texts, encoding_format="float"
-        )
-        return [item.embedding for item in response.data]
-    except Exception:
+        response = client.with_options(
+            timeout=timeout, max_retries=0 if guarded else 2
+        ).embeddings.create(model=model, input=texts, encoding_format="float")
+    except Exception as exc:
+        if guarded:
+            # Embedding latency says nothing about chat latency; keep it out of the timeout.
+            _record_openai_error(exc, None)
         return None
+    if guarded:
+        _OPENAI_BREAKER.record_success()
+    return [item.embedding for item in response.data]
+
+
+def _embed_query(query: str, model: str, deadline: float | None = None) -> list[float] | None:
+    """Embed the query as typed; only the cache key is normalized."""
+    cache_key = f"{model}\x1f{normalize_text(query)}"
+
+    def _load() -> list[float] | None:
+        timeout = _call_timeout(_OPENAI_BREAKER, deadline)
+        if timeout is None:
+            return None
+        embeddings = _embed_texts([query], model, timeout=timeout, guarded=True)
+        return embeddings[0] if embeddings else None
+
+    return _QUERY_EMBEDDING_CACHE.get_or_load(cache_key, _load)
+
+
+_vector_index: tuple[EmbeddingStore, VectorIndex] | None = None
+_vector_index_lock = threading.Lock()
+
+
+def _get_vector_index(store: EmbeddingStore) -> VectorIndex:
+    """Index for ``store`` (kind from ``RAG_INDEX``), built or loaded once."""
+    global _vector_index
+    with _vector_index_lock:
+        if _vector_index is None or _vector_index[0] is not store:
+            index = load_or_build_index(
+                store.matrix, _VECTOR_INDEX_DIR, fingerprint=store.fingerprint
+            )
+            _vector_index = (store, index)
+        return _vector_index[1]
+
 
+_EMBEDDING_REBUILDER = EmbeddingRebuilder(
+    _EMBEDDINGS_STORE_STEM, lambda texts, model: _embed_texts(texts, model)
+)
+# How often a chat request may re-scan data/ for changes.
+_SIGNATURE_CHECK_SECONDS = 300.0
+_last_signature_check = 0.0
+
+
+def start_embedding_rebuild(context_data: dict[str, Any], *, force: bool = False) -> bool:
+    """
+    Start an incremental embedding rebuild in the background.
+    Only new or changed documents are embedded; returns False if nothing to do.
+    """
+    model = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+    store = _load_embeddings_cache()
+    signature = _build_dataset_signature()
+    if (
+        not force
+        and store is not None
+        and store.model == model
+        and store.signature == signature
+    ):
+        return False
+    return _EMBEDDING_REBUILDER.start(
+        lambda: _build_rag_documents(context_data),
+        store=store,
+        model=model,
+        signature=signature,
+    )
 
-def _ensure_embeddings(context_data: dict[str, Any]) -> dict[str, Any] | None:
+
+def get_embedding_rebuild_status() -> RebuildStatus:
+    return _EMBEDDING_REBUILDER.status()
+
+
+def wait_for_embedding_rebuild(timeout: float | None = None) -> bool:
+    return _EMBEDDING_REBUILDER.wait(timeout)
+
+
+def _ensure_embeddings(context_data: dict[str, Any]) -> EmbeddingStore | None:
     """
-    Use cached embeddings if present. Avoid long rebuilds during chat.
-    To force rebuild, set RAG_REBUILD=1 and restart the app.
+    Use cached embeddings if present; never embed the corpus during chat.
+    When data/ changed (checked every few minutes) an incremental rebuild starts
+    in the background and the current store keeps serving. Without a store, set
+    RAG_REBUILD=1 to build one in the background.
     """
+    global _last_signature_check
     model = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
     cache = _load_embeddings_cache()
-    if cache and cache.get("model") == model:
+    now = time.monotonic()
+    if cache is not None and cache.model == model:
+        if now - _last_signature_check >= _SIGNATURE_CHECK_SECONDS:
+            _last_signature_check = now
+            if cache.signature != _build_dataset_signature():
+                start_embedding_rebuild(context_data)
         return cache
 
-    if os.getenv("RAG_REBUILD", "0").strip() != "1":
-        return None
-
-    documents = _build_rag_documents(context_data)
-    signature = _build_dataset_signature()
-    texts = [doc["text"] for doc in documents]
-    embeddings = _embed_texts(texts, model)
-    if embeddings is None:
-        return None
-    payload = {
-        "model": model,
-        "signature": signature,
-        "documents": [
-            {
-                "id": doc["id"],
-                "title": doc["title"],
-                "text": doc["text"],
-                "source": doc["source"],
-                "embedding": emb,
-            }
-            for doc, emb in zip(documents, embeddings)
-        ],
-    }
-    _save_embeddings_cache(payload)
-    return payload
+    rebuild_requested = os.getenv("RAG_REBUILD", "0").strip() == "1"
+    if rebuild_requested and now - _last_signature_check >= _SIGNATURE_CHECK_SECONDS:
+        _last_signature_check = now
+        start_embedding_rebuild(context_data)
+    return None
 
 
 def _build_dataset_signature() -> dict[str, Any]:
@@ -518,6 +625,11 @@ def _build_dataset_signature() -> dict[str, Any]:
             continue
         if path.name == "ai_chat_history.json":
             continue
+        # Generated retrieval artifacts and caches are not part of the source data.
+        if path.name.startswith("ai_agri_") or path.parent.name.startswith("ai_agri_"):
+            continue
+        if "processed" in path.relative_to(_DATA_DIR).parts:
+            continue
         try:
             rel_path = path.relative_to(_DATA_DIR)
         except Exception:
@@ -533,36 +645,112 @@ def _build_dataset_signature() -> dict[str, Any]:
     return signature
 
 
-def _retrieve_rag_context(query: str, context_data: dict[str, Any], top_k: int = 4) -> list[dict[str, str]]:
+_bm25_index: BM25Index | None = None
+_bm25_lock = threading.Lock()
+_last_bm25_signature_check = 0.0
+
+
+def _get_bm25_index(context_data: dict[str, Any]) -> BM25Index | None:
+    """
+    Load the persisted BM25 index once per process. Like the embeddings, data/
+    is re-scanned every few minutes and the index is rebuilt when it changed;
+    the old index keeps serving if the rebuild fails.
+    """
+    global _bm25_index, _last_bm25_signature_check
+    with _bm25_lock:
+        now = time.monotonic()
+        if _bm25_index is not None and now - _last_bm25_signature_check < _SIGNATURE_CHECK_SECONDS:
+            return _bm25_index
+        _last_bm25_signature_check = now
+        signature = _build_dataset_signature()
+        if _bm25_index is not None and _bm25_index.signature == signature:
+            return _bm25_index
+        index = load_bm25_index(_BM25_INDEX_DIR)
+        if index is None or index.signature != signature:
+            try:
+                index = BM25Index.build(_build_rag_documents(context_data), signature=signature)
+            except Exception:
+                return _bm25_index
+            try:
+                index.save(_BM25_INDEX_DIR)
+            except OSError:
+                pass
+        _bm25_index = index
+        return index
+
+
+def _doc_result(item: dict[str, str]) -> dict[str, str]:
+    return {
+        "id": item.get("id", ""),
+        "title": item.get("title", "Context"),
+        "text": item.get("text", ""),
+        "source": item.get("source", "unknown"),
+    }
+
+
+def _embedding_search(
+    query: str, context_data: dict[str, Any], top_k: int, deadline: float | None = None
+) -> list[dict[str, str]] | None:
+    """Embedding hits, or ``None`` when embeddings are unavailable or out of time."""
     cache = _ensure_embeddings(context_data)
-    if cache is None:
-        return []
-    model = cache.get("model", "text-embedding-3-small")
-    query_embs = _embed_texts([query], model)
-    if not query_embs:
-        return []
+    if cache is None or not len(cache):
+        return None
+    query_emb = _embed_query(query, cache.model, deadline)
+    if query_emb is None:
+        return None
+    index = _get_vector_index(cache)
+    hits = index.search(cache.normalize_query(query_emb), top_k)
+    return [_doc_result(cache.documents[idx]) for idx, _score in hits]
 
-    query_vec = np.array(query_embs[0], dtype=np.float32)
-    doc_items = cache.get("documents", [])
-    if not doc_items:
+
+def _bm25_search(query: str, context_data: dict[str, Any], top_k: int) -> list[dict[str, str]]:
+    index = _get_bm25_index(context_data)
+    if index is None:
         return []
+    return [_doc_result(index.documents[idx]) for idx, _score in index.search(query, top_k)]
 
-    doc_vectors = np.array([item["embedding"] for item in doc_items], dtype=np.float32)
-    norms = np.linalg.norm(doc_vectors, axis=1) * (np.linalg.norm(query_vec) + 1e-8)
-    scores = (doc_vectors @ query_vec) / (norms + 1e-8)
-    top_idx = np.argsort(scores)[-top_k:][::-1]
 
-    results: list[dict[str, str]] = []
-    for idx in top_idx:
-        item = doc_items[int(idx)]
-        results.append(
-            {
-                "title": item.get("title", "Context"),
-                "text": item.get("text", ""),
-                "source": item.get("source", "unknown"),
-            }
-        )
-    return results
+def _fuse_rankings(rankings: list[list[dict[str, str]]], top_k: int) -> list[dict[str, str]]:
+    """Reciprocal rank fusion keyed by document id."""
+    scores: dict[str, float] = {}
+    docs: dict[str, dict[str, str]] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking):
+            key = doc["id"] or doc["title"]
+            scores[key] = scores.get(key, 0.0) + 1.0 / (60 + rank)
+            docs.setdefault(key, doc)
+    ordered = sorted(scores, key=scores.__getitem__, reverse=True)
+    return [docs[key] for key in ordered[:top_k]]
+
+
+def _retrieve_rag_context(
+    query: str,
+    context_data: dict[str, Any],
+    top_k: int = 4,
+    *,
+    deadline: float | None = None,
+) -> list[dict[str, str]]:
+    """
+    Retrieve grounding notes. RAG_RETRIEVAL picks the strategy:
+    auto (embeddings when available, else BM25), bm25, embedding or hybrid.
+    The query embedding shares the chat ``deadline``; when it is spent or the
+    OpenAI breaker is open, auto and hybrid retrieval use BM25 alone.
+    """
+    mode = os.getenv("RAG_RETRIEVAL", "auto").strip().lower()
+    if mode not in _RAG_RETRIEVAL_MODES:
+        mode = "auto"
+
+    if mode == "bm25":
+        return _bm25_search(query, context_data, top_k)
+    if mode == "hybrid":
+        semantic = _embedding_search(query, context_data, top_k * 2, deadline) or []
+        lexical = _bm25_search(query, context_data, top_k * 2)
+        return _fuse_rankings([semantic, lexical], top_k)
+
+    semantic = _embedding_search(query, context_data, top_k, deadline)
+    if semantic is not None or mode == "embedding":
+        return semantic or []
+    return _bm25_search(query, context_data, top_k)
 
 
 @lru_cache(maxsize=1)
@@ -574,7 +762,7 @@ def load_context_data() -> dict[str, Any]:
         with _CROP_DETAILS_PATH.open("r", encoding="utf-8") as handle:
             raw = json.load(handle)
         crop_details = {
-            _normalize_crop_key(key): value
+            normalize_crop_key(key): value
             for key, value in raw.items()
             if isinstance(value, dict)
         }
@@ -589,38 +777,51 @@ def load_context_data() -> dict[str, Any]:
     return {
         "crop_details": crop_details,
         "soil_profiles": soil_profiles,
+        "matcher": _build_query_matcher(crop_details),
+        "prompts": PromptBuilder(crop_details, soil_profiles, char_budget=_PROMPT_CHAR_BUDGET),
     }
 
 
+def _build_query_matcher(crop_details: dict[str, dict[str, Any]]) -> QueryMatcher:
+    return QueryMatcher(
+        aliases=_CROP_ALIASES,
+        crop_details=crop_details,
+        intents=_KEYWORD_INTENTS,
+        topics=_TOPIC_KEYWORDS,
+    )
+
+
+# Keyword-only matcher for checks that do not need the crop catalog.
+_KEYWORD_MATCHER = _build_query_matcher({})
+
+
+def _match_query(query: str, context_data: dict[str, Any] | None = None) -> QueryMatch:
+    if context_data is None:
+        return _KEYWORD_MATCHER.match(query)
+    matcher = context_data.get("matcher")
+    if not isinstance(matcher, QueryMatcher):
+        matcher = _build_query_matcher(context_data.get("crop_details", {}))
+    return matcher.match(query)
+
+
 def _contains_agri_intent(query: str) -> bool:
-    normalized = _normalize_text(query)
-    return any(keyword in normalized for keyword in _AGRI_KEYWORDS)
+    return "agri" in _match_query(query).intents
 
 
 def _detect_topics(query: str) -> list[str]:
-    normalized = _normalize_text(query)
-    topics: list[str] = []
-    for topic, keywords in _TOPIC_KEYWORDS.items():
-        if any(keyword in normalized for keyword in keywords):
-            topics.append(topic)
-    return topics
+    return list(_match_query(query).topics)
 
 
 def _is_utilization_query(query: str) -> bool:
-    normalized = _normalize_text(query)
-    return any(keyword in normalized for keyword in _TOPIC_KEYWORDS["utilization"])
+    return "utilization" in _match_query(query).topics
 
 
 def _is_non_agri_query(query: str) -> bool:
-    normalized = _normalize_text(query)
-    if not normalized:
-        return False
-    return any(keyword in normalized for keyword in _NON_AGRI_KEYWORDS)
+    return "non_agri" in _match_query(query).intents
 
 
 def _is_npk_query(query: str) -> bool:
-    normalized = _normalize_text(query)
-    return any(keyword in normalized for keyword in _NPK_KEYWORDS)
+    return "npk" in _match_query(query).intents
 
 
 def _build_npk_response(crop_key: str, crop: dict[str, Any]) -> str:
@@ -641,51 +842,27 @@ def _build_npk_response(crop_key: str, crop: dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
-def _extract_crop(query: str, context_data: dict[str, Any]) -> tuple[str | None, dict[str, Any] | None]:
-    normalized = _normalize_text(query)
-    normalized_key = _normalize_crop_key(normalized)
+def _primary_crop(
+    match: QueryMatch, context_data: dict[str, Any]
+) -> tuple[str | None, dict[str, Any] | None]:
+    if match.primary is None:
+        return None, None
+    return match.primary, context_data.get("crop_details", {}).get(match.primary)
+
+
+def _matched_crops(
+    match: QueryMatch, context_data: dict[str, Any]
+) -> list[tuple[str, dict[str, Any]]]:
     crop_details = context_data.get("crop_details", {})
+    return [(crop.key, crop_details[crop.key]) for crop in match.crops if crop.key in crop_details]
 
-    for alias, canonical in _CROP_ALIASES.items():
-        if alias in normalized_key and canonical in crop_details:
-            return canonical, crop_details.get(canonical)
 
-    for key, details in crop_details.items():
-        name = str(details.get("name", key))
-        if _normalize_crop_key(name) in normalized_key:
-            return key, details
-        if key and key in normalized_key:
-            return key, details
-    return None, None
+def _extract_crop(query: str, context_data: dict[str, Any]) -> tuple[str | None, dict[str, Any] | None]:
+    return _primary_crop(_match_query(query, context_data), context_data)
 
 
 def _extract_crops(query: str, context_data: dict[str, Any]) -> list[tuple[str, dict[str, Any]]]:
-    normalized = _normalize_text(query)
-    normalized_key = _normalize_crop_key(normalized)
-    crop_details = context_data.get("crop_details", {})
-    found: list[tuple[int, str, dict[str, Any]]] = []
-    seen: set[str] = set()
-
-    for alias, canonical in _CROP_ALIASES.items():
-        if alias in normalized_key and canonical in crop_details and canonical not in seen:
-            idx = normalized_key.find(alias)
-            found.append((idx if idx >= 0 else 10_000, canonical, crop_details[canonical]))
-            seen.add(canonical)
-
-    for key, details in crop_details.items():
-        name = str(details.get("name", key))
-        key_norm = _normalize_crop_key(name)
-        if key in seen:
-            continue
-        idx = normalized_key.find(key)
-        idx_name = normalized_key.find(key_norm) if key_norm else -1
-        match_idx = idx if idx >= 0 else idx_name
-        if match_idx >= 0:
-            found.append((match_idx, key, details))
-            seen.add(key)
-
-    found.sort(key=lambda x: x[0])
-    return [(key, details) for _, key, details in found]
+    return _matched_crops(_match_query(query, context_data), context_data)
 
 
 def _estimate_crop_water_range_mm(crop_key: str, crop: dict[str, Any]) -> tuple[float, float] | None:
@@ -733,7 +910,7 @@ def _format_soil_profiles(context_data: dict[str, Any]) -> str:
 
 
 def _general_agri_response(query: str, context_data: dict[str, Any], topics: list[str]) -> str:
-    normalized = _normalize_text(query)
+    normalized = normalize_text(query)
     crop_details = context_data.get("crop_details", {})
     crop_items = [
         (
@@ -838,13 +1015,14 @@ def _build_rule_based_response(
     query: str,
     context_data: dict[str, Any],
 ) -> str:
-    matched_crops = _extract_crops(query, context_data)
-    probe_crop_key, probe_crop = _extract_crop(query, context_data)
-    if not _contains_agri_intent(query) and not probe_crop:
+    match = _match_query(query, context_data)
+    matched_crops = _matched_crops(match, context_data)
+    probe_crop_key, probe_crop = _primary_crop(match, context_data)
+    if "agri" not in match.intents and not probe_crop:
         return _NON_AGRI_REPLY
 
     crop_key, crop = probe_crop_key, probe_crop
-    topics = _detect_topics(query)
+    topics = list(match.topics)
 
     # Focused comparison mode for questions like "which needs less water: crop A or crop B?"
     if len(matched_crops) >= 2 and "water" in topics:
@@ -944,70 +1122,81 @@ def _build_rule_based_response(
     return "\n".join(lines)
 
 
+def _chat_prompts(
+    query: str,
+    context_data: dict[str, Any],
+    retrieved_docs: list[dict[str, str]] | None = None,
+) -> tuple[str, str]:
+    """System and user prompts shared by every provider and call style."""
+    crop_key, crop = _extract_crop(query, context_data)
+    builder = context_data.get("prompts")
+    if not isinstance(builder, PromptBuilder):
+        # Context built elsewhere: serialize just the matched crop, not every crop.
+        builder = PromptBuilder(
+            {crop_key: crop} if crop_key and crop else {},
+            context_data.get("soil_profiles", []),
+            char_budget=_PROMPT_CHAR_BUDGET,
+        )
+    return builder.build(query, crop_key, context_data.get("conversation", []), retrieved_docs)
+
+
+def _gemini_model() -> str:
+    configured_model = os.getenv("GEMINI_MODEL", "gemini-1.5-flash").strip()
+    model = configured_model or "gemini-1.5-flash"
+    if model.startswith("models/"):
+        model = model.split("/", 1)[1]
+    return model
+
+
+def _gemini_payload(text: str, system: str) -> dict[str, Any]:
+    return {
+        "contents": [{"parts": [{"text": text}]}],
+        "systemInstruction": {"parts": [{"text": system}]},
+        "generationConfig": {"temperature": 0.2},
+    }
+
+
 def _openai_response(
     query: str,
     context_data: dict[str, Any],
     retrieved_docs: list[dict[str, str]] | None = None,
+    *,
+    deadline: float | None = None,
+    cancel: threading.Event | None = None,
 ) -> str | None:
-    global _LAST_AI_ERROR
     client = _get_openai_client()
     if client is None:
         _append_ai_error("OpenAI API key missing or OpenAI package unavailable.")
         return None
 
-    crop_key, crop = _extract_crop(query, context_data)
-    conversation = context_data.get("conversation", [])
-    compact_context = {
-        "crop": crop if crop else "No exact crop matched. Ask user to mention crop name.",
-        "soil_profiles": context_data.get("soil_profiles", [])[:5],
-        "conversation": conversation[-6:] if isinstance(conversation, list) else [],
-    }
-
-    system_prompt = (
-        "You are an expert agricultural advisor focused on crops, soil science, fertilizers, irrigation, "
-        "pest and disease management, seasonal cropping systems, organic farming, and sustainable practices. "
-        "You ONLY answer agriculture-related questions. If the question is unrelated to agriculture, refuse "
-        "with exactly: "
-        "'I am your Agricultural Advisory Assistant. Please ask crop or farming related questions.' "
-        "Tone: calm, practical, field-ready, and respectful. "
-        "Avoid rigid templates. Vary structure naturally based on the question; answer directly. "
-        "Use bullets only when it improves clarity. "
-        "Avoid overclaiming or inventing real-time facts. If local conditions matter (weather, market, "
-        "regulations), ask for location and advise checking local extension advisories. "
-        "When suggesting pesticides or nutrient doses, include safety precautions (PPE, label adherence, "
-        "waiting period) and prefer integrated pest management."
-    )
-
-    rag_context = ""
-    if retrieved_docs:
-        blocks = []
-        for doc in retrieved_docs[:4]:
-            title = doc.get("title", "Context")
-            text = doc.get("text", "")
-            if len(text) > 800:
-                text = text[:800] + "..."
-            blocks.append(f"[{title}]\n{text}")
-        rag_context = "\n\n".join(blocks)
-
-    user_prompt = (
-        f"User query: {query}\n\n"
-        f"Local dataset context (JSON): {json.dumps(compact_context, ensure_ascii=True)}\n\n"
-        f"Retrieved notes (if relevant):\n{rag_context}\n\n"
-        "Answer in plain text. Keep the response focused on the user’s question. "
-        "Do not follow a fixed template; vary the structure naturally. "
-        "Include safety cautions only when recommending pesticides or specific doses. "
-        "If retrieved notes are relevant, use them; otherwise rely on general agronomy knowledge."
-    )
+    system_prompt, user_prompt = _chat_prompts(query, context_data, retrieved_docs)
 
+    if cancel is not None and cancel.is_set():
+        return None
+    timeout = _call_timeout(_OPENAI_BREAKER, deadline)
+    if timeout is None:
+        _append_ai_error("OpenAI skipped: response deadline reached.")
+        return None
+    if not _OPENAI_BREAKER.allow_request():
+        _append_ai_error("OpenAI skipped after repeated failures.")
+        return None
+    started = time.perf_counter()
     try:
-        completion = client.chat.completions.create(
-            model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-            temperature=0.2,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-        )
+        try:
+            completion = client.with_options(
+                timeout=timeout, max_retries=0
+            ).chat.completions.create(
+                model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+                temperature=0.2,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+            )
+        except Exception as exc:
+            _record_openai_error(exc, time.perf_counter() - started)
+            raise
+        _OPENAI_BREAKER.record_success(time.perf_counter() - started)
         text = completion.choices[0].message.content if completion.choices else None
         if text:
             return text.strip()
@@ -1022,146 +1211,462 @@ def _gemini_response(
     query: str,
     context_data: dict[str, Any],
     retrieved_docs: list[dict[str, str]] | None = None,
+    *,
+    deadline: float | None = None,
+    cancel: threading.Event | None = None,
 ) -> str | None:
-    global _LAST_AI_ERROR
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         _append_ai_error("GEMINI_API_KEY is missing.")
         return None
 
-    configured_model = os.getenv("GEMINI_MODEL", "gemini-1.5-flash").strip()
-    model = configured_model or "gemini-1.5-flash"
-    if model.startswith("models/"):
-        model = model.split("/", 1)[1]
-
-    crop_key, crop = _extract_crop(query, context_data)
-    conversation = context_data.get("conversation", [])
-    compact_context = {
-        "crop": crop if crop else "No exact crop matched. Ask user to mention crop name.",
-        "soil_profiles": context_data.get("soil_profiles", [])[:5],
-        "conversation": conversation[-6:] if isinstance(conversation, list) else [],
-    }
-
-    system_text = (
-        "You are an expert agricultural advisor focused on crops, soil science, fertilizers, irrigation, "
-        "pest and disease management, seasonal cropping systems, organic farming, and sustainable practices. "
-        "You ONLY answer agriculture-related questions. If the question is unrelated to agriculture, refuse "
-        "with exactly: "
-        "'I am your Agricultural Advisory Assistant. Please ask crop or farming related questions.' "
-        "Tone: calm, practical, field-ready, and respectful. "
-        "Avoid rigid templates. Vary structure naturally based on the question; answer directly. "
-        "Use bullets only when it improves clarity. "
-        "Avoid overclaiming or inventing real-time facts. If local conditions matter (weather, market, "
-        "regulations), ask for location and advise checking local extension advisories. "
-        "When suggesting pesticides or nutrient doses, include safety precautions (PPE, label adherence, "
-        "waiting period) and prefer integrated pest management."
-    )
-
-    rag_context = ""
-    if retrieved_docs:
-        blocks = []
-        for doc in retrieved_docs[:4]:
-            title = doc.get("title", "Context")
-            text = doc.get("text", "")
-            if len(text) > 800:
-                text = text[:800] + "..."
-            blocks.append(f"[{title}]\n{text}")
-        rag_context = "\n\n".join(blocks)
-
-    user_text = (
-        f"User query: {query}\n\n"
-        f"Local dataset context (JSON): {json.dumps(compact_context, ensure_ascii=True)}\n\n"
-        f"Retrieved notes (if relevant):\n{rag_context}\n\n"
-        "Answer in plain text. Keep the response focused on the user’s question. "
-        "Do not follow a fixed template; vary the structure naturally. "
-        "Include safety cautions only when recommending pesticides or specific doses. "
-        "If retrieved notes are relevant, use them; otherwise rely on general agronomy knowledge."
-    )
-
-    def _call_gemini(text: str, system: str) -> str | None:
-        payload = {
-            "contents": [{"parts": [{"text": text}]}],
-            "systemInstruction": {"parts": [{"text": system}]},
-            "generationConfig": {"temperature": 0.2},
-        }
+    model = _gemini_model()
+
+    system_text, user_text = _chat_prompts(query, context_data, retrieved_docs)
+
+    def _call_gemini(text: str, system: str) -> tuple[str | None, bool]:
+        """Return the reply and whether a slimmer prompt is worth retrying."""
+        if cancel is not None and cancel.is_set():
+            return None, False
+        timeout = _call_timeout(_GEMINI_BREAKER, deadline)
+        if timeout is None:
+            _append_ai_error("Gemini skipped: response deadline reached.")
+            return None, False
+        if not _GEMINI_BREAKER.allow_request():
+            _append_ai_error("Gemini skipped after repeated failures.")
+            return None, False
+        payload = _gemini_payload(text, system)
         url = (
             "https://generativelanguage.googleapis.com/v1beta/models/"
             f"{model}:generateContent?key={api_key}"
         )
-        response = requests.post(url, json=payload, timeout=20)
+        started = time.perf_counter()
+        try:
+            response = _GEMINI_HTTP.post(url, json=payload, timeout=timeout)
+        except requests.RequestException:
+            _GEMINI_BREAKER.record_failure()
+            raise
+        outage = response.status_code >= 500 or response.status_code == 429
+        if outage:
+            _GEMINI_BREAKER.record_failure()
+        else:
+            _GEMINI_BREAKER.record_success(time.perf_counter() - started)
         if response.status_code >= 400:
             snippet = response.text.strip()
             if len(snippet) > 200:
                 snippet = snippet[:200] + "..."
             _append_ai_error(f"Gemini error {response.status_code}: {snippet}")
-            return None
+            return None, not outage
         data = response.json()
         candidates = data.get("candidates", [])
         if not candidates:
             _append_ai_error("Gemini returned no candidates.")
-            return None
+            return None, True
         content = candidates[0].get("content", {})
         parts = content.get("parts", [])
         text = "".join(str(part.get("text", "")) for part in parts).strip()
         if text:
-            return text
+            return text, False
         _append_ai_error("Gemini returned empty text.")
-        return None
+        return None, True
 
     try:
-        reply = _call_gemini(user_text, system_text)
-        if reply:
+        reply, retry_slim = _call_gemini(user_text, system_text)
+        if reply or not retry_slim:
             return reply
         # Fallback to a slimmer prompt if the request was too large or rejected.
-        slim_user_text = (
-            f"User query: {query}\n\n"
-            "Answer in plain text. Use short sections and bullet points when helpful. "
-            "Finish with a short Caution line and a Next step line."
-        )
-        return _call_gemini(slim_user_text, system_text)
+        return _call_gemini(slim_user_prompt(query), system_text)[0]
     except Exception as exc:
         _append_ai_error(f"Gemini request failed: {exc.__class__.__name__}")
         return None
 
 
+def _gemini_chunk_text(data: dict[str, Any]) -> str:
+    candidates = data.get("candidates", [])
+    if not candidates:
+        return ""
+    parts = candidates[0].get("content", {}).get("parts", [])
+    return "".join(str(part.get("text", "")) for part in parts)
+
+
+def _gemini_stream(
+    query: str,
+    context_data: dict[str, Any],
+    retrieved_docs: list[dict[str, str]] | None = None,
+    *,
+    deadline: float | None = None,
+    cancel: threading.Event | None = None,
+) -> Generator[str, None, None]:
+    """Yield Gemini text chunks from the server-sent-events endpoint.
+
+    Failures before the first chunk are recorded and end the stream quietly;
+    failures after it are raised so the caller knows the answer is partial.
+    """
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        _append_ai_error("GEMINI_API_KEY is missing.")
+        return
+
+    system_text, user_text = _chat_prompts(query, context_data, retrieved_docs)
+    url = (
+        "https://generativelanguage.googleapis.com/v1beta/models/"
+        f"{_gemini_model()}:streamGenerateContent?alt=sse&key={api_key}"
+    )
+    # Same as _gemini_response: one slimmer retry after a non-outage rejection.
+    for text in (user_text, slim_user_prompt(query)):
+        if cancel is not None and cancel.is_set():
+            return
+        timeout = _call_timeout(_GEMINI_BREAKER, deadline)
+        if timeout is None:
+            _append_ai_error("Gemini skipped: response deadline reached.")
+            return
+        if not _GEMINI_BREAKER.allow_request():
+            _append_ai_error("Gemini skipped after repeated failures.")
+            return
+        started = time.perf_counter()
+        yielded = False
+        try:
+            with _GEMINI_HTTP.stream(
+                "POST", url, json=_gemini_payload(text, system_text), timeout=timeout
+            ) as response:
+                outage = response.status_code >= 500 or response.status_code == 429
+                if response.status_code >= 400:
+                    if outage:
+                        _GEMINI_BREAKER.record_failure()
+                    else:
+                        _GEMINI_BREAKER.record_success(time.perf_counter() - started)
+                    snippet = response.text.strip()
+                    if len(snippet) > 200:
+                        snippet = snippet[:200] + "..."
+                    _append_ai_error(f"Gemini error {response.status_code}: {snippet}")
+                    if outage:
+                        return
+                    continue
+                for line in response.iter_lines(decode_unicode=True):
+                    if cancel is not None and cancel.is_set():
+                        return
+                    if not line or not line.startswith("data:"):
+                        continue
+                    piece = _gemini_chunk_text(json.loads(line[5:]))
+                    if not yielded:
+                        piece = piece.lstrip()
+                        if not piece:
+                            continue
+                        _GEMINI_BREAKER.record_success(time.perf_counter() - started)
+                        yielded = True
+                    if piece:
+                        yield piece
+        except (requests.RequestException, ValueError) as exc:
+            if yielded:
+                raise
+            # Dropped connections and undecodable events both mean no usable answer.
+            _GEMINI_BREAKER.record_failure()
+            _append_ai_error(f"Gemini request failed: {exc.__class__.__name__}")
+            return
+        finally:
+            # A cancelled or abandoned attempt must not keep the half-open probe.
+            _GEMINI_BREAKER.release_probe()
+        if yielded:
+            return
+        _GEMINI_BREAKER.record_success(time.perf_counter() - started)
+        _append_ai_error("Gemini returned empty text.")
+
+
+def _openai_stream(
+    query: str,
+    context_data: dict[str, Any],
+    retrieved_docs: list[dict[str, str]] | None = None,
+    *,
+    deadline: float | None = None,
+    cancel: threading.Event | None = None,
+) -> Generator[str, None, None]:
+    """Yield OpenAI chat completion deltas; error handling as in _gemini_stream."""
+    client = _get_openai_client()
+    if client is None:
+        _append_ai_error("OpenAI API key missing or OpenAI package unavailable.")
+        return
+
+    system_prompt, user_prompt = _chat_prompts(query, context_data, retrieved_docs)
+
+    if cancel is not None and cancel.is_set():
+        return
+    timeout = _call_timeout(_OPENAI_BREAKER, deadline)
+    if timeout is None:
+        _append_ai_error("OpenAI skipped: response deadline reached.")
+        return
+    if not _OPENAI_BREAKER.allow_request():
+        _append_ai_error("OpenAI skipped after repeated failures.")
+        return
+    started = time.perf_counter()
+    yielded = False
+    stream = None
+    try:
+        stream = client.with_options(
+            timeout=timeout, max_retries=0
+        ).chat.completions.create(
+            model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+            temperature=0.2,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            stream=True,
+        )
+        for chunk in stream:
+            if cancel is not None and cancel.is_set():
+                return
+            piece = chunk.choices[0].delta.content if chunk.choices else None
+            if not yielded:
+                piece = (piece or "").lstrip()
+                if not piece:
+                    continue
+                _OPENAI_BREAKER.record_success(time.perf_counter() - started)
+                yielded = True
+            if piece:
+                yield piece
+    except Exception as exc:
+        if yielded:
+            raise
+        _record_openai_error(exc, time.perf_counter() - started)
+        _append_ai_error(f"OpenAI request failed: {exc.__class__.__name__} {exc}")
+        return
+    finally:
+        # A cancelled or abandoned attempt must not keep the half-open probe.
+        _OPENAI_BREAKER.release_probe()
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+    if not yielded:
+        _OPENAI_BREAKER.record_success(time.perf_counter() - started)
+        _append_ai_error("OpenAI returned an empty response.")
+
+
+@dataclass(frozen=True, slots=True)
+class _OpenedStream:
+    first: str
+    rest: Generator[str, None, None]
+
+    def close(self) -> None:
+        """Release the provider response (and its HTTP slot) without reading it."""
+        self.rest.close()
+
+
+def _open_stream(
+    chunks: Generator[str, None, None], cancel: threading.Event
+) -> _OpenedStream | None:
+    """Wait for the first chunk, so hedging races providers on time to first token."""
+    first = next(chunks, None)
+    if first is None:
+        return None
+    if cancel.is_set():
+        chunks.close()
+        return None
+    return _OpenedStream(first, chunks)
+
+
+def _answer_cache_key(
+    query: str,
+    crop_key: str | None,
+    retrieved_docs: list[dict[str, str]],
+    context_data: dict[str, Any],
+) -> str:
+    models = (
+        f"gemini:{os.getenv('GEMINI_MODEL', 'gemini-1.5-flash').strip()}"
+        f"|openai:{os.getenv('OPENAI_MODEL', 'gpt-4o-mini')}"
+    )
+    parts = [
+        normalize_text(query),
+        crop_key or "",
+        ",".join(doc.get("id") or doc.get("title", "") for doc in retrieved_docs),
+        models,
+    ]
+    if not crop_key:
+        # Without a named crop the reply leans on the conversation, so key on it too.
+        conversation = context_data.get("conversation", [])
+        recent = conversation[-6:] if isinstance(conversation, list) else []
+        parts.append(json.dumps(recent, ensure_ascii=True, sort_keys=True, default=str))
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _prepare_ai_call(
+    query: str, context_data: dict[str, Any], crop_key: str | None
+) -> tuple[float, list[dict[str, str]], str]:
+    """Start the response deadline, then retrieve notes and derive the answer cache key."""
+    deadline = time.monotonic() + _LLM_DEADLINE_SECONDS
+    retrieved_docs = _retrieve_rag_context(query, context_data, deadline=deadline)
+    return deadline, retrieved_docs, _answer_cache_key(query, crop_key, retrieved_docs, context_data)
+
+
+def _ai_reply(query: str, context_data: dict[str, Any], crop_key: str | None) -> str | None:
+    """Gemini hedged with OpenAI under one deadline, cached per query, crop, documents and model."""
+    deadline, retrieved_docs, cache_key = _prepare_ai_call(query, context_data, crop_key)
+    cached = _ANSWER_CACHE.get(cache_key)
+    if cached:
+        return cached
+    result = run_hedged(
+        [
+            (
+                "gemini",
+                lambda cancel: _gemini_response(
+                    query, context_data, retrieved_docs, deadline=deadline, cancel=cancel
+                ),
+            ),
+            (
+                "openai",
+                lambda cancel: _openai_response(
+                    query, context_data, retrieved_docs, deadline=deadline, cancel=cancel
+                ),
+            ),
+        ],
+        hedge_delay=_LLM_HEDGE_DELAY,
+        deadline=deadline,
+    )
+    if result.timed_out:
+        _append_ai_error(f"AI providers exceeded the {_LLM_DEADLINE_SECONDS:g}s response deadline.")
+    if result.reply:
+        _ANSWER_CACHE.set(cache_key, result.reply)
+    return result.reply
+
+
+def chat_cache_stats() -> dict[str, CacheStats]:
+    return {
+        "query_embeddings": _QUERY_EMBEDDING_CACHE.stats(),
+        "answers": _ANSWER_CACHE.stats(),
+    }
+
+
+def _direct_reply(query: str, context_data: dict[str, Any]) -> tuple[str | None, str | None]:
+    """Return a reply that needs no AI call, or None plus the matched crop key."""
+    if not query:
+        return "Please ask a crop-related question (for example: 'fertilizer plan for cotton').", None
+
+    match = _match_query(query, context_data)
+    probe_crop_key, probe_crop = _primary_crop(match, context_data)
+    if "non_agri" in match.intents and "agri" not in match.intents and not probe_crop:
+        return _NON_AGRI_REPLY, probe_crop_key
+
+    if "npk" in match.intents and probe_crop:
+        return _build_npk_response(probe_crop_key, probe_crop), probe_crop_key
+    return None, probe_crop_key
+
+
 def generate_crop_response(user_query: str, context_data: dict[str, Any]) -> str:
     """
     Generate advisory response for user query using local dataset context.
     Falls back to rule-based response if OpenAI is unavailable.
     """
     query = (user_query or "").strip()
-    if not query:
-        return "Please ask a crop-related question (for example: 'fertilizer plan for cotton')."
+    direct, probe_crop_key = _direct_reply(query, context_data)
+    if direct is not None:
+        return direct
 
-    probe_crop_key, probe_crop = _extract_crop(query, context_data)
-    if _is_non_agri_query(query) and not _contains_agri_intent(query) and not probe_crop:
-        return _NON_AGRI_REPLY
-
-    matched_crops = _extract_crops(query, context_data)
-    topics = _detect_topics(query)
-
-    if _is_npk_query(query) and probe_crop:
-        return _build_npk_response(probe_crop_key, probe_crop)
-
-    if ("utilization" in topics or "nutrition" in query or "health" in query) and not probe_crop:
-        retrieved_docs = _retrieve_rag_context(query, context_data)
-        ai_reply = _gemini_response(query, context_data, retrieved_docs)
-        if ai_reply:
-            return ai_reply
-        ai_reply = _openai_response(query, context_data, retrieved_docs)
-        if ai_reply:
-            return ai_reply
-
-    global _LAST_AI_ERROR
-    _LAST_AI_ERROR = None
-    # Prefer Gemini, then OpenAI; fall back to dataset-based advisory.
-    retrieved_docs = _retrieve_rag_context(query, context_data)
-    ai_reply = _gemini_response(query, context_data, retrieved_docs)
-    if ai_reply:
-        return ai_reply
-    ai_reply = _openai_response(query, context_data, retrieved_docs)
+    _reset_ai_errors()
+    # Prefer Gemini, hedged with OpenAI; fall back to dataset-based advisory.
+    ai_reply = _ai_reply(query, context_data, probe_crop_key)
     if ai_reply:
         return ai_reply
 
     # Silent fallback: when AI providers fail/limit, respond from local dataset only.
     return _build_rule_based_response(query, context_data)
+
+
+@dataclass(slots=True)
+class StreamMetrics:
+    """Filled in while a ``stream_crop_response`` stream is consumed."""
+
+    source: str = ""
+    time_to_first_chunk: float | None = None
+    total_seconds: float | None = None
+    chunks: int = 0
+
+
+_STREAM_INTERRUPTED_NOTE = "\n\n_(The response was interrupted. Please ask again.)_"
+
+
+def stream_crop_response(
+    user_query: str,
+    context_data: dict[str, Any],
+    metrics: StreamMetrics | None = None,
+) -> Iterator[str]:
+    """
+    Streaming variant of generate_crop_response.
+    AI answers arrive chunk by chunk; cached, rule-based and canned replies
+    arrive as one chunk. ``metrics`` records time to first chunk and total time.
+    """
+    metrics = metrics if metrics is not None else StreamMetrics()
+    started = time.perf_counter()
+
+    def emit(chunk: str) -> str:
+        if metrics.time_to_first_chunk is None:
+            metrics.time_to_first_chunk = time.perf_counter() - started
+        metrics.chunks += 1
+        return chunk
+
+    try:
+        query = (user_query or "").strip()
+        direct, probe_crop_key = _direct_reply(query, context_data)
+        if direct is not None:
+            metrics.source = "rule_based"
+            yield emit(direct)
+            return
+
+        _reset_ai_errors()
+        deadline, retrieved_docs, cache_key = _prepare_ai_call(query, context_data, probe_crop_key)
+        cached = _ANSWER_CACHE.get(cache_key)
+        if cached:
+            metrics.source = "cache"
+            yield emit(cached)
+            return
+
+        providers: list[Provider[_OpenedStream]] = [
+            (
+                "gemini",
+                lambda cancel: _open_stream(
+                    _gemini_stream(
+                        query, context_data, retrieved_docs, deadline=deadline, cancel=cancel
+                    ),
+                    cancel,
+                ),
+            ),
+            (
+                "openai",
+                lambda cancel: _open_stream(
+                    _openai_stream(
+                        query, context_data, retrieved_docs, deadline=deadline, cancel=cancel
+                    ),
+                    cancel,
+                ),
+            ),
+        ]
+        result = run_hedged(
+            providers,
+            hedge_delay=_LLM_HEDGE_DELAY,
+            deadline=deadline,
+            discard=_OpenedStream.close,
+        )
+        if result.timed_out:
+            _append_ai_error(
+                f"AI providers exceeded the {_LLM_DEADLINE_SECONDS:g}s response deadline."
+            )
+        opened = result.reply
+        if opened is None:
+            metrics.source = "rule_based"
+            yield emit(_build_rule_based_response(query, context_data))
+            return
+
+        metrics.source = result.provider or ""
+        parts = [opened.first]
+        yield emit(opened.first)
+        try:
+            for piece in opened.rest:
+                parts.append(piece)
+                yield emit(piece)
+        except Exception as exc:
+            _append_ai_error(f"{metrics.source} stream interrupted: {exc.__class__.__name__}")
+            yield emit(_STREAM_INTERRUPTED_NOTE)
+            return
+        finally:
+            opened.rest.close()
+        _ANSWER_CACHE.set(cache_key, "".join(parts).strip())
+    finally:
+        metrics.total_seconds = time.perf_counter() - started
@@ -0,0 +1,94 @@
+"""Column-wise formatting of CSV chunks into RAG documents.
+
+Output matches the original ``iterrows`` builder line for line. Each row
+becomes ``row <index>: col=value, ...``, with NaN and blank cells skipped.
+Values are rendered from ``DataFrame.to_numpy()``, so all-numeric chunks are
+upcast to their common dtype exactly as ``iterrows`` does.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+__all__ = [
+    "format_chunk_rows",
+    "iter_csv_documents",
+]
+
+
+def _column_text(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return stripped string values and a mask of cells worth emitting."""
+
+    if values.dtype.kind in "biu":
+        text = values.astype(str).astype(object)
+        return text, np.ones(values.shape[0], dtype=bool)
+    if values.dtype.kind == "f":
+        text = values.astype(str).astype(object)
+        return text, ~np.isnan(values)
+    present = ~pd.isna(values)
+    text = np.array([str(value).strip() for value in values], dtype=object)
+    return text, present & (text != "")
+
+
+def format_chunk_rows(chunk: pd.DataFrame) -> list[str]:
+    """Format every non-empty row of ``chunk`` as ``row <index>: col=value, ...``."""
+
+    if chunk.empty:
+        return []
+    matrix = chunk.to_numpy()
+    # A common object dtype keeps each cell's own type, so format columns
+    # natively; a numeric common dtype is the iterrows upcast and must be used.
+    upcast = matrix.dtype != object
+    n_rows = matrix.shape[0]
+    line = np.full(n_rows, "", dtype=object)
+    has_parts = np.zeros(n_rows, dtype=bool)
+    for position, column in enumerate(chunk.columns):
+        values = matrix[:, position] if upcast else chunk.iloc[:, position].to_numpy()
+        text, valid = _column_text(values)
+        if not valid.any():
+            continue
+        separator = np.where(has_parts, ", ", "").astype(object)
+        line = np.where(valid, line + separator + f"{column}=" + text, line)
+        has_parts |= valid
+    if not has_parts.any():
+        return []
+    prefixes = np.array([f"row {index}: " for index in chunk.index], dtype=object)
+    return list((prefixes + line)[has_parts])
+
+
+def iter_csv_documents(data_dir: Path, chunk_size: int = 200) -> Iterator[dict[str, str]]:
+    """Lazily yield one document per ``chunk_size`` rows of each CSV under ``data_dir``."""
+
+    if not data_dir.exists():
+        return
+    for csv_path in data_dir.rglob("*.csv"):
+        if not csv_path.is_file():
+            continue
+        # Skip tiny or auxiliary files that are not datasets.
+        if csv_path.name.lower().endswith(".source"):
+            continue
+        try:
+            rel_path = csv_path.relative_to(data_dir)
+        except Exception:
+            rel_path = csv_path.name
+
+        try:
+            reader = pd.read_csv(csv_path, chunksize=chunk_size)
+        except Exception:
+            continue
+
+        for chunk_idx, chunk in enumerate(reader):
+            rows_text = format_chunk_rows(chunk)
+            if not rows_text:
+                continue
+            first_row = chunk_idx * chunk_size
+            yield {
+                "id": f"csv::{rel_path}::chunk{chunk_idx}",
+                "title": f"Dataset {rel_path} (rows {first_row}-{first_row + len(chunk) - 1})",
+                "text": "\n".join(rows_text),
+                "source": str(rel_path),
+            }
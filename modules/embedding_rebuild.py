@@ -0,0 +1,246 @@
+"""Incremental, background rebuilds of the RAG embedding store.
+
+Each document is hashed; rows whose hash is unchanged are copied from the
+current store, new or edited documents are embedded in bounded batches on a
+small thread pool, and documents that disappeared are dropped.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Callable, Literal, Sequence
+
+import numpy as np
+
+from modules.embedding_store import (
+    EmbeddingStore,
+    document_hash,
+    normalize_rows,
+    save_embedding_store,
+)
+
+__all__ = [
+    "EmbeddingRebuilder",
+    "RebuildPlan",
+    "RebuildStatus",
+    "plan_rebuild",
+]
+
+logger = logging.getLogger(__name__)
+
+RebuildState = Literal["idle", "running", "ready", "failed"]
+EmbedFn = Callable[[list[str], str], "list[list[float]] | None"]
+
+
+@dataclass(frozen=True, slots=True)
+class RebuildPlan:
+    """Which documents can reuse a stored vector and which need embedding."""
+
+    documents: tuple[dict[str, str], ...]
+    reuse_rows: dict[int, int]
+    to_embed: tuple[int, ...]
+    removed: int
+
+
+def plan_rebuild(
+    documents: Sequence[dict[str, Any]],
+    store: EmbeddingStore | None,
+    model: str,
+) -> RebuildPlan:
+    """Diff ``documents`` against ``store`` by id and content hash."""
+
+    hashed = tuple(
+        {**{k: str(v) for k, v in doc.items()}, "hash": document_hash(doc)} for doc in documents
+    )
+    existing: dict[tuple[str, str], int] = {}
+    reusable = store is not None and store.model == model
+    if reusable:
+        for row, doc in enumerate(store.documents):
+            existing[(doc.get("id", ""), doc.get("hash", ""))] = row
+    reuse_rows: dict[int, int] = {}
+    to_embed: list[int] = []
+    for position, doc in enumerate(hashed):
+        row = existing.get((doc.get("id", ""), doc["hash"]))
+        if row is None:
+            to_embed.append(position)
+        else:
+            reuse_rows[position] = row
+    if store is None:
+        removed = 0
+    elif reusable:
+        removed = len(store) - len(set(reuse_rows.values()))
+    else:
+        removed = len(store)
+    return RebuildPlan(hashed, reuse_rows, tuple(to_embed), removed)
+
+
+@dataclass(frozen=True, slots=True)
+class RebuildStatus:
+    """Snapshot of the background rebuild, safe to poll from the UI."""
+
+    state: RebuildState = "idle"
+    stage: str = "Not started"
+    total: int = 0
+    embedded: int = 0
+    reused: int = 0
+    removed: int = 0
+    started_at: float | None = None
+    finished_at: float | None = None
+    error: str | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.state == "running"
+
+    @property
+    def progress(self) -> float:
+        return self.embedded / self.total if self.total else (1.0 if self.state == "ready" else 0.0)
+
+
+def _batches(rows: Sequence[int], texts: Sequence[str], max_items: int, max_chars: int):
+    batch: list[int] = []
+    size = 0
+    for row in rows:
+        length = len(texts[row])
+        if batch and (len(batch) >= max_items or size + length > max_chars):
+            yield batch
+            batch, size = [], 0
+        batch.append(row)
+        size += length
+    if batch:
+        yield batch
+
+
+class EmbeddingRebuilder:
+    """Run incremental rebuilds on a daemon thread, one at a time."""
+
+    def __init__(
+        self,
+        stem: Path,
+        embed: EmbedFn,
+        *,
+        batch_size: int = 64,
+        max_batch_chars: int = 200_000,
+        max_workers: int = 4,
+    ) -> None:
+        self._stem = stem
+        self._embed = embed
+        self._batch_size = batch_size
+        self._max_batch_chars = max_batch_chars
+        self._max_workers = max_workers
+        self._status = RebuildStatus()
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def status(self) -> RebuildStatus:
+        return self._status
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+    def _update(self, **changes: object) -> None:
+        self._status = replace(self._status, **changes)
+
+    def start(
+        self,
+        documents: Callable[[], Sequence[dict[str, Any]]],
+        *,
+        store: EmbeddingStore | None,
+        model: str,
+        signature: dict[str, Any],
+    ) -> bool:
+        """Launch a rebuild unless one is already running."""
+
+        with self._lock:
+            if self._status.is_running:
+                return False
+            self._done.clear()
+            self._status = RebuildStatus(
+                state="running", stage="Collecting documents", started_at=time.time()
+            )
+            threading.Thread(
+                target=self._run,
+                args=(documents, store, model, signature),
+                name="embedding-rebuild",
+                daemon=True,
+            ).start()
+        return True
+
+    def _run(
+        self,
+        documents: Callable[[], Sequence[dict[str, Any]]],
+        store: EmbeddingStore | None,
+        model: str,
+        signature: dict[str, Any],
+    ) -> None:
+        try:
+            plan = plan_rebuild(documents(), store, model)
+            self._update(
+                stage="Embedding changed documents",
+                total=len(plan.to_embed),
+                reused=len(plan.reuse_rows),
+                removed=plan.removed,
+            )
+            vectors = self._embed_missing(plan, model)
+            self._update(stage="Saving embedding store")
+            dim = vectors.shape[1] if vectors.size else (store.dim if store is not None else 0)
+            matrix = np.zeros((len(plan.documents), dim), dtype=np.float32)
+            for position, row in plan.reuse_rows.items():
+                matrix[position] = store.matrix[row]  # type: ignore[union-attr]
+            if plan.to_embed:
+                matrix[list(plan.to_embed)] = vectors
+            save_embedding_store(
+                self._stem,
+                model=model,
+                signature=signature,
+                documents=plan.documents,
+                embeddings=matrix,
+                normalized=True,
+            )
+            self._update(state="ready", stage="Embeddings up to date", finished_at=time.time())
+            logger.info(
+                f"Embedding rebuild: {len(plan.to_embed)} embedded, "
+                f"{len(plan.reuse_rows)} reused, {plan.removed} removed"
+            )
+        except Exception as exc:  # noqa: BLE001 - surfaced through status
+            logger.warning(f"Embedding rebuild failed: {exc}")
+            self._update(
+                state="failed",
+                stage="Rebuild failed",
+                error=f"{exc.__class__.__name__}: {exc}",
+                finished_at=time.time(),
+            )
+        finally:
+            self._done.set()
+
+    def _embed_missing(self, plan: RebuildPlan, model: str) -> np.ndarray:
+        if not plan.to_embed:
+            return np.zeros((0, 0), dtype=np.float32)
+        texts = [doc["text"] for doc in plan.documents]
+        batches = list(
+            _batches(plan.to_embed, texts, self._batch_size, self._max_batch_chars)
+        )
+        results: dict[int, np.ndarray] = {}
+        embedded = 0
+        with ThreadPoolExecutor(
+            max_workers=self._max_workers, thread_name_prefix="embedding-batch"
+        ) as executor:
+            futures = {
+                executor.submit(self._embed, [texts[row] for row in batch], model): batch
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                batch = futures[future]
+                vectors = future.result()
+                if vectors is None or len(vectors) != len(batch):
+                    raise RuntimeError("Embedding request failed")
+                for row, vector in zip(batch, normalize_rows(vectors)):
+                    results[row] = vector
+                embedded += len(batch)
+                self._update(embedded=embedded)
+        return np.stack([results[row] for row in plan.to_embed])
@@ -0,0 +1,234 @@
+"""Memory-mapped, pre-normalized embedding matrix for chatbot retrieval.
+
+Two files make up a store:
+
+* ``<stem>.<fingerprint>.npy`` – float32 ``(n_docs, dim)`` matrix with
+  unit-length rows, named after a hash of its contents.
+* ``<stem>.meta.json`` – model name, dataset signature, the matrix file name
+  and document metadata in row order. It is written last and only ever names
+  a complete matrix, so replacing it switches both files at once.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from hashlib import sha1, sha256
+from pathlib import Path
+from typing import Any, Sequence
+
+import numpy as np
+
+__all__ = [
+    "EmbeddingStore",
+    "document_hash",
+    "load_embedding_store",
+    "migrate_legacy_json",
+    "normalize_rows",
+    "save_embedding_store",
+]
+
+logger = logging.getLogger(__name__)
+
+STORE_FORMAT = 1
+_DOCUMENT_FIELDS = ("id", "title", "text", "source")
+
+
+@dataclass(frozen=True, slots=True)
+class EmbeddingStore:
+    """Embedded documents plus their normalized float32 matrix."""
+
+    model: str
+    signature: dict[str, Any]
+    documents: tuple[dict[str, str], ...]
+    matrix: np.ndarray
+    # Content hash of the matrix; ties persisted search indexes to this store.
+    fingerprint: str = ""
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    @property
+    def dim(self) -> int:
+        return int(self.matrix.shape[1]) if self.matrix.ndim == 2 else 0
+
+    def normalize_query(self, query_vector: Sequence[float]) -> np.ndarray:
+        query = np.asarray(query_vector, dtype=np.float32)
+        return query / (np.linalg.norm(query) + 1e-8)
+
+
+def document_hash(doc: dict[str, Any]) -> str:
+    """Content hash used to skip re-embedding unchanged documents."""
+
+    digest = sha1()
+    for field in ("title", "text", "source"):
+        digest.update(str(doc.get(field, "")).encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+def normalize_rows(vectors: Any) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim != 2:
+        matrix = matrix.reshape(len(matrix), -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-8)
+
+
+def _meta_path(stem: Path) -> Path:
+    return stem.with_suffix(".meta.json")
+
+
+def _matrix_path(stem: Path, meta: dict[str, Any]) -> Path:
+    # Stores written before matrices were versioned keep a plain ``<stem>.npy``.
+    name = meta.get("matrix") or stem.with_suffix(".npy").name
+    return stem.with_name(str(name))
+
+
+def _remove_stale_matrices(stem: Path, keep: set[str]) -> None:
+    """Drop superseded matrices, keeping the one readers may still be opening."""
+
+    candidates = list(stem.parent.glob(f"{stem.name}.*.npy"))
+    candidates.append(stem.with_suffix(".npy"))
+    for path in candidates:
+        if path.name in keep:
+            continue
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            continue
+        except OSError as exc:
+            logger.debug(f"Could not remove old embedding matrix {path}: {exc}")
+
+
+def save_embedding_store(
+    stem: Path,
+    *,
+    model: str,
+    signature: dict[str, Any],
+    documents: Sequence[dict[str, Any]],
+    embeddings: Any,
+    normalized: bool = False,
+) -> EmbeddingStore:
+    """Write the matrix and metadata atomically and return the stored view."""
+
+    matrix = np.asarray(embeddings, dtype=np.float32) if normalized else normalize_rows(embeddings)
+    if matrix.shape[0] != len(documents):
+        raise ValueError("Embedding count does not match document count")
+    matrix = np.ascontiguousarray(matrix)
+    fingerprint = sha256(matrix.tobytes()).hexdigest()[:16]
+    meta_path = _meta_path(stem)
+    matrix_path = stem.with_name(f"{stem.name}.{fingerprint}.npy")
+    meta_path.parent.mkdir(parents=True, exist_ok=True)
+    suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        previous = json.loads(meta_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        previous = None
+
+    temp_matrix = matrix_path.with_name(matrix_path.name + suffix)
+    with temp_matrix.open("wb") as handle:
+        np.save(handle, matrix)
+    os.replace(temp_matrix, matrix_path)
+
+    meta = {
+        "format": STORE_FORMAT,
+        "model": model,
+        "signature": signature,
+        "count": int(matrix.shape[0]),
+        "dim": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+        "matrix": matrix_path.name,
+        "fingerprint": fingerprint,
+        "documents": [
+            {
+                **{field: str(doc.get(field, "")) for field in _DOCUMENT_FIELDS},
+                "hash": str(doc.get("hash") or document_hash(doc)),
+            }
+            for doc in documents
+        ],
+    }
+    temp_meta = meta_path.with_name(meta_path.name + suffix)
+    temp_meta.write_text(json.dumps(meta, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    os.replace(temp_meta, meta_path)
+    keep = {matrix_path.name}
+    if isinstance(previous, dict):
+        keep.add(_matrix_path(stem, previous).name)
+    _remove_stale_matrices(stem, keep)
+    return _read_store(stem)
+
+
+def _read_store(stem: Path) -> EmbeddingStore:
+    meta = json.loads(_meta_path(stem).read_text(encoding="utf-8"))
+    if meta.get("format") != STORE_FORMAT:
+        raise ValueError(f"Unsupported embedding store format {meta.get('format')!r}")
+    matrix = np.load(_matrix_path(stem, meta), mmap_mode="r")
+    documents = tuple(meta.get("documents", []))
+    if matrix.dtype != np.float32 or matrix.shape[0] != len(documents):
+        raise ValueError("Embedding matrix does not match its metadata")
+    return EmbeddingStore(
+        model=str(meta.get("model", "")),
+        signature=dict(meta.get("signature", {})),
+        documents=documents,
+        matrix=matrix,
+        fingerprint=str(meta.get("fingerprint", "")),
+    )
+
+
+def migrate_legacy_json(legacy_path: Path, stem: Path) -> EmbeddingStore | None:
+    """Convert the old ``{"documents": [{..., "embedding": [...]}]}`` JSON cache."""
+
+    try:
+        with legacy_path.open("r", encoding="utf-8") as handle:
+            payload = json.load(handle)
+        items = payload.get("documents", [])
+        if not items:
+            return None
+        store = save_embedding_store(
+            stem,
+            model=str(payload.get("model", "")),
+            signature=payload.get("signature", {}),
+            documents=items,
+            embeddings=[item["embedding"] for item in items],
+        )
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        logger.warning(f"Could not migrate legacy embeddings {legacy_path}: {exc}")
+        return None
+    logger.info(f"Migrated {len(store)} embeddings from {legacy_path} to {stem}.npy")
+    return store
+
+
+_loaded: dict[Path, tuple[int, EmbeddingStore]] = {}
+_load_lock = threading.Lock()
+
+
+def load_embedding_store(stem: Path, *, legacy_path: Path | None = None) -> EmbeddingStore | None:
+    """Return the store at ``stem``, loading it once per process.
+
+    The metadata file's mtime is checked on each call so a rebuilt store is
+    picked up. When no store exists, ``legacy_path`` is migrated if present.
+    """
+
+    meta_path = _meta_path(stem)
+    with _load_lock:
+        try:
+            mtime = meta_path.stat().st_mtime_ns
+        except OSError:
+            if legacy_path is None or not legacy_path.exists():
+                return None
+            store = migrate_legacy_json(legacy_path, stem)
+            if store is not None:
+                _loaded[stem] = (meta_path.stat().st_mtime_ns, store)
+            return store
+        cached = _loaded.get(stem)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        try:
+            store = _read_store(stem)
+        except (OSError, ValueError) as exc:
+            logger.warning(f"Embedding store {stem} is unreadable: {exc}")
+            return None
+        _loaded[stem] = (mtime, store)
+        return store
@@ -0,0 +1,196 @@
+"""Offline BM25 retrieval over the chatbot RAG documents.
+
+The inverted index is stored column-wise: ``postings_offsets[t]`` to
+``postings_offsets[t + 1]`` slices ``postings_docs``/``postings_tf`` for
+term ``t``. Arrays go to ``<directory>/postings.npz`` and vocabulary plus
+document metadata to ``<directory>/meta.json`` (written last).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Sequence
+
+import numpy as np
+
+__all__ = [
+    "BM25Index",
+    "load_bm25_index",
+    "tokenize",
+]
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT = 1
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how i in is it of on or should the to what "
+    "when which with my me can do does".split()
+)
+_DOCUMENT_FIELDS = ("id", "title", "text", "source")
+_TITLE_WEIGHT = 3
+
+
+def tokenize(text: str) -> list[str]:
+    return [
+        token
+        for token in _TOKEN_RE.findall(text.lower())
+        if token not in _STOPWORDS and (len(token) > 1 or token.isdigit())
+    ]
+
+
+@dataclass(frozen=True, slots=True)
+class BM25Index:
+    """Okapi BM25 scorer with precomputed IDF and document lengths."""
+
+    vocabulary: dict[str, int]
+    idf: np.ndarray
+    postings_offsets: np.ndarray
+    postings_docs: np.ndarray
+    postings_tf: np.ndarray
+    doc_lengths: np.ndarray
+    documents: tuple[dict[str, str], ...]
+    signature: dict[str, Any]
+    k1: float = 1.5
+    b: float = 0.75
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    @classmethod
+    def build(
+        cls,
+        documents: Sequence[dict[str, Any]],
+        *,
+        signature: dict[str, Any] | None = None,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ) -> "BM25Index":
+        vocabulary: dict[str, int] = {}
+        term_docs: list[list[int]] = []
+        term_tfs: list[list[int]] = []
+        doc_lengths = np.zeros(len(documents), dtype=np.float32)
+        for row, doc in enumerate(documents):
+            # Titles name the crop or dataset, so they count several times.
+            tokens = tokenize(doc.get("title", "")) * _TITLE_WEIGHT + tokenize(
+                doc.get("text", "")
+            )
+            doc_lengths[row] = len(tokens)
+            for term, count in Counter(tokens).items():
+                term_id = vocabulary.setdefault(term, len(vocabulary))
+                if term_id == len(term_docs):
+                    term_docs.append([])
+                    term_tfs.append([])
+                term_docs[term_id].append(row)
+                term_tfs[term_id].append(count)
+
+        doc_freq = np.fromiter((len(docs) for docs in term_docs), dtype=np.float32)
+        n_docs = max(len(documents), 1)
+        idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+        offsets = np.zeros(len(term_docs) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(doc_freq.astype(np.int64))
+        flat_docs = [row for docs in term_docs for row in docs]
+        flat_tfs = [count for tfs in term_tfs for count in tfs]
+        return cls(
+            vocabulary=vocabulary,
+            idf=idf,
+            postings_offsets=offsets,
+            postings_docs=np.asarray(flat_docs, dtype=np.int32),
+            postings_tf=np.asarray(flat_tfs, dtype=np.float32),
+            doc_lengths=doc_lengths,
+            documents=tuple(
+                {field: str(doc.get(field, "")) for field in _DOCUMENT_FIELDS}
+                for doc in documents
+            ),
+            signature=dict(signature or {}),
+            k1=k1,
+            b=b,
+        )
+
+    def search(self, query: str, top_k: int = 4) -> list[tuple[int, float]]:
+        """Return ``(row, score)`` pairs for documents matching ``query`` terms."""
+
+        if not len(self) or top_k <= 0:
+            return []
+        scores = np.zeros(len(self), dtype=np.float32)
+        avg_length = float(self.doc_lengths.mean()) or 1.0
+        norm = self.k1 * (1.0 - self.b + self.b * self.doc_lengths / avg_length)
+        for term in set(tokenize(query)):
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            start, stop = self.postings_offsets[term_id], self.postings_offsets[term_id + 1]
+            rows = self.postings_docs[start:stop]
+            tf = self.postings_tf[start:stop]
+            scores[rows] += self.idf[term_id] * tf * (self.k1 + 1.0) / (tf + norm[rows])
+        matched = np.flatnonzero(scores)
+        if matched.size == 0:
+            return []
+        k = min(top_k, matched.size)
+        top = matched[np.argpartition(scores[matched], -k)[-k:]]
+        top = top[np.argsort(scores[top])[::-1]]
+        return [(int(row), float(scores[row])) for row in top]
+
+    def save(self, directory: Path) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        temp_arrays = directory / f"postings.npz{suffix}"
+        with temp_arrays.open("wb") as handle:
+            np.savez(
+                handle,
+                idf=self.idf,
+                postings_offsets=self.postings_offsets,
+                postings_docs=self.postings_docs,
+                postings_tf=self.postings_tf,
+                doc_lengths=self.doc_lengths,
+            )
+        os.replace(temp_arrays, directory / "postings.npz")
+        meta = {
+            "format": INDEX_FORMAT,
+            "k1": self.k1,
+            "b": self.b,
+            "signature": self.signature,
+            "vocabulary": self.vocabulary,
+            "documents": list(self.documents),
+        }
+        temp_meta = directory / f"meta.json{suffix}"
+        temp_meta.write_text(
+            json.dumps(meta, ensure_ascii=False, separators=(",", ":")), encoding="utf-8"
+        )
+        os.replace(temp_meta, directory / "meta.json")
+
+    @classmethod
+    def load(cls, directory: Path) -> "BM25Index":
+        meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("format") != INDEX_FORMAT:
+            raise ValueError(f"Unsupported BM25 index format {meta.get('format')!r}")
+        with np.load(directory / "postings.npz") as arrays:
+            fields = {name: arrays[name] for name in arrays.files}
+        documents = tuple(meta["documents"])
+        if fields["doc_lengths"].shape[0] != len(documents):
+            raise ValueError("BM25 postings do not match their metadata")
+        return cls(
+            vocabulary=meta["vocabulary"],
+            documents=documents,
+            signature=meta.get("signature", {}),
+            k1=float(meta.get("k1", 1.5)),
+            b=float(meta.get("b", 0.75)),
+            **fields,
+        )
+
+
+def load_bm25_index(directory: Path) -> BM25Index | None:
+    try:
+        return BM25Index.load(directory)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError) as exc:
+        logger.warning(f"BM25 index at {directory} is unreadable: {exc}")
+        return None
@@ -0,0 +1,125 @@
+"""Hedged calls across chat providers under one end-to-end deadline.
+
+Providers are tried in preference order. The next one starts when the
+current one fails, or when it has not answered within ``hedge_delay``
+seconds. The first non-empty result wins: a full reply, or for streaming
+calls the opened stream with its first chunk. Every other started provider
+has its cancel event set, and providers not yet started are never started.
+Results that lose the race, including ones that arrive after the winner, are
+handed to ``discard`` so open streams get closed.
+Each provider runs in a copy of the caller's ``contextvars`` context.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Generic, Sequence, TypeVar
+
+__all__ = [
+    "HedgedResult",
+    "Provider",
+    "run_hedged",
+]
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# A provider gets the cancellation event and returns a result or None.
+Provider = tuple[str, Callable[[threading.Event], T | None]]
+
+
+@dataclass(frozen=True, slots=True)
+class HedgedResult(Generic[T]):
+    reply: T | None
+    provider: str | None
+    elapsed: float
+    launched: tuple[str, ...]
+    timed_out: bool = False
+
+
+def _discard_when_done(
+    future: Future, name: str, discard: Callable[[T], None] | None
+) -> None:
+    if discard is None:
+        return
+
+    def _callback(done: Future) -> None:
+        if done.cancelled() or done.exception() is not None:
+            return
+        reply = done.result()
+        if reply is None:
+            return
+        try:
+            discard(reply)
+        except Exception as exc:  # noqa: BLE001 - cleanup must not raise into the pool
+            logger.warning(f"Discarding the {name} reply failed: {exc}")
+
+    future.add_done_callback(_callback)
+
+
+def run_hedged(
+    providers: Sequence[Provider[T]],
+    *,
+    hedge_delay: float,
+    deadline: float,
+    discard: Callable[[T], None] | None = None,
+) -> HedgedResult[T]:
+    """Return the first good reply before ``deadline`` (a ``time.monotonic()`` value).
+
+    ``discard`` is called on every other provider's result, now or when it
+    finishes, so results holding resources are released.
+    """
+
+    started = time.monotonic()
+    queue = list(providers)
+    launched: list[str] = []
+    pending: dict[Future, tuple[str, threading.Event]] = {}
+    executor = ThreadPoolExecutor(
+        max_workers=max(len(queue), 1), thread_name_prefix="llm-provider"
+    )
+
+    def launch() -> float:
+        name, call = queue.pop(0)
+        launched.append(name)
+        cancel = threading.Event()
+        context = contextvars.copy_context()
+        pending[executor.submit(context.run, call, cancel)] = (name, cancel)
+        return time.monotonic() + hedge_delay
+
+    try:
+        next_hedge = launch() if queue else started
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            wake_at = min(deadline, next_hedge) if queue else deadline
+            done, _ = wait(pending, timeout=max(wake_at - now, 0.0), return_when=FIRST_COMPLETED)
+            for future in done:
+                name, _ = pending.pop(future)
+                try:
+                    reply = future.result()
+                except Exception as exc:  # noqa: BLE001 - one provider must not sink the rest
+                    logger.warning(f"LLM provider {name} failed: {exc}")
+                    reply = None
+                if reply:
+                    return HedgedResult(reply, name, time.monotonic() - started, tuple(launched))
+            if queue and (not pending or time.monotonic() >= next_hedge):
+                next_hedge = launch()
+        return HedgedResult(
+            None,
+            None,
+            time.monotonic() - started,
+            tuple(launched),
+            timed_out=bool(pending) or bool(queue),
+        )
+    finally:
+        for future, (name, cancel) in pending.items():
+            cancel.set()
+            _discard_when_done(future, name, discard)
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,151 @@
+"""Prompt assembly for the chatbot's LLM providers.
+
+Each crop's dataset context and the soil profiles are serialized to JSON once,
+when ``load_context_data`` builds a ``PromptBuilder``. A request then only
+serializes its conversation turns and splices the cached fragments together,
+producing the same JSON ``json.dumps`` would for the combined context. If the
+user prompt exceeds the character budget, the oldest conversation turns are
+dropped first, then the lowest-ranked retrieved notes, then soil profiles. As
+a last resort the crop details are replaced by a short placeholder and the
+query is cut short; the context block stays valid JSON throughout, and only
+the fixed instructions can keep a prompt over budget.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Mapping, Sequence
+
+__all__ = [
+    "DEFAULT_CHAR_BUDGET",
+    "SYSTEM_PROMPT",
+    "PromptBuilder",
+    "slim_user_prompt",
+]
+
+# Roughly 3k tokens of user prompt.
+DEFAULT_CHAR_BUDGET = 12_000
+MAX_NOTES = 4
+MAX_NOTE_CHARS = 800
+MAX_SOIL_PROFILES = 5
+MAX_CONVERSATION_TURNS = 6
+
+SYSTEM_PROMPT = (
+    "You are an expert agricultural advisor focused on crops, soil science, fertilizers, irrigation, "
+    "pest and disease management, seasonal cropping systems, organic farming, and sustainable practices. "
+    "You ONLY answer agriculture-related questions. If the question is unrelated to agriculture, refuse "
+    "with exactly: "
+    "'I am your Agricultural Advisory Assistant. Please ask crop or farming related questions.' "
+    "Tone: calm, practical, field-ready, and respectful. "
+    "Avoid rigid templates. Vary structure naturally based on the question; answer directly. "
+    "Use bullets only when it improves clarity. "
+    "Avoid overclaiming or inventing real-time facts. If local conditions matter (weather, market, "
+    "regulations), ask for location and advise checking local extension advisories. "
+    "When suggesting pesticides or nutrient doses, include safety precautions (PPE, label adherence, "
+    "waiting period) and prefer integrated pest management."
+)
+
+_NO_CROP = json.dumps("No exact crop matched. Ask user to mention crop name.")
+_CROP_OMITTED = json.dumps("Crop details omitted to fit the prompt size limit.")
+_INSTRUCTIONS = (
+    "Answer in plain text. Keep the response focused on the user’s question. "
+    "Do not follow a fixed template; vary the structure naturally. "
+    "Include safety cautions only when recommending pesticides or specific doses. "
+    "If retrieved notes are relevant, use them; otherwise rely on general agronomy knowledge."
+)
+
+
+def _to_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=True, default=str)
+
+
+def _note_block(doc: Mapping[str, Any]) -> str:
+    title = doc.get("title", "Context")
+    text = doc.get("text", "")
+    if len(text) > MAX_NOTE_CHARS:
+        text = text[:MAX_NOTE_CHARS] + "..."
+    return f"[{title}]\n{text}"
+
+
+def _shorten(text: str, overflow: int) -> str:
+    """Drop ``overflow`` characters from the end of plain ``text``, marking the cut."""
+
+    if overflow <= 0:
+        return text
+    keep = len(text) - overflow - 3
+    return text[:keep] + "..." if keep > 0 else ""
+
+
+def slim_user_prompt(query: str) -> str:
+    return (
+        f"User query: {query}\n\n"
+        "Answer in plain text. Use short sections and bullet points when helpful. "
+        "Finish with a short Caution line and a Next step line."
+    )
+
+
+class PromptBuilder:
+    """Cached prompt fragments for one ``load_context_data`` snapshot."""
+
+    __slots__ = ("char_budget", "_crop_json", "_soil_json")
+
+    def __init__(
+        self,
+        crop_details: Mapping[str, Any],
+        soil_profiles: Sequence[Any],
+        *,
+        char_budget: int = DEFAULT_CHAR_BUDGET,
+    ) -> None:
+        self.char_budget = char_budget
+        self._crop_json = {
+            key: _to_json(details) for key, details in crop_details.items() if details
+        }
+        self._soil_json = tuple(_to_json(profile) for profile in soil_profiles[:MAX_SOIL_PROFILES])
+
+    def build(
+        self,
+        query: str,
+        crop_key: str | None,
+        conversation: Any,
+        retrieved_docs: Sequence[Mapping[str, Any]] | None = None,
+    ) -> tuple[str, str]:
+        """Return ``(system_prompt, user_prompt)`` within the character budget.
+
+        The budget holds unless the fixed instructions alone exceed it.
+        """
+
+        crop = self._crop_json.get(crop_key, _NO_CROP) if crop_key else _NO_CROP
+        recent = conversation[-MAX_CONVERSATION_TURNS:] if isinstance(conversation, list) else []
+        turns = [_to_json(turn) for turn in recent]
+        notes = [_note_block(doc) for doc in (retrieved_docs or [])[:MAX_NOTES]]
+        soil = list(self._soil_json)
+
+        user_prompt = self._render(query, crop, soil, turns, notes)
+        for parts in (turns, notes, soil):
+            while parts and len(user_prompt) > self.char_budget:
+                parts.pop(0 if parts is turns else -1)
+                user_prompt = self._render(query, crop, soil, turns, notes)
+        if len(user_prompt) > self.char_budget and len(crop) > len(_CROP_OMITTED):
+            # Serialized JSON cannot be cut mid-object; swap in a placeholder instead.
+            crop = _CROP_OMITTED
+            user_prompt = self._render(query, crop, soil, turns, notes)
+        if len(user_prompt) > self.char_budget:
+            query = _shorten(query, len(user_prompt) - self.char_budget)
+            user_prompt = self._render(query, crop, soil, turns, notes)
+        return SYSTEM_PROMPT, user_prompt
+
+    @staticmethod
+    def _render(
+        query: str, crop: str, soil: list[str], turns: list[str], notes: list[str]
+    ) -> str:
+        context = (
+            f'{{"crop": {crop}, "soil_profiles": [{", ".join(soil)}], '
+            f'"conversation": [{", ".join(turns)}]}}'
+        )
+        rag_context = "\n\n".join(notes)
+        return (
+            f"User query: {query}\n\n"
+            f"Local dataset context (JSON): {context}\n\n"
+            f"Retrieved notes (if relevant):\n{rag_context}\n\n"
+            f"{_INSTRUCTIONS}"
+        )
@@ -0,0 +1,194 @@
+"""Prebuilt Aho-Corasick matchers for chatbot crop and intent detection.
+
+Crop names and aliases are matched against the alphanumeric-only form of the
+query (so "finger millet" finds ``fingermillet``); keywords are matched
+against the lowercased, whitespace-collapsed query. Both are plain substring
+matches, identical to the ``keyword in text`` checks they replace, but every
+pattern is found in one pass over the text.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping
+
+__all__ = [
+    "AhoCorasick",
+    "CropMatch",
+    "QueryMatch",
+    "QueryMatcher",
+    "normalize_crop_key",
+    "normalize_text",
+]
+
+
+class AhoCorasick:
+    """Automaton reporting the first start position of every pattern in a text."""
+
+    __slots__ = ("patterns", "_goto", "_fail", "_out")
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: tuple[str, ...] = tuple(patterns)
+        goto: list[dict[str, int]] = [{}]
+        out: list[list[int]] = [[]]
+        for pattern_id, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                nxt = goto[state].get(char)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][char] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append(pattern_id)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in goto[state].items():
+                queue.append(nxt)
+                link = fail[state]
+                while link and char not in goto[link]:
+                    link = fail[link]
+                fail[nxt] = goto[link].get(char, 0)
+                out[nxt].extend(out[fail[nxt]])
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def first_positions(self, text: str) -> dict[int, int]:
+        """Map each matched pattern id to the index where it first starts."""
+
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self.patterns
+        found: dict[int, int] = {}
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in out[state]:
+                if pattern_id not in found:
+                    found[pattern_id] = end - len(patterns[pattern_id]) + 1
+        return found
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace; the form keywords are matched against."""
+
+    return " ".join((text or "").strip().lower().split())
+
+
+def normalize_crop_key(text: str) -> str:
+    """Alphanumeric-only form used for crop keys and crop name matching."""
+
+    return "".join(ch for ch in normalize_text(text) if ch.isalnum())
+
+
+@dataclass(frozen=True, slots=True)
+class CropMatch:
+    key: str
+    position: int
+
+
+@dataclass(frozen=True, slots=True)
+class QueryMatch:
+    """Everything the chatbot needs to know about a query's wording."""
+
+    normalized: str
+    # The single crop ``_extract_crop`` picks: aliases first, then crop_details order.
+    primary: str | None
+    # All mentioned crops ordered by where they appear in the query.
+    crops: tuple[CropMatch, ...]
+    topics: tuple[str, ...]
+    intents: frozenset[str]
+
+
+@dataclass(frozen=True, slots=True)
+class _CropPattern:
+    key: str
+    rank: int
+    # Crop-details keys win over display names when placing a crop in the query.
+    is_key: bool
+
+
+class QueryMatcher:
+    """Crop, topic and intent matcher built once per context load."""
+
+    __slots__ = ("_crops", "_crop_patterns", "_keywords", "_keyword_labels", "_topic_order")
+
+    def __init__(
+        self,
+        *,
+        aliases: Mapping[str, str],
+        crop_details: Mapping[str, Mapping[str, Any]],
+        intents: Mapping[str, Iterable[str]],
+        topics: Mapping[str, Iterable[str]],
+    ) -> None:
+        patterns: dict[str, list[_CropPattern]] = {}
+
+        def add(pattern: str, entry: _CropPattern) -> None:
+            if pattern:
+                patterns.setdefault(pattern, []).append(entry)
+
+        rank = 0
+        for alias, canonical in aliases.items():
+            if canonical in crop_details:
+                add(alias, _CropPattern(canonical, rank, is_key=False))
+            rank += 1
+        for key, details in crop_details.items():
+            add(key, _CropPattern(key, rank, is_key=True))
+            add(normalize_crop_key(str(details.get("name", key))), _CropPattern(key, rank, is_key=False))
+            rank += 1
+        self._crops = AhoCorasick(patterns)
+        self._crop_patterns = tuple(patterns.values())
+
+        labels: dict[str, set[str]] = {}
+        for label, keywords in intents.items():
+            for keyword in keywords:
+                labels.setdefault(keyword, set()).add(label)
+        for topic, keywords in topics.items():
+            for keyword in keywords:
+                labels.setdefault(keyword, set()).add(f"topic:{topic}")
+        self._keywords = AhoCorasick(labels)
+        self._keyword_labels = tuple(frozenset(value) for value in labels.values())
+        self._topic_order = tuple(topics)
+
+    def match(self, query: str) -> QueryMatch:
+        normalized = normalize_text(query)
+        primary, crops = self._match_crops(normalize_crop_key(normalized))
+        labels: set[str] = set()
+        for pattern_id in self._keywords.first_positions(normalized):
+            labels |= self._keyword_labels[pattern_id]
+        return QueryMatch(
+            normalized=normalized,
+            primary=primary,
+            crops=crops,
+            topics=tuple(topic for topic in self._topic_order if f"topic:{topic}" in labels),
+            intents=frozenset(label for label in labels if not label.startswith("topic:")),
+        )
+
+    def _match_crops(self, key_text: str) -> tuple[str | None, tuple[CropMatch, ...]]:
+        # Per crop: (rank, key position, name/alias position) of its best entry.
+        best: dict[str, list[int]] = {}
+        for pattern_id, position in self._crops.first_positions(key_text).items():
+            for entry in self._crop_patterns[pattern_id]:
+                slot = best.get(entry.key)
+                if slot is None or entry.rank < slot[0]:
+                    slot = best[entry.key] = [entry.rank, -1, -1]
+                elif entry.rank > slot[0]:
+                    continue
+                index = 1 if entry.is_key else 2
+                if slot[index] < 0 or position < slot[index]:
+                    slot[index] = position
+        if not best:
+            return None, ()
+        ordered = sorted(
+            (slot[1] if slot[1] >= 0 else slot[2], slot[0], key) for key, slot in best.items()
+        )
+        primary = min(best.items(), key=lambda item: item[1][0])[0]
+        return primary, tuple(CropMatch(key, position) for position, _rank, key in ordered)
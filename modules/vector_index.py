@@ -0,0 +1,280 @@
+"""Pluggable nearest-neighbour indexes over the normalized embedding matrix.
+
+``ExactIndex`` scores every row; ``IVFIndex`` clusters rows with spherical
+k-means and only scores the lists closest to the query. Build artifacts
+live in ``<directory>/<kind>/`` and are tied to the store's fingerprint:
+arrays are named ``<array>.<fingerprint>.npy`` and never rewritten in place,
+and ``index.json`` is replaced last, so it only ever names complete arrays.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Protocol
+
+import numpy as np
+
+__all__ = [
+    "ExactIndex",
+    "IVFIndex",
+    "VectorIndex",
+    "build_index",
+    "load_or_build_index",
+    "resolve_index_kind",
+]
+
+logger = logging.getLogger(__name__)
+
+INDEX_KINDS = ("exact", "ivf")
+# ``auto`` switches to IVF once a brute-force scan stops being cheap.
+AUTO_IVF_THRESHOLD = 20_000
+_MANIFEST = "index.json"
+
+
+def _top_k(scores: np.ndarray, rows: np.ndarray | None, top_k: int) -> list[tuple[int, float]]:
+    k = min(top_k, scores.shape[0])
+    if k <= 0:
+        return []
+    top = np.argpartition(scores, -k)[-k:]
+    top = top[np.argsort(scores[top])[::-1]]
+    ids = top if rows is None else rows[top]
+    return [(int(row), float(score)) for row, score in zip(ids, scores[top])]
+
+
+class VectorIndex(Protocol):
+    kind: str
+
+    def search(self, query: np.ndarray, top_k: int = 4) -> list[tuple[int, float]]:
+        """Return ``(row, cosine score)`` pairs for a unit-length float32 query."""
+
+    def save(self, directory: Path, fingerprint: str) -> None: ...
+
+
+class ExactIndex:
+    """Brute-force inner product over every row."""
+
+    kind = "exact"
+
+    def __init__(self, matrix: np.ndarray) -> None:
+        self._matrix = matrix
+
+    @classmethod
+    def build(cls, matrix: np.ndarray) -> "ExactIndex":
+        return cls(matrix)
+
+    @classmethod
+    def load(cls, directory: Path, matrix: np.ndarray, fingerprint: str) -> "ExactIndex":
+        return cls(matrix)
+
+    def search(self, query: np.ndarray, top_k: int = 4) -> list[tuple[int, float]]:
+        return _top_k(self._matrix @ query, None, top_k)
+
+    def save(self, directory: Path, fingerprint: str) -> None:
+        # The embedding matrix is the whole index; only record the manifest.
+        _write_manifest(directory, {"kind": self.kind, "fingerprint": fingerprint})
+
+
+def _spherical_kmeans(
+    matrix: np.ndarray, n_lists: int, *, n_iter: int, seed: int
+) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    n_rows = matrix.shape[0]
+    sample_size = min(n_rows, max(n_lists * 64, 4096))
+    sample = np.asarray(matrix[rng.choice(n_rows, sample_size, replace=False)])
+    centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+    for _ in range(n_iter):
+        assignment = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        counts = np.bincount(assignment, minlength=n_lists)
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()), replace=False)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = (sums / np.maximum(norms, 1e-8)).astype(np.float32)
+    return centroids
+
+
+def _assign(matrix: np.ndarray, centroids: np.ndarray, batch: int = 8192) -> np.ndarray:
+    assignment = np.empty(matrix.shape[0], dtype=np.int64)
+    for start in range(0, matrix.shape[0], batch):
+        block = np.asarray(matrix[start : start + batch])
+        assignment[start : start + batch] = np.argmax(block @ centroids.T, axis=1)
+    return assignment
+
+
+class IVFIndex:
+    """Inverted-file index: rows grouped by nearest centroid.
+
+    ``order`` holds row ids sorted by list and ``offsets[i]:offsets[i + 1]``
+    is list ``i``. A query scores the ``n_probe`` nearest centroids' rows.
+    """
+
+    kind = "ivf"
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        centroids: np.ndarray,
+        order: np.ndarray,
+        offsets: np.ndarray,
+        *,
+        n_probe: int | None = None,
+    ) -> None:
+        self._matrix = matrix
+        self.centroids = centroids
+        self.order = order
+        self.offsets = offsets
+        n_lists = centroids.shape[0]
+        self.n_probe = min(n_lists, n_probe or max(4, math.ceil(n_lists * 0.1)))
+
+    @classmethod
+    def build(
+        cls,
+        matrix: np.ndarray,
+        *,
+        n_lists: int | None = None,
+        n_iter: int = 15,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        n_rows = matrix.shape[0]
+        n_lists = max(1, min(n_rows, n_lists or int(round(math.sqrt(n_rows)))))
+        centroids = _spherical_kmeans(matrix, n_lists, n_iter=n_iter, seed=seed)
+        assignment = _assign(matrix, centroids)
+        order = np.argsort(assignment, kind="stable").astype(np.int64)
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(assignment, minlength=n_lists))
+        return cls(matrix, centroids, order, offsets, n_probe=_env_n_probe())
+
+    @classmethod
+    def load(cls, directory: Path, matrix: np.ndarray, fingerprint: str) -> "IVFIndex":
+        return cls(
+            matrix,
+            np.load(directory / f"centroids.{fingerprint}.npy"),
+            np.load(directory / f"order.{fingerprint}.npy", mmap_mode="r"),
+            np.load(directory / f"offsets.{fingerprint}.npy"),
+            n_probe=_env_n_probe(),
+        )
+
+    def search(self, query: np.ndarray, top_k: int = 4) -> list[tuple[int, float]]:
+        centroid_scores = self.centroids @ query
+        n_probe = self.n_probe
+        probes = np.argpartition(centroid_scores, -n_probe)[-n_probe:]
+        rows = np.concatenate(
+            [self.order[self.offsets[i] : self.offsets[i + 1]] for i in probes]
+        )
+        if rows.size == 0:
+            return []
+        rows.sort()  # sequential access into the memory-mapped matrix
+        return _top_k(self._matrix[rows] @ query, rows, top_k)
+
+    def save(self, directory: Path, fingerprint: str) -> None:
+        # Other processes may have the live arrays memory-mapped, so each build
+        # writes new files beside them and the manifest switches over last.
+        directory.mkdir(parents=True, exist_ok=True)
+        previous = _read_manifest(directory)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        for name, array in (
+            ("centroids", self.centroids),
+            ("order", self.order),
+            ("offsets", self.offsets),
+        ):
+            target = directory / f"{name}.{fingerprint}.npy"
+            temp_path = target.with_name(target.name + suffix)
+            with temp_path.open("wb") as handle:
+                np.save(handle, array)
+            os.replace(temp_path, target)
+        _write_manifest(
+            directory,
+            {
+                "kind": self.kind,
+                "fingerprint": fingerprint,
+                "n_lists": int(self.centroids.shape[0]),
+            },
+        )
+        # Keep the previous build for readers mid-switch, and whatever a
+        # concurrent builder with another fingerprint has just published.
+        keep = {
+            fingerprint,
+            str((previous or {}).get("fingerprint", "")),
+            str((_read_manifest(directory) or {}).get("fingerprint", "")),
+        }
+        for path in directory.glob("*.npy"):
+            parts = path.name.split(".")
+            if len(parts) == 3 and parts[1] in keep:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                continue
+
+
+def _env_n_probe() -> int | None:
+    raw = os.getenv("RAG_IVF_NPROBE", "").strip()
+    return int(raw) if raw.isdigit() and int(raw) > 0 else None
+
+
+def _read_manifest(directory: Path) -> dict | None:
+    try:
+        manifest = json.loads((directory / _MANIFEST).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return manifest if isinstance(manifest, dict) else None
+
+
+def _write_manifest(directory: Path, manifest: dict) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    temp_path = directory / f".{_MANIFEST}.{os.getpid()}.tmp"
+    temp_path.write_text(json.dumps(manifest), encoding="utf-8")
+    os.replace(temp_path, directory / _MANIFEST)
+
+
+_INDEX_TYPES = {"exact": ExactIndex, "ivf": IVFIndex}
+
+
+def resolve_index_kind(n_rows: int, requested: str | None = None) -> str:
+    """Map ``RAG_INDEX`` (``exact``, ``ivf`` or ``auto``) to a concrete kind."""
+
+    kind = (requested or os.getenv("RAG_INDEX", "auto")).strip().lower()
+    if kind in INDEX_KINDS:
+        return kind
+    return "ivf" if n_rows >= AUTO_IVF_THRESHOLD else "exact"
+
+
+def build_index(matrix: np.ndarray, kind: str) -> VectorIndex:
+    return _INDEX_TYPES[kind].build(matrix)
+
+
+def load_or_build_index(
+    matrix: np.ndarray,
+    directory: Path,
+    *,
+    fingerprint: str,
+    kind: str | None = None,
+) -> VectorIndex:
+    """Load the persisted index for ``fingerprint`` or build and persist it.
+
+    An empty ``fingerprint`` disables persistence.
+    """
+
+    kind = resolve_index_kind(matrix.shape[0], kind)
+    index_dir = directory / kind
+    if fingerprint:
+        manifest = _read_manifest(index_dir)
+        if manifest and manifest.get("fingerprint") == fingerprint and manifest.get("kind") == kind:
+            try:
+                return _INDEX_TYPES[kind].load(index_dir, matrix, fingerprint)
+            except (OSError, ValueError):
+                pass
+    index = build_index(matrix, kind)
+    if fingerprint:
+        try:
+            index.save(index_dir, fingerprint)
+        except OSError as exc:
+            logger.warning(f"Could not persist {kind} index to {index_dir}: {exc}")
+    return index
@@ -0,0 +1,86 @@
+"""Compare single-row latency of sklearn and compiled crop recommendation inference."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.data.dataset import FEATURE_COLUMNS, load_dataset  # noqa: E402
+from src.models.predictor import CropPredictor, load_pipeline  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--model-path", type=Path, default=None, help="Override the model artifact."
+    )
+    parser.add_argument(
+        "--samples", type=int, default=300, help="Number of single-row requests."
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=20, help="Untimed requests before measuring."
+    )
+    return parser.parse_args()
+
+
+def _time_requests(predictor: CropPredictor, rows: list[dict], warmup: int) -> np.ndarray:
+    for row in rows[:warmup]:
+        predictor.recommend(row)
+    timings = np.empty(len(rows), dtype=np.float64)
+    for index, row in enumerate(rows):
+        start = time.perf_counter()
+        predictor.recommend(row)
+        timings[index] = time.perf_counter() - start
+    return timings * 1000.0
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    args = parse_args()
+
+    pipeline = load_pipeline(args.model_path)
+    frame = load_dataset().loc[:, list(FEATURE_COLUMNS)]
+    sample = frame.sample(n=min(args.samples, len(frame)), random_state=42)
+    rows = sample.to_dict(orient="records")
+
+    baseline = CropPredictor(pipeline)
+    compiled = CropPredictor(pipeline, use_compiled=True)
+    if not compiled.is_compiled:
+        logging.error("Pipeline could not be compiled; nothing to compare.")
+        return 1
+
+    reference = baseline.predict_proba(sample)
+    flattened = compiled.predict_proba(sample)
+    max_error = float(np.abs(reference - flattened).max())
+    logging.info("Max absolute probability difference: %.3e", max_error)
+
+    results = {
+        "sklearn": _time_requests(baseline, rows, args.warmup),
+        "compiled": _time_requests(compiled, rows, args.warmup),
+    }
+    for name, timings in results.items():
+        logging.info(
+            "%-8s p50=%.3f ms  p99=%.3f ms  mean=%.3f ms",
+            name,
+            np.percentile(timings, 50),
+            np.percentile(timings, 99),
+            timings.mean(),
+        )
+    speedup = np.percentile(results["sklearn"], 50) / np.percentile(
+        results["compiled"], 50
+    )
+    logging.info("p50 speedup: %.1fx", speedup)
+    return 0 if max_error < 1e-9 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
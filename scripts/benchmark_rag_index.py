@@ -0,0 +1,104 @@
+"""Compare recall@k and query latency of the exact and IVF RAG indexes."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from modules.embedding_store import normalize_rows  # noqa: E402
+from modules.vector_index import ExactIndex, IVFIndex  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 50_000, 100_000],
+        help="Corpus sizes (documents) to benchmark.",
+    )
+    parser.add_argument("--dim", type=int, default=256, help="Embedding dimension.")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per size.")
+    parser.add_argument("--top-k", type=int, default=4, help="Neighbours per query.")
+    parser.add_argument(
+        "--clusters",
+        type=int,
+        default=64,
+        help="Topic clusters in the synthetic corpus (real embeddings are clustered too).",
+    )
+    return parser.parse_args()
+
+
+def _synthetic_corpus(
+    rng: np.random.Generator, n_docs: int, dim: int, clusters: int
+) -> np.ndarray:
+    centers = rng.normal(size=(clusters, dim))
+    labels = rng.integers(0, clusters, size=n_docs)
+    return normalize_rows(centers[labels] + 0.6 * rng.normal(size=(n_docs, dim)))
+
+
+def _run(index, queries: np.ndarray, top_k: int) -> tuple[list[set[int]], np.ndarray]:
+    results: list[set[int]] = []
+    timings = np.empty(len(queries), dtype=np.float64)
+    for position, query in enumerate(queries):
+        start = time.perf_counter()
+        hits = index.search(query, top_k)
+        timings[position] = time.perf_counter() - start
+        results.append({row for row, _ in hits})
+    return results, timings * 1000.0
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    args = parse_args()
+    rng = np.random.default_rng(42)
+
+    logging.info(
+        "%8s %-6s %9s %9s %9s %9s", "docs", "index", "build s", "p50 ms", "p99 ms", "recall"
+    )
+    for n_docs in args.sizes:
+        matrix = _synthetic_corpus(rng, n_docs, args.dim, args.clusters)
+        queries = normalize_rows(
+            matrix[rng.integers(0, n_docs, size=args.queries)]
+            + 0.3 * rng.normal(size=(args.queries, args.dim)).astype(np.float32)
+        )
+
+        start = time.perf_counter()
+        exact = ExactIndex.build(matrix)
+        exact_build = time.perf_counter() - start
+        truth, exact_ms = _run(exact, queries, args.top_k)
+
+        start = time.perf_counter()
+        ivf = IVFIndex.build(matrix)
+        ivf_build = time.perf_counter() - start
+        found, ivf_ms = _run(ivf, queries, args.top_k)
+        recall = np.mean([len(a & b) / len(a) for a, b in zip(truth, found) if a])
+
+        for name, build, timings, score in (
+            ("exact", exact_build, exact_ms, 1.0),
+            ("ivf", ivf_build, ivf_ms, recall),
+        ):
+            logging.info(
+                "%8d %-6s %9.2f %9.3f %9.3f %9.3f",
+                n_docs,
+                name,
+                build,
+                np.percentile(timings, 50),
+                np.percentile(timings, 99),
+                score,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Warm the weather cache for all known regions, once or on a schedule."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.weather_prefetch import (  # noqa: E402
+    DEFAULT_INTERVAL_SECONDS,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_RATE_PER_SECOND,
+    known_regions,
+    prefetch_weather,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--regions",
+        nargs="+",
+        default=None,
+        help="Regions to fetch. Defaults to every known region.",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_MAX_WORKERS, help="Concurrent requests."
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=DEFAULT_RATE_PER_SECOND,
+        help="Maximum requests started per second.",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Refetch regions that are still fresh."
+    )
+    parser.add_argument(
+        "--loop", action="store_true", help="Keep running, one pass per interval."
+    )
+    parser.add_argument(
+        "--interval-minutes",
+        type=float,
+        default=DEFAULT_INTERVAL_SECONDS / 60,
+        help="Minutes between passes when --loop is set.",
+    )
+    parser.add_argument(
+        "--list", action="store_true", help="Print the known regions and exit."
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    args = parse_args()
+
+    if args.list:
+        print("\n".join(known_regions()))
+        return 0
+
+    while True:
+        report = prefetch_weather(
+            args.regions,
+            max_workers=args.workers,
+            rate_per_second=args.rate,
+            force=args.force,
+            refresh_ahead=args.interval_minutes * 60 if args.loop else 0.0,
+        )
+        for region, error in sorted(report.failed.items()):
+            logging.warning("%s: %s", region, error)
+        if not args.loop:
+            return 0 if not report.failed else 1
+        time.sleep(args.interval_minutes * 60)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
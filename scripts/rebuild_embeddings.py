@@ -0,0 +1,58 @@
+"""Incrementally rebuild the chatbot RAG embedding store with progress output."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from modules.ai_chatbot import (  # noqa: E402
+    get_embedding_rebuild_status,
+    load_context_data,
+    start_embedding_rebuild,
+    wait_for_embedding_rebuild,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-check every document even if the dataset signature is unchanged.",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    args = parse_args()
+
+    if not start_embedding_rebuild(dict(load_context_data()), force=args.force):
+        logging.info("Embeddings are up to date.")
+        return 0
+
+    status = get_embedding_rebuild_status()
+    while status.is_running:
+        logging.info(
+            "%s: %d/%d embedded (%d reused)", status.stage, status.embedded, status.total, status.reused
+        )
+        wait_for_embedding_rebuild(2.0)
+        status = get_embedding_rebuild_status()
+
+    if status.state == "failed":
+        logging.error("Rebuild failed: %s", status.error)
+        return 1
+    logging.info(
+        "Done: %d embedded, %d reused, %d removed.", status.embedded, status.reused, status.removed
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,6 +12,7 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from src.models.registry import ModelRegistry  # noqa: E402 - import after sys.path change
 from src.models.training import (  # noqa: E402 - import after sys.path change
     TrainingConfig,
     save_metrics,
@@ -52,6 +53,11 @@ def parse_args() -> argparse.Namespace:
         default=42,
         help="Random seed for reproducibility.",
     )
+    parser.add_argument(
+        "--no-activate",
+        action="store_true",
+        help="Publish the model to the registry without making it the current version.",
+    )
     parser.add_argument(
         "--metrics-only",
         action="store_true",
@@ -92,6 +98,14 @@ def main() -> int:
     if not args.metrics_only:
         model_path = save_model(artifacts)
         logging.info("Saved model to %s", model_path)
+        manifest = ModelRegistry().publish(
+            artifacts, activate=not args.no_activate, model_path=model_path
+        )
+        logging.info(
+            "Published registry version %s%s",
+            manifest.version,
+            "" if args.no_activate else " (now current)",
+        )
     else:
         logging.info("Skipping model persistence due to --metrics-only flag.")
 
@@ -1,8 +1,15 @@
 """Utilities for loading and splitting the crop recommendation dataset."""
 
+import json
+import logging
+import os
+import shutil
 from dataclasses import dataclass
+from hashlib import sha256
 from pathlib import Path
+from typing import Any
 
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 
@@ -10,6 +17,7 @@ from src.utils.config import PATHS
 
 __all__ = [
     "FEATURE_COLUMNS",
+    "NUMERIC_COLUMNS",
     "TARGET_COLUMN",
     "DatasetSplit",
     "load_dataset",
@@ -27,13 +35,42 @@ FEATURE_COLUMNS: tuple[str, ...] = (
     "region",
 )
 TARGET_COLUMN = "crop"
+NUMERIC_COLUMNS: tuple[str, ...] = tuple(
+    column for column in FEATURE_COLUMNS if column != "region"
+)
+_CATEGORICAL_COLUMNS: tuple[str, ...] = ("region", TARGET_COLUMN)
+_SNAPSHOT_NAME = "crop_dataset"
+
+
+def _source_paths() -> tuple[Path, Path]:
+    return (
+        PATHS.data_raw / "crop_recommendation_region_augmented.csv",
+        PATHS.data_raw / "crop_recommendation.csv",
+    )
+
+
+def load_dataset(path: Path | None = None, *, use_cache: bool = True) -> pd.DataFrame:
+    """Load and combine the original and region-aware crop datasets as a pandas DataFrame.
+
+    The cleaned frame is snapshotted under ``PATHS.data_processed`` as typed
+    ``.npy`` columns and reused (memory-mapped) until a source CSV changes.
+    """
+    sources = _source_paths()
+    if use_cache:
+        cached = _load_snapshot(sources)
+        if cached is not None:
+            return cached
+    combined = _build_dataset(*sources)
+    if use_cache:
+        try:
+            _write_snapshot(combined, sources)
+        except OSError as exc:
+            logging.warning("Could not write dataset snapshot: %s", exc)
+    return combined
 
 
-def load_dataset(path: Path | None = None) -> pd.DataFrame:
-    """Load and combine the original and region-aware crop datasets as a pandas DataFrame."""
+def _build_dataset(region_path: Path, orig_path: Path) -> pd.DataFrame:
     # Load both datasets
-    region_path = PATHS.data_raw / "crop_recommendation_region_augmented.csv"
-    orig_path = PATHS.data_raw / "crop_recommendation.csv"
     region_df = pd.read_csv(region_path, comment="#")
     orig_df = pd.read_csv(orig_path, comment="#")
     # Ensure column names match
@@ -68,7 +105,7 @@ def load_dataset(path: Path | None = None) -> pd.DataFrame:
     if TARGET_COLUMN not in combined.columns:
         combined[TARGET_COLUMN] = "unknown"
     # Remove rows with invalid numeric data, keep all crops with valid numeric data
-    numeric_cols = ["N", "P", "K", "temperature", "humidity", "ph", "rainfall"]
+    numeric_cols = list(NUMERIC_COLUMNS)
     for col in numeric_cols:
         if col in combined.columns:
             combined[col] = pd.to_numeric(combined[col], errors="coerce")
@@ -92,6 +129,135 @@ def load_dataset(path: Path | None = None) -> pd.DataFrame:
     return combined
 
 
+def _file_sha256(path: Path) -> str:
+    digest = sha256()
+    with path.open("rb") as file_handle:
+        for block in iter(lambda: file_handle.read(131072), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_signature(
+    sources: tuple[Path, ...], previous: dict[str, Any] | None = None
+) -> dict[str, dict[str, Any]]:
+    """Size, mtime and sha256 per source; hashes are reused when size/mtime match."""
+
+    previous = previous or {}
+    signature: dict[str, dict[str, Any]] = {}
+    for source in sources:
+        stat = source.stat()
+        entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        known = previous.get(source.name)
+        if known and all(known.get(key) == value for key, value in entry.items()):
+            entry["sha256"] = known["sha256"]
+        else:
+            entry["sha256"] = _file_sha256(source)
+        signature[source.name] = entry
+    return signature
+
+
+def _snapshot_root() -> Path:
+    return PATHS.data_processed / _SNAPSHOT_NAME
+
+
+def _read_pointer() -> dict[str, Any] | None:
+    try:
+        return json.loads((_snapshot_root() / "current.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _load_snapshot(sources: tuple[Path, ...]) -> pd.DataFrame | None:
+    pointer = _read_pointer()
+    if pointer is None:
+        return None
+    try:
+        recorded = pointer["signature"]
+        signature = _source_signature(sources, recorded)
+    except (OSError, KeyError, TypeError):
+        return None
+    if {name: entry["sha256"] for name, entry in signature.items()} != {
+        name: entry.get("sha256") for name, entry in recorded.items()
+    }:
+        return None
+    if signature != recorded:
+        # Touched but unchanged sources: refresh stat info so we skip hashing next time.
+        try:
+            _write_pointer({**pointer, "signature": signature})
+        except OSError as exc:
+            logging.warning("Could not refresh dataset snapshot pointer: %s", exc)
+
+    snapshot_dir = _snapshot_root() / pointer["directory"]
+    try:
+        columns: dict[str, Any] = {}
+        for column in pointer["columns"]:
+            if column in _CATEGORICAL_COLUMNS:
+                codes = np.load(snapshot_dir / f"{column}.codes.npy", mmap_mode="r")
+                categories = np.asarray(pointer["categories"][column], dtype=object)
+                columns[column] = categories[codes]
+            else:
+                columns[column] = np.load(snapshot_dir / f"{column}.npy", mmap_mode="r")
+        if pointer.get("range_index"):
+            index = pd.RangeIndex(int(pointer["rows"]))
+        else:
+            index = pd.Index(np.load(snapshot_dir / "index.npy", mmap_mode="r"))
+    except (OSError, KeyError, ValueError) as exc:
+        logging.warning("Ignoring unreadable dataset snapshot: %s", exc)
+        return None
+    return pd.DataFrame(columns, index=index, columns=pointer["columns"])
+
+
+def _write_pointer(pointer: dict[str, Any]) -> None:
+    pointer_path = _snapshot_root() / "current.json"
+    temp_path = pointer_path.with_name(f".current.{os.getpid()}.tmp")
+    temp_path.write_text(json.dumps(pointer, indent=2), encoding="utf-8")
+    os.replace(temp_path, pointer_path)
+
+
+def _write_snapshot(frame: pd.DataFrame, sources: tuple[Path, ...]) -> None:
+    signature = _source_signature(sources)
+    source_hashes = {name: entry["sha256"] for name, entry in signature.items()}
+    digest = sha256(
+        json.dumps(source_hashes, sort_keys=True).encode("utf-8")
+    ).hexdigest()[:16]
+    root = _snapshot_root()
+    snapshot_dir = root / digest
+    staging_dir = root / f".{digest}.{os.getpid()}.staging"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    staging_dir.mkdir(parents=True)
+
+    categories: dict[str, list[str]] = {}
+    for column in frame.columns:
+        values = frame[column]
+        if column in _CATEGORICAL_COLUMNS:
+            codes, uniques = pd.factorize(values.astype(str), sort=True)
+            np.save(staging_dir / f"{column}.codes.npy", codes.astype(np.int32))
+            categories[column] = [str(value) for value in uniques]
+        else:
+            np.save(staging_dir / f"{column}.npy", values.to_numpy())
+    range_index = frame.index.equals(pd.RangeIndex(len(frame)))
+    if not range_index:
+        np.save(staging_dir / "index.npy", frame.index.to_numpy())
+
+    if snapshot_dir.exists():
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    else:
+        os.replace(staging_dir, snapshot_dir)
+    previous = _read_pointer()
+    _write_pointer(
+        {
+            "directory": digest,
+            "signature": signature,
+            "columns": list(frame.columns),
+            "categories": categories,
+            "rows": len(frame),
+            "range_index": range_index,
+        }
+    )
+    if previous and previous.get("directory") not in (None, digest):
+        shutil.rmtree(root / previous["directory"], ignore_errors=True)
+
+
 @dataclass(slots=True)
 class DatasetSplit:
     """Structured dataset split returned by ``split_dataset``."""
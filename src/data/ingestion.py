@@ -8,9 +8,8 @@ from hashlib import sha256
 from pathlib import Path
 from typing import Iterable, Sequence
 
-import requests
-
 from src.utils.config import PATHS
+from src.utils.http import get_http_client
 
 __all__ = [
     "DatasetInfo",
@@ -50,7 +49,8 @@ DEFAULT_EXPECTED_SHA256 = os.getenv(
 
 
 def _write_stream_to_file(url: str, target: Path) -> None:
-    with requests.get(url, timeout=60, stream=True) as response:
+    client = get_http_client("dataset-mirrors", max_concurrency=2)
+    with client.stream("GET", url, timeout=60) as response:
         response.raise_for_status()
         with target.open("wb") as file_handle:
             for chunk in response.iter_content(chunk_size=8192):
@@ -1,8 +1,10 @@
 """Model definition and persistence helpers."""
 
+from .compiled import CompiledForest, UnsupportedPipelineError, compile_pipeline
 from .disease import CropDiseaseClassifier, DiseasePrediction
 from .predictor import (
     CropPredictor,
+    ModelLoadError,
     Recommendation,
     RecommendationResult,
     load_pipeline,
@@ -11,9 +13,13 @@ from .yield_estimator import YieldEstimator, YieldPrediction
 
 __all__ = [
     "CropPredictor",
+    "ModelLoadError",
     "Recommendation",
     "RecommendationResult",
     "load_pipeline",
+    "CompiledForest",
+    "UnsupportedPipelineError",
+    "compile_pipeline",
     "CropDiseaseClassifier",
     "DiseasePrediction",
     "YieldEstimator",
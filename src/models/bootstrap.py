@@ -0,0 +1,157 @@
+"""Background retraining used when the persisted model cannot be loaded."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Callable, Literal
+
+import joblib
+from sklearn.pipeline import Pipeline
+
+from src.data.dataset import split_dataset
+from src.models.training import TrainingArtifacts, TrainingConfig, train_model
+
+__all__ = [
+    "BootstrapStatus",
+    "ModelBootstrapper",
+    "QUICK_FIT_CONFIG",
+    "load_fallback_pipeline",
+]
+
+BootstrapState = Literal["idle", "running", "ready", "failed"]
+
+# Small forest fitted synchronously when no usable fallback artifact exists.
+QUICK_FIT_CONFIG = TrainingConfig(n_estimators=25, max_depth=12)
+
+
+@dataclass(frozen=True, slots=True)
+class BootstrapStatus:
+    """Snapshot of the background retrain, safe to poll from the UI."""
+
+    state: BootstrapState = "idle"
+    stage: str = "Not started"
+    progress: float = 0.0
+    started_at: float | None = None
+    finished_at: float | None = None
+    error: str | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.state == "running"
+
+
+def load_fallback_pipeline(fallback_path: Path | None = None) -> Pipeline:
+    """Return a servable pipeline while the full model retrains.
+
+    Prefers a pickled pipeline at ``fallback_path``; otherwise fits a small
+    forest with ``QUICK_FIT_CONFIG``.
+    """
+
+    if fallback_path is not None and fallback_path.exists():
+        try:
+            pipeline = joblib.load(fallback_path)
+        except Exception as exc:  # noqa: BLE001 - fall through to quick fit
+            logging.warning(
+                "Fallback model %s unusable (%s).", fallback_path, exc.__class__.__name__
+            )
+        else:
+            if isinstance(pipeline, Pipeline):
+                return pipeline
+    logging.info("Fitting a quick fallback model while the full model retrains.")
+    return train_model(QUICK_FIT_CONFIG).pipeline
+
+
+class ModelBootstrapper:
+    """Retrain and persist the full model on a daemon thread.
+
+    ``start`` returns immediately; ``persist`` stores the fitted artifacts and
+    ``on_ready`` then receives the pipeline, so callers can swap it into a
+    live predictor.
+    """
+
+    def __init__(
+        self,
+        *,
+        persist: Callable[[TrainingArtifacts], object],
+        config: TrainingConfig | None = None,
+    ) -> None:
+        self._persist = persist
+        self._config = config or TrainingConfig()
+        self._status = BootstrapStatus()
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def status(self) -> BootstrapStatus:
+        return self._status
+
+    def start(self, on_ready: Callable[[Pipeline], None] | None = None) -> bool:
+        """Launch the retrain unless one is already running or finished."""
+
+        with self._lock:
+            if self._status.state in ("running", "ready"):
+                return False
+            self._done.clear()
+            self._status = BootstrapStatus(
+                state="running",
+                stage="Loading dataset",
+                started_at=time.time(),
+            )
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(on_ready,),
+                name="model-bootstrap",
+                daemon=True,
+            )
+            self._thread.start()
+        return True
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the retrain finishes; returns ``False`` on timeout."""
+
+        return self._done.wait(timeout)
+
+    def _update(self, **changes: object) -> None:
+        self._status = replace(self._status, **changes)
+
+    def _run(self, on_ready: Callable[[Pipeline], None] | None) -> None:
+        try:
+            dataset = split_dataset(
+                test_size=self._config.test_size,
+                random_state=self._config.random_state,
+            )
+            self._update(stage="Fitting model", progress=0.05)
+            artifacts = train_model(
+                self._config,
+                dataset,
+                progress=lambda fraction: self._update(progress=0.05 + 0.85 * fraction),
+            )
+            self._update(stage="Saving model", progress=0.92)
+            self._persist(artifacts)
+            if on_ready is not None:
+                self._update(stage="Swapping in new model", progress=0.97)
+                on_ready(artifacts.pipeline)
+            self._update(
+                state="ready",
+                stage="Full model active",
+                progress=1.0,
+                finished_at=time.time(),
+            )
+            logging.info(
+                "Background retrain finished (accuracy %.3f).",
+                artifacts.metrics["accuracy"],
+            )
+        except Exception as exc:  # noqa: BLE001 - surfaced through status
+            logging.exception("Background model retrain failed.")
+            self._update(
+                state="failed",
+                stage="Retrain failed",
+                error=f"{exc.__class__.__name__}: {exc}",
+                finished_at=time.time(),
+            )
+        finally:
+            self._done.set()
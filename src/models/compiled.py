@@ -0,0 +1,196 @@
+"""Flattened NumPy evaluator for the fitted crop recommendation pipeline."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+__all__ = [
+    "CompiledForest",
+    "UnsupportedPipelineError",
+    "compile_pipeline",
+]
+
+
+class UnsupportedPipelineError(TypeError):
+    """Raised when a pipeline uses steps the compiled evaluator cannot mirror."""
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledForest:
+    """Contiguous-array view of the scaler, region encoder and forest.
+
+    Trees are stored back to back; ``roots`` holds the offset of each tree's
+    first node. Leaves point to themselves so every row can be walked for
+    ``max_depth`` steps without branching on leaf status.
+    """
+
+    numeric_columns: tuple[str, ...]
+    numeric_mean: np.ndarray
+    numeric_scale: np.ndarray
+    categorical_column: str | None
+    category_index: dict[str, int]
+    category_offset: int
+    n_features: int
+    feature: np.ndarray
+    threshold: np.ndarray
+    left: np.ndarray
+    right: np.ndarray
+    leaf_proba: np.ndarray
+    roots: np.ndarray
+    max_depth: int
+    classes_: np.ndarray
+
+    @property
+    def n_trees(self) -> int:
+        return int(self.roots.shape[0])
+
+    def transform(self, frame: pd.DataFrame) -> np.ndarray:
+        """Mirror the ``ColumnTransformer`` output for ``frame``."""
+
+        n_rows = len(frame)
+        matrix = np.zeros((n_rows, self.n_features), dtype=np.float64)
+        if self.numeric_columns:
+            numeric = frame[list(self.numeric_columns)].to_numpy(dtype=np.float64)
+            matrix[:, : len(self.numeric_columns)] = (
+                numeric - self.numeric_mean
+            ) / self.numeric_scale
+        if self.categorical_column is not None:
+            lookup = self.category_index
+            for row, value in enumerate(frame[self.categorical_column].tolist()):
+                position = lookup.get(value)
+                if position is not None:
+                    matrix[row, self.category_offset + position] = 1.0
+        # The forest compares float32 features against float64 thresholds.
+        return matrix.astype(np.float32)
+
+    def predict_proba(self, frame: pd.DataFrame) -> np.ndarray:
+        features = self.transform(frame)
+        n_rows = features.shape[0]
+        rows = np.arange(n_rows)[:, None]
+        nodes = np.broadcast_to(self.roots, (n_rows, self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            go_left = features[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return self.leaf_proba[nodes].mean(axis=1)
+
+
+def _unwrap(transformer: object) -> object:
+    if isinstance(transformer, Pipeline) and len(transformer.steps) == 1:
+        return transformer.steps[0][1]
+    return transformer
+
+
+def _flatten_trees(
+    forest: RandomForestClassifier,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, int]:
+    features: list[np.ndarray] = []
+    thresholds: list[np.ndarray] = []
+    lefts: list[np.ndarray] = []
+    rights: list[np.ndarray] = []
+    probas: list[np.ndarray] = []
+    roots: list[int] = []
+    offset = 0
+    max_depth = 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        node_ids = np.arange(tree.node_count, dtype=np.intp)
+        is_leaf = tree.children_left < 0
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.intp))
+        thresholds.append(tree.threshold.astype(np.float64))
+        lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+        rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+        values = tree.value[:, 0, :].astype(np.float64)
+        totals = values.sum(axis=1, keepdims=True)
+        totals[totals == 0.0] = 1.0
+        probas.append(values / totals)
+        roots.append(offset)
+        offset += tree.node_count
+        max_depth = max(max_depth, int(tree.max_depth))
+    return (
+        np.concatenate(features),
+        np.concatenate(thresholds),
+        np.concatenate(lefts).astype(np.intp),
+        np.concatenate(rights).astype(np.intp),
+        np.concatenate(probas),
+        np.asarray(roots, dtype=np.intp),
+        max_depth,
+    )
+
+
+def compile_pipeline(pipeline: Pipeline) -> CompiledForest:
+    """Flatten a fitted ``features`` + ``classifier`` pipeline into NumPy arrays."""
+
+    if not isinstance(pipeline, Pipeline) or len(pipeline.steps) != 2:
+        raise UnsupportedPipelineError("Expected a two-step features/classifier pipeline")
+    column_transformer = pipeline.steps[0][1]
+    forest = pipeline.steps[-1][1]
+    if not isinstance(forest, RandomForestClassifier) or forest.n_outputs_ != 1:
+        raise UnsupportedPipelineError("Expected a single-output RandomForestClassifier")
+
+    numeric_columns: Sequence[str] = ()
+    scaler: StandardScaler | None = None
+    categorical_column: str | None = None
+    encoder: OneHotEncoder | None = None
+    for name, transformer, columns in getattr(column_transformer, "transformers_", ()):
+        if isinstance(transformer, str):
+            if transformer == "drop":
+                continue
+            raise UnsupportedPipelineError(f"Unsupported passthrough block: {name!r}")
+        step = _unwrap(transformer)
+        if isinstance(step, StandardScaler) and scaler is None and encoder is None:
+            scaler = step
+            numeric_columns = tuple(str(column) for column in columns)
+        elif isinstance(step, OneHotEncoder) and encoder is None and len(columns) == 1:
+            if step.handle_unknown != "ignore" or step.drop_idx_ is not None:
+                raise UnsupportedPipelineError(
+                    "Only OneHotEncoder(handle_unknown='ignore', drop=None) is supported"
+                )
+            encoder = step
+            categorical_column = str(columns[0])
+        else:
+            raise UnsupportedPipelineError(
+                f"Unsupported transformer block {name!r}: {type(step).__name__}"
+            )
+    if scaler is None and encoder is None:
+        raise UnsupportedPipelineError("Pipeline has no supported feature transformers")
+
+    n_numeric = len(numeric_columns)
+    if scaler is not None:
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(n_numeric)
+        scale = scaler.scale_ if scaler.with_std else np.ones(n_numeric)
+    else:
+        mean = np.zeros(0)
+        scale = np.ones(0)
+    categories = list(encoder.categories_[0]) if encoder is not None else []
+    n_features = n_numeric + len(categories)
+    if n_features != forest.n_features_in_:
+        raise UnsupportedPipelineError(
+            f"Transformed width {n_features} does not match forest input {forest.n_features_in_}"
+        )
+
+    feature, threshold, left, right, leaf_proba, roots, max_depth = _flatten_trees(forest)
+    return CompiledForest(
+        numeric_columns=tuple(numeric_columns),
+        numeric_mean=np.asarray(mean, dtype=np.float64),
+        numeric_scale=np.asarray(scale, dtype=np.float64),
+        categorical_column=categorical_column,
+        category_index={str(value): index for index, value in enumerate(categories)},
+        category_offset=n_numeric,
+        n_features=n_features,
+        feature=feature,
+        threshold=threshold,
+        left=left,
+        right=right,
+        leaf_proba=leaf_proba,
+        roots=roots,
+        max_depth=max_depth,
+        classes_=np.asarray(forest.classes_),
+    )
+
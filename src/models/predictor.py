@@ -5,7 +5,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 import logging
 from pathlib import Path
-from typing import Iterable, Sequence
+from typing import Iterable, Mapping, Sequence
 
 import joblib
 import numpy as np
@@ -13,17 +13,29 @@ import pandas as pd
 from sklearn.pipeline import Pipeline
 
 from src.data.dataset import FEATURE_COLUMNS, TARGET_COLUMN
-from src.models.training import save_model, train_model
+from src.models.compiled import (
+    CompiledForest,
+    UnsupportedPipelineError,
+    compile_pipeline,
+)
+from src.models.registry import ModelRegistry
+from src.models.training import TrainingArtifacts, save_model, train_model
 from src.utils.config import PATHS
 
 __all__ = [
     "Recommendation",
     "RecommendationResult",
     "CropPredictor",
+    "ModelLoadError",
     "load_pipeline",
+    "persist_retrained",
 ]
 
 
+class ModelLoadError(RuntimeError):
+    """Raised when a model artifact exists but cannot be deserialised."""
+
+
 @dataclass(slots=True)
 class Recommendation:
     crop: str
@@ -37,34 +49,130 @@ class RecommendationResult:
 
 
 class CropPredictor:
-    """Wrapper around the trained scikit-learn pipeline."""
+    """Wrapper around the trained scikit-learn pipeline.
+
+    With ``use_compiled=True`` the fitted pipeline is flattened into NumPy
+    arrays once and requests are evaluated without calling into sklearn. If
+    the pipeline cannot be compiled the predictor keeps using ``predict_proba``.
 
-    def __init__(self, pipeline: Pipeline, *, top_k: int = 3) -> None:
-        self._pipeline = pipeline
+    ``swap_pipeline`` replaces the model in place; requests already running
+    finish on the pipeline they started with.
+    """
+
+    def __init__(
+        self, pipeline: Pipeline, *, top_k: int = 3, use_compiled: bool = False
+    ) -> None:
         self._top_k = top_k
+        self._use_compiled = use_compiled
+        self._generation = 0
+        self._state = self._prepare(pipeline)
 
     @property
     def top_k(self) -> int:
         return self._top_k
 
+    @property
+    def is_compiled(self) -> bool:
+        return self._state[1] is not None
+
+    @property
+    def generation(self) -> int:
+        """Number of times the underlying pipeline has been swapped."""
+
+        return self._generation
+
+    @property
+    def pipeline(self) -> Pipeline:
+        return self._state[0]
+
+    def swap_pipeline(self, pipeline: Pipeline) -> None:
+        """Atomically replace the pipeline (and its compiled form)."""
+
+        state = self._prepare(pipeline)
+        self._state = state
+        self._generation += 1
+
+    def _prepare(self, pipeline: Pipeline) -> tuple[Pipeline, CompiledForest | None]:
+        compiled: CompiledForest | None = None
+        if self._use_compiled:
+            try:
+                compiled = compile_pipeline(pipeline)
+            except UnsupportedPipelineError as exc:
+                logging.warning("Falling back to sklearn inference: %s", exc)
+        return pipeline, compiled
+
     def recommend(
         self, features: pd.DataFrame | dict[str, float]
     ) -> RecommendationResult:
+        # Current UI submits a single sample; pick the first row.
+        return self.recommend_many(features)[0]
+
+    def recommend_many(
+        self, features: pd.DataFrame | Mapping[str, float] | Iterable[Mapping[str, float]]
+    ) -> tuple[RecommendationResult, ...]:
+        """Score every row with a single ``predict_proba`` call."""
+
         frame = self._ensure_frame(features)
-        probabilities = self._pipeline.predict_proba(frame)
-        classes = self._pipeline.classes_
+        if frame.empty:
+            return ()
+        probabilities, classes = self._predict_proba(frame)
+        return self._build_results(probabilities, classes)
 
-        # Current UI submits a single sample; pick the first row.
-        top_indices = np.argsort(probabilities[0])[::-1][: self._top_k]
-        recommendations = tuple(
-            Recommendation(
-                crop=str(classes[index]),
-                probability=float(probabilities[0, index]),
-                yield_category=self._probability_to_yield(probabilities[0, index]),
+    def predict_proba(
+        self, features: pd.DataFrame | Mapping[str, float] | Iterable[Mapping[str, float]]
+    ) -> np.ndarray:
+        """Class probabilities in ``classes_`` order for every row."""
+
+        return self._predict_proba(self._ensure_frame(features))[0]
+
+    @property
+    def classes_(self) -> np.ndarray:
+        return self._state[0].classes_
+
+    def _predict_proba(self, frame: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        pipeline, compiled = self._state
+        if compiled is not None:
+            return compiled.predict_proba(frame), compiled.classes_
+        return pipeline.predict_proba(frame), pipeline.classes_
+
+    def _build_results(
+        self, probabilities: np.ndarray, classes: Sequence[str]
+    ) -> tuple[RecommendationResult, ...]:
+        top_indices = self._top_k_indices(probabilities, self._top_k)
+        top_probabilities = np.take_along_axis(probabilities, top_indices, axis=1)
+        return tuple(
+            RecommendationResult(
+                recommendations=tuple(
+                    Recommendation(
+                        crop=str(classes[index]),
+                        probability=float(probability),
+                        yield_category=self._probability_to_yield(probability),
+                    )
+                    for index, probability in zip(row_indices, row_probabilities)
+                )
+            )
+            for row_indices, row_probabilities in zip(
+                top_indices.tolist(), top_probabilities.tolist()
             )
-            for index in top_indices
         )
-        return RecommendationResult(recommendations=recommendations)
+
+    @staticmethod
+    def _top_k_indices(probabilities: np.ndarray, top_k: int) -> np.ndarray:
+        """Return per-row class indices of the ``top_k`` probabilities, best first."""
+
+        n_classes = probabilities.shape[1]
+        k = max(0, min(top_k, n_classes))
+        if k == 0:
+            return np.empty((probabilities.shape[0], 0), dtype=np.intp)
+        if k < n_classes:
+            candidates = np.argpartition(-probabilities, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(
+                np.arange(n_classes), probabilities.shape
+            ).copy()
+        candidate_scores = np.take_along_axis(probabilities, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind="stable")
+        return np.take_along_axis(candidates, order, axis=1)
 
     @staticmethod
     def _probability_to_yield(probability: float) -> str:
@@ -75,16 +183,20 @@ class CropPredictor:
         return "Low"
 
     @staticmethod
-    def _ensure_frame(features: pd.DataFrame | dict[str, float]) -> pd.DataFrame:
+    def _ensure_frame(
+        features: pd.DataFrame | Mapping[str, float] | Iterable[Mapping[str, float]],
+    ) -> pd.DataFrame:
         if isinstance(features, pd.DataFrame):
             missing = [
                 column for column in FEATURE_COLUMNS if column not in features.columns
             ]
             if missing:
                 raise ValueError(f"Missing feature columns: {missing}")
-            frame = features[FEATURE_COLUMNS].copy()
-        else:
+            frame = features[list(FEATURE_COLUMNS)].copy()
+        elif isinstance(features, Mapping):
             frame = pd.DataFrame([features], columns=FEATURE_COLUMNS)
+        else:
+            frame = pd.DataFrame.from_records(list(features), columns=FEATURE_COLUMNS)
 
         # Keep preprocessing stable across environments: region must always be string-like.
         if "region" in frame.columns:
@@ -100,8 +212,40 @@ class CropPredictor:
         return frame
 
 
-def load_pipeline(model_path: Path | None = None) -> Pipeline:
-    path = model_path or PATHS.artifacts_models / "crop_recommender.joblib"
+def _default_model_path() -> Path:
+    return ModelRegistry().current_model_path() or (
+        PATHS.artifacts_models / "crop_recommender.joblib"
+    )
+
+
+def persist_retrained(artifacts: TrainingArtifacts, model_dir: Path | None = None) -> Path:
+    """Save a retrained model where ``load_pipeline`` will find it next time.
+
+    When the registry has an active version the model is published as a new
+    version; otherwise the legacy single-file artifact is overwritten.
+    """
+
+    registry = ModelRegistry(model_dir)
+    if registry.current_version() is not None:
+        manifest = registry.publish(artifacts)
+        return registry.version_dir(manifest.version) / manifest.model_file
+    return save_model(artifacts, model_dir=model_dir)
+
+
+def load_pipeline(
+    model_path: Path | None = None, *, retrain_on_failure: bool = True
+) -> Pipeline:
+    """Load the persisted pipeline.
+
+    Without ``model_path`` the registry's current version is used, falling
+    back to ``artifacts/models/crop_recommender.joblib``. When the artifact
+    exists but cannot be loaded (typically a sklearn/joblib version change),
+    the model is retrained inline unless ``retrain_on_failure`` is ``False``,
+    in which case ``ModelLoadError`` is raised so the caller can retrain off
+    the request path.
+    """
+
+    path = model_path or _default_model_path()
     if not path.exists():
         raise FileNotFoundError(
             "Trained model not found. Run scripts/train_model.py first."
@@ -109,6 +253,8 @@ def load_pipeline(model_path: Path | None = None) -> Pipeline:
     try:
         pipeline = joblib.load(path)
     except Exception as exc:
+        if not retrain_on_failure:
+            raise ModelLoadError(f"Could not load model from {path}") from exc
         # Handle sklearn/joblib incompatibility (common on cloud when package versions change).
         logging.warning(
             "Model load failed for %s (%s). Re-training a compatible model.",
@@ -116,7 +262,10 @@ def load_pipeline(model_path: Path | None = None) -> Pipeline:
             exc.__class__.__name__,
         )
         artifacts = train_model()
-        save_model(artifacts, model_dir=path.parent)
+        if model_path is None:
+            persist_retrained(artifacts)
+        else:
+            save_model(artifacts, model_dir=path.parent)
         pipeline = artifacts.pipeline
     if not isinstance(pipeline, Pipeline):
         raise TypeError("Loaded object is not a scikit-learn Pipeline")
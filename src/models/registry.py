@@ -0,0 +1,293 @@
+"""Versioned model artifacts with an atomically switched ``CURRENT`` pointer.
+
+Layout under ``PATHS.artifacts_models``::
+
+    versions/<version>/crop_recommender.joblib
+    versions/<version>/manifest.json
+    CURRENT                      # name of the active version
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Callable, Mapping
+
+import joblib
+import sklearn
+from sklearn.pipeline import Pipeline
+
+from src.models.training import TrainingArtifacts, _json_default
+from src.utils.config import PATHS
+
+__all__ = [
+    "ModelManifest",
+    "ModelRegistry",
+    "RegistryError",
+    "RegistryWatcher",
+]
+
+MODEL_FILENAME = "crop_recommender.joblib"
+MANIFEST_FILENAME = "manifest.json"
+CURRENT_POINTER = "CURRENT"
+
+
+class RegistryError(RuntimeError):
+    """Raised when a registry version is missing or fails verification."""
+
+
+@dataclass(frozen=True, slots=True)
+class ModelManifest:
+    """Metadata stored next to each versioned model artifact."""
+
+    version: str
+    created_at: str
+    model_file: str
+    sha256: str
+    feature_names: tuple[str, ...]
+    sklearn_version: str
+    metrics: Mapping[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_json(cls, payload: Mapping[str, Any]) -> "ModelManifest":
+        return cls(
+            version=str(payload["version"]),
+            created_at=str(payload["created_at"]),
+            model_file=str(payload.get("model_file", MODEL_FILENAME)),
+            sha256=str(payload["sha256"]),
+            feature_names=tuple(payload.get("feature_names", ())),
+            sklearn_version=str(payload.get("sklearn_version", "")),
+            metrics=payload.get("metrics", {}),
+        )
+
+
+def _file_sha256(path: Path) -> str:
+    digest = sha256()
+    with path.open("rb") as file_handle:
+        for block in iter(lambda: file_handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temp_path.write_text(text, encoding="utf-8")
+    os.replace(temp_path, path)
+
+
+class ModelRegistry:
+    """Publish, activate and load versioned crop recommendation models."""
+
+    def __init__(self, root: Path | None = None) -> None:
+        self._root = root or PATHS.artifacts_models
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    @property
+    def pointer_path(self) -> Path:
+        return self._root / CURRENT_POINTER
+
+    def version_dir(self, version: str) -> Path:
+        return self._root / "versions" / version
+
+    def versions(self) -> list[str]:
+        versions_root = self._root / "versions"
+        if not versions_root.exists():
+            return []
+        return sorted(
+            path.name
+            for path in versions_root.iterdir()
+            if not path.name.startswith(".") and (path / MANIFEST_FILENAME).exists()
+        )
+
+    def current_version(self) -> str | None:
+        try:
+            version = self.pointer_path.read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+        return version or None
+
+    def current_model_path(self) -> Path | None:
+        version = self.current_version()
+        if version is None:
+            return None
+        path = self.version_dir(version) / MODEL_FILENAME
+        return path if path.exists() else None
+
+    def manifest(self, version: str) -> ModelManifest:
+        manifest_path = self.version_dir(version) / MANIFEST_FILENAME
+        try:
+            payload = json.loads(manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            raise RegistryError(f"Manifest for version {version!r} is unreadable") from exc
+        return ModelManifest.from_json(payload)
+
+    def publish(
+        self,
+        artifacts: TrainingArtifacts,
+        *,
+        version: str | None = None,
+        activate: bool = True,
+        model_path: Path | None = None,
+    ) -> ModelManifest:
+        """Persist ``artifacts`` as a new version and optionally make it current.
+
+        ``model_path`` names an already-saved copy of ``artifacts.pipeline``;
+        it is hard-linked (or copied) into the version instead of dumped again.
+        """
+
+        created_at = datetime.now(timezone.utc)
+        version = version or created_at.strftime("%Y%m%dT%H%M%S%fZ")
+        target_dir = self.version_dir(version)
+        if target_dir.exists():
+            raise RegistryError(f"Version {version!r} already exists")
+        staging_dir = target_dir.with_name(f".{version}.staging")
+        staging_dir.mkdir(parents=True, exist_ok=False)
+
+        staged_model = staging_dir / MODEL_FILENAME
+        if model_path is None:
+            joblib.dump(artifacts.pipeline, staged_model)
+        else:
+            try:
+                os.link(model_path, staged_model)
+            except OSError:
+                shutil.copyfile(model_path, staged_model)
+        manifest = ModelManifest(
+            version=version,
+            created_at=created_at.isoformat(),
+            model_file=MODEL_FILENAME,
+            sha256=_file_sha256(staged_model),
+            feature_names=tuple(artifacts.feature_names),
+            sklearn_version=sklearn.__version__,
+            metrics=artifacts.metrics,
+        )
+        (staging_dir / MANIFEST_FILENAME).write_text(
+            json.dumps(asdict(manifest), indent=2, default=_json_default),
+            encoding="utf-8",
+        )
+        os.replace(staging_dir, target_dir)
+        if activate:
+            self.activate(version)
+        return manifest
+
+    def activate(self, version: str) -> None:
+        """Atomically point ``CURRENT`` at an existing version."""
+
+        if not (self.version_dir(version) / MANIFEST_FILENAME).exists():
+            raise RegistryError(f"Unknown model version {version!r}")
+        self._root.mkdir(parents=True, exist_ok=True)
+        _atomic_write_text(self.pointer_path, f"{version}\n")
+
+    def load(self, version: str | None = None) -> tuple[Pipeline, ModelManifest]:
+        """Load and checksum-verify a version (the current one by default)."""
+
+        version = version or self.current_version()
+        if version is None:
+            raise RegistryError("No current model version is set")
+        manifest = self.manifest(version)
+        model_path = self.version_dir(version) / manifest.model_file
+        if not model_path.exists():
+            raise RegistryError(f"Model file for version {version!r} is missing")
+        if _file_sha256(model_path) != manifest.sha256:
+            raise RegistryError(f"Checksum mismatch for model version {version!r}")
+        pipeline = joblib.load(model_path)
+        if not isinstance(pipeline, Pipeline):
+            raise RegistryError(f"Version {version!r} is not a scikit-learn Pipeline")
+        return pipeline, manifest
+
+
+class RegistryWatcher:
+    """Poll the ``CURRENT`` pointer and hand newly activated models to a callback.
+
+    Loading happens on the watcher thread, so requests keep using the old
+    model until ``on_change`` swaps the new one in.
+    """
+
+    def __init__(self, registry: ModelRegistry, *, interval: float = 10.0) -> None:
+        self._registry = registry
+        self._interval = interval
+        self._on_change: Callable[[Pipeline, ModelManifest], None] | None = None
+        self._active_version: str | None = None
+        # Version -> manifest checksum it failed with; retried once either changes.
+        self._failed_versions: dict[str, str | None] = {}
+        self._last_pointer: str | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def active_version(self) -> str | None:
+        return self._active_version
+
+    def start(
+        self,
+        on_change: Callable[[Pipeline, ModelManifest], None],
+        *,
+        loaded_version: str | None,
+    ) -> None:
+        """Begin (or retarget) watching; ``loaded_version`` is already being served."""
+
+        with self._lock:
+            self._on_change = on_change
+            self._active_version = loaded_version
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._loop, name="model-registry-watcher", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def check_now(self) -> bool:
+        """Swap in the current version if it changed; returns ``True`` on swap."""
+
+        version = self._registry.current_version()
+        if version != self._last_pointer:
+            # A moved CURRENT pointer gives every version a fresh chance.
+            self._last_pointer = version
+            self._failed_versions.clear()
+        if version is None or version == self._active_version:
+            return False
+        if version in self._failed_versions:
+            if self._manifest_checksum(version) == self._failed_versions[version]:
+                return False
+            del self._failed_versions[version]
+        try:
+            pipeline, manifest = self._registry.load(version)
+        except Exception as exc:  # noqa: BLE001 - keep serving the old model
+            logging.warning("Skipping model version %s: %s", version, exc)
+            self._failed_versions[version] = self._manifest_checksum(version)
+            return False
+        with self._lock:
+            callback = self._on_change
+            if callback is None:
+                return False
+            callback(pipeline, manifest)
+            self._active_version = version
+        logging.info("Hot-swapped crop model to version %s.", version)
+        return True
+
+    def _manifest_checksum(self, version: str) -> str | None:
+        try:
+            return self._registry.manifest(version).sha256
+        except RegistryError:
+            return None
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                self.check_now()
+            except Exception:  # noqa: BLE001 - watcher must survive
+                logging.exception("Model registry watcher iteration failed.")
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Mapping
+from typing import Any, Callable, Mapping
 
 import joblib
 from sklearn.ensemble import RandomForestClassifier
@@ -22,6 +23,9 @@ __all__ = [
     "save_model",
 ]
 
+# Number of trees grown between progress callbacks in ``train_model``.
+_PROGRESS_CHUNK = 25
+
 
 @dataclass(slots=True)
 class TrainingConfig:
@@ -62,10 +66,43 @@ def _build_model(config: TrainingConfig) -> Pipeline:
     )
 
 
+def _fit_with_progress(
+    model_pipeline: Pipeline,
+    dataset: DatasetSplit,
+    progress: Callable[[float], None],
+) -> None:
+    """Grow the forest in warm-started chunks, reporting the fraction done.
+
+    Warm starting draws tree seeds from the same random stream as a single
+    ``fit`` call, so the fitted forest is identical.
+    """
+
+    features = model_pipeline.named_steps["features"]
+    classifier = model_pipeline.named_steps["classifier"]
+    transformed = features.fit_transform(dataset.x_train, dataset.y_train)
+    total = classifier.n_estimators
+    grown = 0
+    classifier.set_params(warm_start=True)
+    try:
+        while grown < total:
+            grown = min(total, grown + _PROGRESS_CHUNK)
+            classifier.set_params(n_estimators=grown)
+            classifier.fit(transformed, dataset.y_train)
+            progress(grown / total)
+    finally:
+        classifier.set_params(warm_start=False)
+
+
 def train_model(
-    config: TrainingConfig | None = None, dataset: DatasetSplit | None = None
+    config: TrainingConfig | None = None,
+    dataset: DatasetSplit | None = None,
+    *,
+    progress: Callable[[float], None] | None = None,
 ) -> TrainingArtifacts:
-    """Train a RandomForest model and return the fitted pipeline and metrics."""
+    """Train a RandomForest model and return the fitted pipeline and metrics.
+
+    ``progress`` is called with the fraction of trees fitted so far.
+    """
 
     config = config or TrainingConfig()
     dataset = dataset or split_dataset(
@@ -74,7 +111,10 @@ def train_model(
     )
 
     model_pipeline = _build_model(config)
-    model_pipeline.fit(dataset.x_train, dataset.y_train)
+    if progress is None:
+        model_pipeline.fit(dataset.x_train, dataset.y_train)
+    else:
+        _fit_with_progress(model_pipeline, dataset, progress)
 
     predictions = model_pipeline.predict(dataset.x_test)
     probabilities = model_pipeline.predict_proba(dataset.x_test)
@@ -113,7 +153,10 @@ def save_model(artifacts: TrainingArtifacts, *, model_dir: Path | None = None) -
     target_dir = model_dir or PATHS.artifacts_models
     target_dir.mkdir(parents=True, exist_ok=True)
     model_path = target_dir / "crop_recommender.joblib"
-    joblib.dump(artifacts.pipeline, model_path)
+    # Write beside the target and rename so readers never see a partial file.
+    temp_path = model_path.with_name(f".{model_path.name}.{os.getpid()}.tmp")
+    joblib.dump(artifacts.pipeline, temp_path)
+    os.replace(temp_path, model_path)
     return model_path
 
 
@@ -0,0 +1,295 @@
+"""Bounded TTL cache with optional SQLite persistence and stale-while-revalidate."""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Generic, Hashable, TypeVar
+
+__all__ = [
+    "CacheEntry",
+    "CacheStats",
+    "TTLCache",
+]
+
+V = TypeVar("V")
+
+
+@dataclass(frozen=True, slots=True)
+class CacheEntry(Generic[V]):
+    """A cached value together with the wall-clock time it was stored."""
+
+    value: V
+    stored_at: float
+
+    def age(self, now: float | None = None) -> float:
+        return (time.time() if now is None else now) - self.stored_at
+
+
+@dataclass(frozen=True, slots=True)
+class CacheStats:
+    """Counters describing how a ``TTLCache`` has been used."""
+
+    hits: int
+    stale_hits: int
+    misses: int
+    disk_hits: int
+    refreshes: int
+    evictions: int
+    size: int
+    max_entries: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.stale_hits + self.misses
+        return (self.hits + self.stale_hits) / total if total else 0.0
+
+
+class _SQLiteStore:
+    """Key/value rows shared between processes through one SQLite file."""
+
+    def __init__(self, path: Path, namespace: str) -> None:
+        self._path = path
+        self._namespace = namespace
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " stored_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._path, timeout=5.0)
+
+    def get(self, key: str) -> tuple[str, float] | None:
+        with self._lock, self._connect() as connection:
+            row = connection.execute(
+                "SELECT value, stored_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self._namespace, key),
+            ).fetchone()
+        return (row[0], float(row[1])) if row else None
+
+    def put(self, key: str, value: str, stored_at: float, max_entries: int) -> None:
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?)",
+                (self._namespace, key, value, stored_at),
+            )
+            connection.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key NOT IN ("
+                " SELECT key FROM cache_entries WHERE namespace = ?"
+                " ORDER BY stored_at DESC LIMIT ?)",
+                (self._namespace, self._namespace, max_entries),
+            )
+
+    def delete(self, key: str | None = None) -> None:
+        with self._lock, self._connect() as connection:
+            if key is None:
+                connection.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ?", (self._namespace,)
+                )
+            else:
+                connection.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self._namespace, key),
+                )
+
+
+class TTLCache(Generic[V]):
+    """In-process LRU with per-entry TTL and an optional shared SQLite tier.
+
+    Entries younger than ``ttl_seconds`` are fresh. For a further
+    ``stale_seconds`` they are still served, but ``get_or_load`` refreshes
+    them on a background thread. Values written to disk go through
+    ``encode``/``decode`` (JSON by default), so they must round-trip.
+    Disk errors are logged and the cache carries on in memory.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float,
+        stale_seconds: float = 0.0,
+        max_entries: int = 256,
+        path: Path | None = None,
+        namespace: str = "default",
+        encode: Callable[[V], str] = json.dumps,
+        decode: Callable[[str], V] = json.loads,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self._ttl = float(ttl_seconds)
+        self._stale = float(stale_seconds)
+        self._max_entries = max_entries
+        self._encode = encode
+        self._decode = decode
+        self._entries: OrderedDict[Hashable, CacheEntry[V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing: set[Hashable] = set()
+        self._counters = dict.fromkeys(
+            ("hits", "stale_hits", "misses", "disk_hits", "refreshes", "evictions"), 0
+        )
+        self._store: _SQLiteStore | None = None
+        if path is not None:
+            try:
+                self._store = _SQLiteStore(path, namespace)
+            except (OSError, sqlite3.Error) as exc:
+                logging.warning("Cache database %s unavailable (%s); using memory only.", path, exc)
+
+    @property
+    def ttl_seconds(self) -> float:
+        return self._ttl
+
+    def _is_fresh(self, entry: CacheEntry[V], now: float) -> bool:
+        return entry.age(now) < self._ttl
+
+    def _is_servable(self, entry: CacheEntry[V], now: float) -> bool:
+        return entry.age(now) < self._ttl + self._stale
+
+    def _remember(self, key: Hashable, entry: CacheEntry[V]) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def _disk_get(self, key: Hashable) -> CacheEntry[V] | None:
+        if self._store is None:
+            return None
+        try:
+            row = self._store.get(str(key))
+            if row is None:
+                return None
+            entry = CacheEntry(self._decode(row[0]), row[1])
+        except (sqlite3.Error, ValueError, TypeError) as exc:
+            logging.warning("Cache read for %r failed: %s", key, exc)
+            return None
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not None and current.stored_at >= entry.stored_at:
+                return current
+            self._counters["disk_hits"] += 1
+        self._remember(key, entry)
+        return entry
+
+    def peek(self, key: Hashable) -> CacheEntry[V] | None:
+        """Return the entry if it is still servable, without counting or refreshing."""
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None or not self._is_fresh(entry, now):
+            # Another process may have written a newer value.
+            stored = self._disk_get(key)
+            if stored is not None and (entry is None or stored.stored_at > entry.stored_at):
+                entry = stored
+        if entry is None or not self._is_servable(entry, now):
+            return None
+        return entry
+
+    def get(self, key: Hashable) -> V | None:
+        entry = self.peek(key)
+        with self._lock:
+            if entry is None:
+                self._counters["misses"] += 1
+            elif self._is_fresh(entry, time.time()):
+                self._counters["hits"] += 1
+            else:
+                self._counters["stale_hits"] += 1
+        return None if entry is None else entry.value
+
+    def set(self, key: Hashable, value: V) -> None:
+        entry = CacheEntry(value, time.time())
+        self._remember(key, entry)
+        if self._store is not None:
+            try:
+                self._store.put(str(key), self._encode(value), entry.stored_at, self._max_entries)
+            except (sqlite3.Error, ValueError, TypeError) as exc:
+                logging.warning("Cache write for %r failed: %s", key, exc)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+        if self._store is not None:
+            try:
+                self._store.delete(str(key))
+            except sqlite3.Error as exc:
+                logging.warning("Cache delete for %r failed: %s", key, exc)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self._store is not None:
+            try:
+                self._store.delete()
+            except sqlite3.Error as exc:
+                logging.warning("Cache clear failed: %s", exc)
+
+    def refresh_in_background(self, key: Hashable, loader: Callable[[], V | None]) -> bool:
+        """Reload ``key`` on a daemon thread unless a refresh is already running."""
+
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self._counters["refreshes"] += 1
+
+        def _run() -> None:
+            try:
+                value = loader()
+                if value is not None:
+                    self.set(key, value)
+            except Exception as exc:  # noqa: BLE001 - keep serving the stale value
+                logging.warning("Background cache refresh for %r failed: %s", key, exc)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=_run, name="cache-refresh", daemon=True).start()
+        return True
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], V | None]) -> V | None:
+        """Return a cached value, loading it synchronously only on a hard miss.
+
+        Stale entries are returned immediately while a background refresh runs.
+        ``None`` results from ``loader`` are not cached.
+        """
+
+        entry = self.peek(key)
+        now = time.time()
+        if entry is not None:
+            fresh = self._is_fresh(entry, now)
+            with self._lock:
+                self._counters["hits" if fresh else "stale_hits"] += 1
+            if not fresh:
+                self.refresh_in_background(key, loader)
+            return entry.value
+        with self._lock:
+            self._counters["misses"] += 1
+        value = loader()
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                size=len(self._entries),
+                max_entries=self._max_entries,
+                **self._counters,
+            )
@@ -0,0 +1,185 @@
+"""Shared keep-alive HTTP clients, one per outbound provider.
+
+Each client owns a ``requests.Session`` whose adapter keeps a connection pool
+per host, retries idempotent requests on connection errors and 502/503/504
+with exponential backoff, and caps concurrent requests to the provider.
+Calls guarded by a circuit breaker should use ``retries=0`` so one call never
+outlasts the breaker's timeout.
+"""
+
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+__all__ = [
+    "HttpClient",
+    "HttpClientStats",
+    "get_http_client",
+    "http_client_stats",
+]
+
+RETRY_STATUSES = (502, 503, 504)
+
+
+@dataclass(frozen=True, slots=True)
+class HttpClientStats:
+    name: str
+    requests: int
+    errors: int
+    in_flight: int
+    # Requests that had to wait for a free concurrency slot.
+    queued: int
+    max_concurrency: int
+    hosts: int
+    # TCP/TLS connections opened; well below ``requests`` means keep-alive
+    # works. ``None`` when the installed urllib3 does not expose the count.
+    connections_opened: int | None
+
+
+class HttpClient:
+    """Thread-safe pooled session with retries and a concurrency limit."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_concurrency: int = 8,
+        retries: int = 2,
+        backoff_factor: float = 0.3,
+    ) -> None:
+        self.name = name
+        self._max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=max_concurrency,
+            max_retries=Retry(
+                total=retries,
+                read=0,
+                backoff_factor=backoff_factor,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=frozenset({"GET", "HEAD"}),
+                raise_on_status=False,
+            ),
+        )
+        self._session = requests.Session()
+        self._session.mount("https://", self._adapter)
+        self._session.mount("http://", self._adapter)
+        self._lock = threading.Lock()
+        self._counters = {"requests": 0, "errors": 0, "in_flight": 0, "queued": 0}
+        self._hosts: set[str] = set()
+
+    def _acquire(self, url: str) -> None:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._counters["queued"] += 1
+            self._slots.acquire()
+        with self._lock:
+            self._counters["requests"] += 1
+            self._counters["in_flight"] += 1
+            self._hosts.add(urlsplit(url).netloc)
+
+    def _release(self, failed: bool) -> None:
+        with self._lock:
+            self._counters["in_flight"] -= 1
+            if failed:
+                self._counters["errors"] += 1
+        self._slots.release()
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Send a request and read the whole body before freeing the slot."""
+
+        self._acquire(url)
+        failed = True
+        try:
+            response = self._session.request(method, url, **kwargs)
+            failed = False
+            return response
+        finally:
+            self._release(failed)
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    @contextmanager
+    def stream(self, method: str, url: str, **kwargs: Any) -> Iterator[requests.Response]:
+        """Yield a streaming response, holding a slot until the body is closed."""
+
+        self._acquire(url)
+        failed = True
+        try:
+            with self._session.request(method, url, stream=True, **kwargs) as response:
+                yield response
+            failed = False
+        finally:
+            self._release(failed)
+
+    def _connections_opened(self) -> int | None:
+        # urllib3 keeps these counters on undocumented attributes; read them
+        # defensively so an upgrade only loses the number, not the stats.
+        try:
+            pools = self._adapter.poolmanager.pools
+            connection_pools = [pools[key] for key in list(pools.keys())]
+            return sum(int(getattr(pool, "num_connections")) for pool in connection_pools)
+        except Exception:  # noqa: BLE001 - diagnostics only
+            return None
+
+    def stats(self) -> HttpClientStats:
+        with self._lock:
+            counters = dict(self._counters)
+            hosts = len(self._hosts)
+        return HttpClientStats(
+            name=self.name,
+            max_concurrency=self._max_concurrency,
+            hosts=hosts,
+            connections_opened=self._connections_opened(),
+            **counters,
+        )
+
+    def close(self) -> None:
+        self._session.close()
+
+
+_CLIENTS: dict[str, HttpClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_http_client(
+    name: str,
+    *,
+    max_concurrency: int = 8,
+    retries: int = 2,
+    backoff_factor: float = 0.3,
+) -> HttpClient:
+    """Return the process-wide client for ``name``, creating it on first use.
+
+    Settings only apply on creation; later calls share the existing client.
+    """
+
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(name)
+        if client is None:
+            client = _CLIENTS[name] = HttpClient(
+                name,
+                max_concurrency=max_concurrency,
+                retries=retries,
+                backoff_factor=backoff_factor,
+            )
+        return client
+
+
+def http_client_stats() -> list[HttpClientStats]:
+    with _CLIENTS_LOCK:
+        clients = list(_CLIENTS.values())
+    return [client.stats() for client in clients]
@@ -0,0 +1,246 @@
+"""Per-provider circuit breakers with latency-derived timeouts."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Literal, TypeVar
+
+import numpy as np
+
+__all__ = [
+    "BreakerStats",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "LatencyTracker",
+    "breaker_stats",
+    "get_breaker",
+]
+
+T = TypeVar("T")
+BreakerState = Literal["closed", "open", "half_open"]
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised by ``CircuitBreaker.call`` when the provider is short-circuited."""
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies.
+
+    ``timeout()`` returns ``multiplier`` times the configured percentile,
+    clamped to ``[min_timeout, max_timeout]``; until ``min_samples`` calls
+    have been seen it returns ``max_timeout``.
+    """
+
+    def __init__(
+        self,
+        *,
+        window: int = 50,
+        percentile: float = 95.0,
+        multiplier: float = 2.0,
+        min_timeout: float = 1.0,
+        max_timeout: float = 10.0,
+        min_samples: int = 5,
+    ) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self._percentile = percentile
+        self._multiplier = multiplier
+        self._min_timeout = min_timeout
+        self._max_timeout = max_timeout
+        self._min_samples = min_samples
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float | None = None) -> float | None:
+        with self._lock:
+            if not self._samples:
+                return None
+            samples = np.fromiter(self._samples, dtype=np.float64)
+        return float(np.percentile(samples, self._percentile if q is None else q))
+
+    def timeout(self) -> float:
+        with self._lock:
+            enough = len(self._samples) >= self._min_samples
+        if not enough:
+            return self._max_timeout
+        estimate = self._multiplier * (self.percentile() or self._max_timeout)
+        return min(self._max_timeout, max(self._min_timeout, estimate))
+
+
+@dataclass(frozen=True, slots=True)
+class BreakerStats:
+    """Snapshot of a breaker for diagnostics."""
+
+    name: str
+    state: BreakerState
+    consecutive_failures: int
+    total_failures: int
+    total_successes: int
+    short_circuited: int
+    timeout: float
+    p50_latency: float | None
+    p95_latency: float | None
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker guarding one external provider.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    ``allow_request`` returns ``False`` for ``reset_timeout`` seconds. It then
+    lets a single probe through (half-open); success closes it, failure
+    re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = 3,
+        reset_timeout: float = 60.0,
+        latency: LatencyTracker | None = None,
+    ) -> None:
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._latency = latency or LatencyTracker()
+        self._lock = threading.Lock()
+        self._opened_at: float | None = None
+        self._probe_in_flight = False
+        self._consecutive_failures = 0
+        self._counters = dict.fromkeys(("failures", "successes", "short_circuited"), 0)
+
+    def _state(self, now: float) -> BreakerState:
+        if self._opened_at is None:
+            return "closed"
+        if now - self._opened_at >= self._reset_timeout:
+            return "half_open"
+        return "open"
+
+    @property
+    def state(self) -> BreakerState:
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def timeout(self) -> float:
+        """Per-request timeout derived from recent latencies."""
+
+        return self._latency.timeout()
+
+    def allow_request(self) -> bool:
+        """Return ``True`` if a call may proceed; claims the probe when half-open."""
+
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._counters["short_circuited"] += 1
+            return False
+
+    def record_success(self, latency: float | None = None) -> None:
+        if latency is not None:
+            self._latency.record(latency)
+        with self._lock:
+            self._counters["successes"] += 1
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._counters["failures"] += 1
+            self._consecutive_failures += 1
+            if self._probe_in_flight or self._consecutive_failures >= self._failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Give back a half-open probe whose call ended without an outcome.
+
+        Callers that abandon a request (cancelled, deadline spent) call this so
+        the breaker can admit the next probe; it is a no-op otherwise.
+        """
+
+        with self._lock:
+            if self._state(time.monotonic()) == "half_open":
+                self._probe_in_flight = False
+
+    def call(self, fn: Callable[[float], T]) -> T:
+        """Run ``fn(timeout)`` under the breaker; any exception counts as a failure."""
+
+        if not self.allow_request():
+            raise CircuitOpenError(f"{self.name} is temporarily unavailable")
+        started = time.perf_counter()
+        try:
+            result = fn(self.timeout())
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success(time.perf_counter() - started)
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def stats(self) -> BreakerStats:
+        with self._lock:
+            state = self._state(time.monotonic())
+            consecutive = self._consecutive_failures
+            counters = dict(self._counters)
+        return BreakerStats(
+            name=self.name,
+            state=state,
+            consecutive_failures=consecutive,
+            total_failures=counters["failures"],
+            total_successes=counters["successes"],
+            short_circuited=counters["short_circuited"],
+            timeout=self.timeout(),
+            p50_latency=self._latency.percentile(50.0),
+            p95_latency=self._latency.percentile(95.0),
+        )
+
+
+_BREAKERS: dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def get_breaker(
+    name: str,
+    *,
+    failure_threshold: int = 3,
+    reset_timeout: float = 60.0,
+    min_timeout: float = 1.0,
+    max_timeout: float = 10.0,
+) -> CircuitBreaker:
+    """Return the process-wide breaker for ``name``, creating it on first use.
+
+    Settings only apply on creation; later calls share the existing breaker.
+    """
+
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(name)
+        if breaker is None:
+            breaker = _BREAKERS[name] = CircuitBreaker(
+                name,
+                failure_threshold=failure_threshold,
+                reset_timeout=reset_timeout,
+                latency=LatencyTracker(min_timeout=min_timeout, max_timeout=max_timeout),
+            )
+        return breaker
+
+
+def breaker_stats() -> list[BreakerStats]:
+    with _BREAKERS_LOCK:
+        breakers = list(_BREAKERS.values())
+    return [breaker.stats() for breaker in breakers]
@@ -0,0 +1,81 @@
+"""Coalesce concurrent calls for the same key into one execution."""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Callable, Generic, Hashable, TypeVar
+
+__all__ = [
+    "SingleFlight",
+    "SingleFlightStats",
+]
+
+V = TypeVar("V")
+
+
+@dataclass(frozen=True, slots=True)
+class SingleFlightStats:
+    """Counters for a ``SingleFlight`` group."""
+
+    calls: int
+    executions: int
+    coalesced: int
+    errors: int
+    in_flight: int
+
+
+class _Call(Generic[V]):
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: V | None = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight(Generic[V]):
+    """Thread-safe duplicate call suppression.
+
+    The first caller for a key runs ``fn``; callers arriving while it is in
+    flight block and receive the same value or exception. Nothing is cached
+    once the call completes.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call[V]] = {}
+        self._counters = dict.fromkeys(("calls", "executions", "coalesced", "errors"), 0)
+
+    def do(self, key: Hashable, fn: Callable[[], V]) -> V:
+        with self._lock:
+            self._counters["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._counters["executions"] += 1
+            else:
+                self._counters["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.value = fn()
+            except BaseException as exc:  # noqa: BLE001 - re-raised to every caller
+                call.error = exc
+                with self._lock:
+                    self._counters["errors"] += 1
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.value  # type: ignore[return-value]
+
+    def stats(self) -> SingleFlightStats:
+        with self._lock:
+            return SingleFlightStats(in_flight=len(self._calls), **self._counters)
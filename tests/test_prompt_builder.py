@@ -0,0 +1,40 @@
+import json
+
+from modules.prompt_builder import PromptBuilder
+
+
+def _context_block(user_prompt: str) -> dict:
+    line = next(
+        line
+        for line in user_prompt.splitlines()
+        if line.startswith("Local dataset context (JSON): ")
+    )
+    return json.loads(line.split(": ", 1)[1])
+
+
+def test_small_budget_keeps_context_json_valid() -> None:
+    builder = PromptBuilder(
+        {"rice": {"name": "Rice", "notes": "x" * 2000}},
+        [{"soil": "loam", "ph": 6.5}],
+        char_budget=200,
+    )
+    _, user_prompt = builder.build(
+        "q" * 500,
+        "rice",
+        [{"role": "user", "content": "hello"}] * 3,
+        [{"title": "Note", "text": "n" * 300}],
+    )
+
+    context = _context_block(user_prompt)
+    assert isinstance(context["crop"], str)
+    assert context["soil_profiles"] == []
+    assert context["conversation"] == []
+
+
+def test_large_budget_keeps_crop_details() -> None:
+    details = {"name": "Rice", "season": "kharif"}
+    builder = PromptBuilder({"rice": details}, [], char_budget=10_000)
+
+    _, user_prompt = builder.build("fertilizer for rice", "rice", [])
+
+    assert _context_block(user_prompt)["crop"] == details